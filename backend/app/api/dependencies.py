@@ -1,25 +1,45 @@
+from dataclasses import dataclass
 from typing import Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal
 from app.core.security import decode_token
 from app.models.user import User, UserRole
+from app.models.patient import Patient
+from app.models.doctor import Doctor
+from app.services.onboarding_session import OnboardingSession, OnboardingSessionStore
 
 security = HTTPBearer()
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
-) -> User:
-    """Get current authenticated user from JWT token."""
+@dataclass(frozen=True)
+class Identity:
+    """The authenticated user plus their patient/doctor profile ids (None if absent)."""
+    user: User
+    patient_id: Optional[int] = None
+    doctor_id: Optional[int] = None
+
+
+async def get_identity(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> Identity:
+    """
+    Resolve the JWT to the user and their profile ids in one joined query.
+
+    FastAPI caches dependencies per request, so get_current_user and every
+    route depending on both share this single lookup. It runs on the
+    primary (a user signed up a moment ago may not be on the replica yet)
+    in its own session, closed before the route runs: a route on the read
+    replica never holds a primary connection as well. The returned user is
+    detached; routes re-select it to change it.
+    """
     token = credentials.credentials
     payload = decode_token(token)
     
+    # Refresh and onboarding tokens are signed with the same key
     user_id = payload.get("sub")
-    if not user_id:
+    if payload.get("type") != "access" or not user_id:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials"
@@ -34,24 +54,34 @@ async def get_current_user(
             detail="Invalid user ID format"
         )
     
-    result = await db.execute(
-        select(User).where(User.id == user_id, User.is_deleted == False)
-    )
-    user = result.scalar_one_or_none()
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(User, Patient.id, Doctor.id)
+            .outerjoin(Patient, Patient.user_id == User.id)
+            .outerjoin(Doctor, Doctor.user_id == User.id)
+            .where(User.id == user_id, User.is_deleted == False)
+        )
+        row = result.one_or_none()
     
-    if not user:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
     
+    user, patient_id, doctor_id = row
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Inactive user"
         )
     
-    return user
+    return Identity(user=user, patient_id=patient_id, doctor_id=doctor_id)
+
+
+async def get_current_user(identity: Identity = Depends(get_identity)) -> User:
+    """Get current authenticated user from JWT token."""
+    return identity.user
 
 
 async def get_current_patient(current_user: User = Depends(get_current_user)) -> User:
@@ -94,3 +124,12 @@ def require_roles(*roles: UserRole):
             )
         return current_user
     return role_checker
+
+
+def require_onboarding_session(role: UserRole):
+    """Dependency factory resolving the X-Onboarding-Token header to a session."""
+    async def session_loader(
+        x_onboarding_token: str = Header(..., alias="X-Onboarding-Token")
+    ) -> OnboardingSession:
+        return await OnboardingSessionStore.load(x_onboarding_token, role.value)
+    return session_loader
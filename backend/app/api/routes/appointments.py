@@ -1,17 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 from typing import List, Optional
 from datetime import datetime, date, timedelta
 from pydantic import BaseModel
-from app.core.database import get_db
-from app.models.appointment import Appointment
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
+from app.core.responses import RowsResponse, row_dicts
+from app.models.appointment import Appointment, AppointmentDate
 from app.models.user import User, UserRole
 from app.models.patient import Patient
 from app.models.doctor import Doctor
 from app.schemas.appointment import AppointmentCreate, AppointmentResponse, AppointmentStatusUpdate
-from app.api.dependencies import get_current_user
+from app.api.dependencies import Identity, get_current_user, get_identity
 from app.services.celery_tasks import send_appointment_booking_email, send_appointment_status_email
+from app.services.patient_sync import PatientSync
 
 router = APIRouter(prefix="/appointments", tags=["Appointments"])
 
@@ -20,6 +23,43 @@ class AppointmentsListResponse(BaseModel):
     appointments: List[AppointmentResponse]
 
 
+APPOINTMENT_COLUMNS = tuple(getattr(Appointment, name) for name in AppointmentResponse.model_fields)
+
+
+async def _find_appointment(
+    db: AsyncSession,
+    appointment_id: int,
+    appointment_date: Optional[date] = None,
+) -> Appointment:
+    """
+    Load one appointment from its monthly partition. Without its date, the
+    date is read from appointment_dates first (a primary-key lookup), so the
+    query never scans every partition.
+    """
+    if appointment_date is None:
+        result = await db.execute(
+            select(AppointmentDate.appointment_date).where(AppointmentDate.id == appointment_id)
+        )
+        appointment_date = result.scalar_one_or_none()
+
+    appointment = None
+    if appointment_date is not None:
+        result = await db.execute(
+            select(Appointment).where(
+                Appointment.id == appointment_id,
+                Appointment.appointment_date == appointment_date,
+            )
+        )
+        appointment = result.scalar_one_or_none()
+
+    if not appointment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Appointment not found"
+        )
+    return appointment
+
+
 @router.post("", response_model=AppointmentResponse, status_code=status.HTTP_201_CREATED)
 async def create_appointment(
     appointment_data: AppointmentCreate,
@@ -27,6 +67,14 @@ async def create_appointment(
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new appointment."""
+    # Monthly partitions are only created up to the booking horizon
+    horizon = date.today() + timedelta(days=settings.APPOINTMENT_BOOKING_HORIZON_DAYS)
+    if appointment_data.appointment_date > horizon:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Appointments can be booked at most {settings.APPOINTMENT_BOOKING_HORIZON_DAYS} days ahead"
+        )
+    
     # Determine patient_id
     if appointment_data.patient_id and current_user.role in [UserRole.ADMIN, UserRole.DOCTOR]:
         # Admin/Doctor creating appointment for a patient
@@ -113,113 +161,111 @@ async def create_appointment(
 
 @router.get("", response_model=AppointmentsListResponse)
 async def get_appointments(
-    status: Optional[str] = None,
+    request: Request,
+    status_filter: Optional[str] = Query(None, alias="status"),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    since: Optional[datetime] = Query(None, description="Sync watermark (patients): only appointments changed or cancelled after it"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    identity: Identity = Depends(get_identity),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get user's appointments."""
-    if current_user.role == UserRole.PATIENT:
-        result = await db.execute(
-            select(Patient).where(Patient.user_id == current_user.id)
+    """
+    Get user's appointments.
+
+    A patient's list supports If-None-Match / If-Modified-Since (304) and
+    ?since= delta sync, which ignores status and paging (see
+    app/services/patient_sync.py).
+    """
+    if since and current_user.role != UserRole.PATIENT:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="since is only supported for a patient's own appointments"
         )
-        patient = result.scalar_one_or_none()
-        if not patient:
+    headers = None
+    if current_user.role == UserRole.PATIENT:
+        if identity.patient_id is None:
             return {"appointments": []}
         
-        query = select(Appointment).where(
-            Appointment.patient_id == patient.id
+        sync = await PatientSync.state(db, identity.patient_id)
+        if since:
+            return await PatientSync.delta(
+                db, request, sync, since, "appointments", select(*APPOINTMENT_COLUMNS), Appointment
+            )
+        not_modified = PatientSync.not_modified(request, sync)
+        if not_modified:
+            return not_modified
+        headers = PatientSync.headers(request, sync)
+        
+        query = select(*APPOINTMENT_COLUMNS).where(
+            Appointment.patient_id == identity.patient_id
         )
     elif current_user.role == UserRole.DOCTOR:
-        result = await db.execute(
-            select(Doctor).where(Doctor.user_id == current_user.id)
-        )
-        doctor = result.scalar_one_or_none()
-        if not doctor:
+        if identity.doctor_id is None:
             return {"appointments": []}
         
-        query = select(Appointment).where(
-            Appointment.doctor_id == doctor.id
+        query = select(*APPOINTMENT_COLUMNS).where(
+            Appointment.doctor_id == identity.doctor_id
         )
     else:
         # Admin can see all
-        query = select(Appointment)
+        query = select(*APPOINTMENT_COLUMNS)
     
-    if status:
-        query = query.where(Appointment.status == status)
+    if status_filter:
+        query = query.where(Appointment.status == status_filter)
     
     query = query.order_by(Appointment.appointment_date.desc()).offset(skip).limit(limit)
     
     result = await db.execute(query)
-    appointments = result.scalars().all()
-    
-    return {"appointments": appointments}
+    return RowsResponse({"appointments": row_dicts(result)}, headers=headers)
 
 
 @router.get("/upcoming", response_model=List[AppointmentResponse])
 async def get_upcoming_appointments(
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """Get upcoming appointments (today and future)."""
     today = date.today()
     
     if current_user.role == UserRole.PATIENT:
-        result = await db.execute(
-            select(Patient).where(Patient.user_id == current_user.id)
-        )
-        patient = result.scalar_one_or_none()
-        if not patient:
+        if identity.patient_id is None:
             return []
         
-        query = select(Appointment).where(
-            Appointment.patient_id == patient.id,
+        query = select(*APPOINTMENT_COLUMNS).where(
+            Appointment.patient_id == identity.patient_id,
             Appointment.appointment_date >= today,
             Appointment.status == 'scheduled'
         )
     elif current_user.role == UserRole.DOCTOR:
-        result = await db.execute(
-            select(Doctor).where(Doctor.user_id == current_user.id)
-        )
-        doctor = result.scalar_one_or_none()
-        if not doctor:
+        if identity.doctor_id is None:
             return []
         
-        query = select(Appointment).where(
-            Appointment.doctor_id == doctor.id,
+        query = select(*APPOINTMENT_COLUMNS).where(
+            Appointment.doctor_id == identity.doctor_id,
             Appointment.appointment_date >= today,
             Appointment.status == 'scheduled'
         )
     else:
-        query = select(Appointment).where(
+        query = select(*APPOINTMENT_COLUMNS).where(
             Appointment.appointment_date >= today,
             Appointment.status == 'scheduled'
         )
     
     result = await db.execute(query.order_by(Appointment.appointment_date.asc()))
-    appointments = result.scalars().all()
-    
-    return appointments
+    return RowsResponse(row_dicts(result))
 
 
 @router.get("/{appointment_id}", response_model=AppointmentResponse)
 async def get_appointment(
     appointment_id: int,
+    appointment_date: Optional[date] = Query(None, alias="appointmentDate"),  # Skips the id -> date lookup
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get appointment details."""
-    result = await db.execute(
-        select(Appointment).where(Appointment.id == appointment_id)
-    )
-    appointment = result.scalar_one_or_none()
-    
-    if not appointment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Appointment not found"
-        )
+    appointment = await _find_appointment(db, appointment_id, appointment_date)
     
     return appointment
 
@@ -228,20 +274,12 @@ async def get_appointment(
 async def update_appointment_status(
     appointment_id: int,
     status_update: AppointmentStatusUpdate,
+    appointment_date: Optional[date] = Query(None, alias="appointmentDate"),  # Skips the id -> date lookup
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Update appointment status."""
-    result = await db.execute(
-        select(Appointment).where(Appointment.id == appointment_id)
-    )
-    appointment = result.scalar_one_or_none()
-    
-    if not appointment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Appointment not found"
-        )
+    appointment = await _find_appointment(db, appointment_id, appointment_date)
     
     appointment.status = status_update.status
     if status_update.notes:
@@ -291,20 +329,12 @@ async def update_appointment_status(
 @router.post("/{appointment_id}/cancel")
 async def cancel_appointment(
     appointment_id: int,
+    appointment_date: Optional[date] = Query(None, alias="appointmentDate"),  # Skips the id -> date lookup
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Cancel an appointment."""
-    result = await db.execute(
-        select(Appointment).where(Appointment.id == appointment_id)
-    )
-    appointment = result.scalar_one_or_none()
-    
-    if not appointment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Appointment not found"
-        )
+    appointment = await _find_appointment(db, appointment_id, appointment_date)
     
     appointment.status = 'cancelled'
     
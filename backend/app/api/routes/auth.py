@@ -5,14 +5,12 @@ from datetime import datetime, timedelta
 from app.core.database import get_db
 from app.core.security import hash_password, verify_password, create_access_token, create_refresh_token, decode_token, validate_password_strength
 from app.models.user import User, RefreshToken, UserRole
-from app.models.patient import Patient
-from app.models.doctor import Doctor
 from app.schemas.auth import (
     UserCreate, UserLogin, TokenResponse, RefreshTokenRequest, UserResponse,
     SendOTPRequest, SendOTPResponse, VerifyOTPRequest, BiometricLoginRequest
 )
 from app.services.otp_service import otp_service
-from app.api.dependencies import get_current_user
+from app.api.dependencies import Identity, get_current_user, get_identity
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -330,7 +328,7 @@ async def biometric_login(request: BiometricLoginRequest, db: AsyncSession = Dep
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    identity: Identity = Depends(get_identity)
 ):
     """
     Get current authenticated user information.
@@ -342,22 +340,10 @@ async def get_current_user_info(
     """
     user_data = UserResponse.from_orm(current_user)
     
-    # Fetch patient_id if user is a patient
+    # Profile ids were resolved with the user (get_identity)
     if current_user.role == UserRole.PATIENT:
-        result = await db.execute(
-            select(Patient).where(Patient.user_id == current_user.id)
-        )
-        patient = result.scalar_one_or_none()
-        if patient:
-            user_data.patient_id = patient.id
-    
-    # Fetch doctor_id if user is a doctor
+        user_data.patient_id = identity.patient_id
     elif current_user.role == UserRole.DOCTOR:
-        result = await db.execute(
-            select(Doctor).where(Doctor.user_id == current_user.id)
-        )
-        doctor = result.scalar_one_or_none()
-        if doctor:
-            user_data.doctor_id = doctor.id
+        user_data.doctor_id = identity.doctor_id
     
     return user_data
@@ -5,7 +5,7 @@ from typing import List, Optional
 from uuid import UUID
 from datetime import datetime, date
 from decimal import Decimal
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.config import settings
 from app.models.billing import Bill, BillItem, ChargeType, PaymentStatus
 from app.models.user import User, UserRole
@@ -14,7 +14,7 @@ from app.schemas.billing import (
     BillCreate, BillResponse, PaymentUpdate, ChargeTypeResponse,
     BillsListResponse, BillingSummary
 )
-from app.api.dependencies import get_current_user
+from app.api.dependencies import Identity, get_current_user, get_identity
 
 router = APIRouter(prefix="/billing", tags=["Billing & Payments"])
 
@@ -22,7 +22,7 @@ router = APIRouter(prefix="/billing", tags=["Billing & Payments"])
 @router.get("/charge-types", response_model=List[ChargeTypeResponse])
 async def get_charge_types(
     is_active: bool = True,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all charge types."""
     query = select(ChargeType)
@@ -41,7 +41,8 @@ async def get_bills_with_summary(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    identity: Identity = Depends(get_identity),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get bills with summary information."""
     from decimal import Decimal as D
@@ -51,14 +52,9 @@ async def get_bills_with_summary(
         query = select(Bill).where(Bill.is_deleted == False)
         
         # Filter based on user role
-        patient = None
         if current_user.role == UserRole.PATIENT:
-            result = await db.execute(
-                select(Patient).where(Patient.user_id == current_user.id)
-            )
-            patient = result.scalar_one_or_none()
-            if patient:
-                query = query.where(Bill.patient_id == patient.id)
+            if identity.patient_id is not None:
+                query = query.where(Bill.patient_id == identity.patient_id)
             else:
                 return BillsListResponse(
                     bills=[],
@@ -213,19 +209,16 @@ async def get_bills(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    identity: Identity = Depends(get_identity),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get bills."""
     query = select(Bill).where(Bill.is_deleted == False)
     
     # Filter based on user role
     if current_user.role == UserRole.PATIENT:
-        result = await db.execute(
-            select(Patient).where(Patient.user_id == current_user.id)
-        )
-        patient = result.scalar_one_or_none()
-        if patient:
-            query = query.where(Bill.patient_id == patient.id)
+        if identity.patient_id is not None:
+            query = query.where(Bill.patient_id == identity.patient_id)
         else:
             return []
     elif patient_id:
@@ -253,6 +246,7 @@ async def get_bills(
 async def get_bill(
     bill_id: UUID,
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """Get bill details."""
@@ -272,11 +266,7 @@ async def get_bill(
     
     # Verify access for patients
     if current_user.role == UserRole.PATIENT:
-        result = await db.execute(
-            select(Patient).where(Patient.user_id == current_user.id)
-        )
-        patient = result.scalar_one_or_none()
-        if not patient or patient.id != bill.patient_id:
+        if identity.patient_id is None or identity.patient_id != bill.patient_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied"
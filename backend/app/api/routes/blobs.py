@@ -0,0 +1,32 @@
+"""
+API Routes for Blob Downloads
+Serves blobs behind HMAC-signed URLs (BlobStorage.signed_url and
+cacheable_url). The signature is the authorization, so the route needs no
+token or database access. With USE_S3 originals are linked with presigned
+S3 URLs instead; only derivatives (thumbnails, previews) come through here.
+"""
+
+from fastapi import APIRouter, Header, HTTPException, status, Query
+from typing import Optional
+
+from app.services.blob_storage import BlobStorage, is_blob_key, is_derived_key, verify_url_signature
+
+router = APIRouter(prefix="/blobs", tags=["Blobs"])
+
+
+@router.get("/{key:path}")
+async def download_blob(
+    key: str,
+    expires: int = Query(...),
+    type: str = Query(...),
+    filename: str = Query(...),
+    signature: str = Query(...),
+    range_header: Optional[str] = Header(None, alias="Range")
+):
+    """Stream a blob (supports single byte ranges)."""
+    if not (is_blob_key(key) or is_derived_key(key)) or not verify_url_signature(key, expires, type, filename, signature):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid or expired link"
+        )
+    return await BlobStorage.stream_response(key, type, filename, range_header)
@@ -0,0 +1,44 @@
+"""
+API Routes for the Doctor Dashboard
+Today's queue, pending tests and active patients in one call,
+read from materialized views refreshed in the background.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_read_db
+from app.models.user import User, UserRole
+from app.schemas.dashboard import DoctorDashboardResponse
+from app.services.dashboard_views import DashboardViews
+from app.api.dependencies import Identity, get_current_user, get_identity
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+
+@router.get("/doctor", response_model=DoctorDashboardResponse)
+async def get_doctor_dashboard(
+    current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get the current doctor's dashboard.
+
+    Figures come from materialized views and may lag recent writes by up
+    to DASHBOARD_REFRESH_SECONDS; `refreshed_at` reports the oldest view.
+    """
+    if current_user.role != UserRole.DOCTOR:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only doctors can view the doctor dashboard"
+        )
+
+    doctor_id = identity.doctor_id
+    if doctor_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Doctor profile not found"
+        )
+
+    return await DashboardViews.doctor_dashboard(db, doctor_id)
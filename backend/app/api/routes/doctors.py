@@ -5,7 +5,7 @@ from typing import List
 from pydantic import BaseModel
 from datetime import datetime
 from decimal import Decimal
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.models.doctor import Doctor
 from app.models.user import User, UserRole
 from app.schemas.doctor import DoctorResponse
@@ -23,7 +23,7 @@ class DoctorsListResponse(BaseModel):
 
 
 @router.get("/specializations", response_model=List[SpecializationResponse])
-async def get_specializations(db: AsyncSession = Depends(get_db)):
+async def get_specializations(db: AsyncSession = Depends(get_read_db)):
     """Get all unique specializations."""
     result = await db.execute(
         select(Doctor.specialization).distinct()
@@ -37,7 +37,7 @@ async def get_doctors(
     specialization: str | None = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get list of doctors with optional filters."""
     query = select(Doctor).where(Doctor.is_available == True)
@@ -55,7 +55,7 @@ async def get_doctors(
 
 
 @router.get("/{doctor_id}", response_model=DoctorResponse)
-async def get_doctor(doctor_id: int, db: AsyncSession = Depends(get_db)):
+async def get_doctor(doctor_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get doctor details by ID."""
     result = await db.execute(
         select(Doctor).where(Doctor.id == doctor_id)
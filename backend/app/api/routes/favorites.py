@@ -19,7 +19,10 @@ from app.schemas.template import (
     MedicineFavoriteResponse,
     MedicineFavoriteListResponse
 )
-from app.api.dependencies import get_current_user
+from app.api.dependencies import Identity, get_current_user, get_identity
+from app.services.search_service import SearchService
+from app.services.medicine_index import medicine_index
+from app.services.usage_counter import UsageCounter
 
 router = APIRouter(prefix="/favorites", tags=["Medicine Favorites"])
 
@@ -28,6 +31,7 @@ router = APIRouter(prefix="/favorites", tags=["Medicine Favorites"])
 async def create_favorite(
     favorite_data: MedicineFavoriteCreate,
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -42,11 +46,7 @@ async def create_favorite(
         )
     
     # Get doctor
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    if not doctor:
+    if identity.doctor_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Doctor profile not found"
@@ -54,7 +54,7 @@ async def create_favorite(
     
     # Create favorite
     favorite = DoctorMedicineFavorite(
-        doctor_id=doctor.id,
+        doctor_id=identity.doctor_id,
         medicine_name=favorite_data.medicine_name,
         dosage=favorite_data.dosage,
         frequency=favorite_data.frequency,
@@ -67,6 +67,7 @@ async def create_favorite(
     db.add(favorite)
     await db.commit()
     await db.refresh(favorite)
+    medicine_index.upsert_favorite(identity.doctor_id, favorite.medicine_name, favorite.usage_count)
     
     return favorite
 
@@ -78,6 +79,7 @@ async def get_favorites(
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -92,11 +94,7 @@ async def get_favorites(
         )
     
     # Get doctor
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    if not doctor:
+    if identity.doctor_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Doctor profile not found"
@@ -104,14 +102,12 @@ async def get_favorites(
     
     # Build query
     query = select(DoctorMedicineFavorite).where(
-        DoctorMedicineFavorite.doctor_id == doctor.id
+        DoctorMedicineFavorite.doctor_id == identity.doctor_id
     )
     
     # Apply filters
     if search:
-        query = query.where(
-            DoctorMedicineFavorite.medicine_name.ilike(f"%{search}%")
-        )
+        query = query.where(SearchService.favorite_match(search))
     
     if category:
         query = query.where(DoctorMedicineFavorite.category == category)
@@ -146,6 +142,7 @@ async def search_favorites(
     q: str = Query(..., min_length=1, description="Search query"),
     limit: int = Query(10, ge=1, le=50),
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -160,11 +157,7 @@ async def search_favorites(
         )
     
     # Get doctor
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    if not doctor:
+    if identity.doctor_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Doctor profile not found"
@@ -174,8 +167,8 @@ async def search_favorites(
     query = (
         select(DoctorMedicineFavorite)
         .where(
-            DoctorMedicineFavorite.doctor_id == doctor.id,
-            DoctorMedicineFavorite.medicine_name.ilike(f"%{q}%")
+            DoctorMedicineFavorite.doctor_id == identity.doctor_id,
+            SearchService.favorite_match(q)
         )
         .order_by(
             DoctorMedicineFavorite.usage_count.desc(),
@@ -194,6 +187,7 @@ async def search_favorites(
 async def get_favorite(
     favorite_id: UUID,
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific favorite by ID."""
@@ -204,11 +198,7 @@ async def get_favorite(
         )
     
     # Get doctor
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    if not doctor:
+    if identity.doctor_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Doctor profile not found"
@@ -218,7 +208,7 @@ async def get_favorite(
     result = await db.execute(
         select(DoctorMedicineFavorite).where(
             DoctorMedicineFavorite.id == favorite_id,
-            DoctorMedicineFavorite.doctor_id == doctor.id
+            DoctorMedicineFavorite.doctor_id == identity.doctor_id
         )
     )
     favorite = result.scalar_one_or_none()
@@ -237,6 +227,7 @@ async def update_favorite(
     favorite_id: UUID,
     favorite_data: MedicineFavoriteUpdate,
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """Update a favorite medicine."""
@@ -247,11 +238,7 @@ async def update_favorite(
         )
     
     # Get doctor
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    if not doctor:
+    if identity.doctor_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Doctor profile not found"
@@ -261,7 +248,7 @@ async def update_favorite(
     result = await db.execute(
         select(DoctorMedicineFavorite).where(
             DoctorMedicineFavorite.id == favorite_id,
-            DoctorMedicineFavorite.doctor_id == doctor.id
+            DoctorMedicineFavorite.doctor_id == identity.doctor_id
         )
     )
     favorite = result.scalar_one_or_none()
@@ -272,6 +259,8 @@ async def update_favorite(
             detail="Favorite not found"
         )
     
+    previous_name = favorite.medicine_name
+    
     # Update fields
     if favorite_data.medicine_name is not None:
         favorite.medicine_name = favorite_data.medicine_name
@@ -288,6 +277,9 @@ async def update_favorite(
     
     await db.commit()
     await db.refresh(favorite)
+    medicine_index.upsert_favorite(
+        identity.doctor_id, favorite.medicine_name, favorite.usage_count, previous_name=previous_name
+    )
     
     return favorite
 
@@ -296,6 +288,7 @@ async def update_favorite(
 async def delete_favorite(
     favorite_id: UUID,
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """Delete a favorite medicine."""
@@ -306,11 +299,7 @@ async def delete_favorite(
         )
     
     # Get doctor
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    if not doctor:
+    if identity.doctor_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Doctor profile not found"
@@ -320,7 +309,7 @@ async def delete_favorite(
     result = await db.execute(
         select(DoctorMedicineFavorite).where(
             DoctorMedicineFavorite.id == favorite_id,
-            DoctorMedicineFavorite.doctor_id == doctor.id
+            DoctorMedicineFavorite.doctor_id == identity.doctor_id
         )
     )
     favorite = result.scalar_one_or_none()
@@ -331,8 +320,10 @@ async def delete_favorite(
             detail="Favorite not found"
         )
     
+    medicine_name = favorite.medicine_name
     await db.delete(favorite)
     await db.commit()
+    medicine_index.remove_favorite(identity.doctor_id, medicine_name)
     
     return None
 
@@ -354,25 +345,21 @@ async def use_favorite(
             detail="Only doctors can use favorites"
         )
     
-    # Get doctor
+    # Ownership check and current count in one read; the increment is buffered
     result = await db.execute(
-        select(Doctor).where(Doctor.user_id == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    if not doctor:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Doctor profile not found"
+        select(
+            DoctorMedicineFavorite.id,
+            DoctorMedicineFavorite.doctor_id,
+            DoctorMedicineFavorite.medicine_name,
+            DoctorMedicineFavorite.usage_count
         )
-    
-    # Get favorite
-    result = await db.execute(
-        select(DoctorMedicineFavorite).where(
+        .join(Doctor, Doctor.id == DoctorMedicineFavorite.doctor_id)
+        .where(
             DoctorMedicineFavorite.id == favorite_id,
-            DoctorMedicineFavorite.doctor_id == doctor.id
+            Doctor.user_id == current_user.id
         )
     )
-    favorite = result.scalar_one_or_none()
+    favorite = result.first()
     
     if not favorite:
         raise HTTPException(
@@ -380,15 +367,16 @@ async def use_favorite(
             detail="Favorite not found"
         )
     
-    favorite.usage_count += 1
-    await db.commit()
+    usage_count = await UsageCounter.increment(db, "favorites", favorite.id, favorite.usage_count)
+    medicine_index.upsert_favorite(favorite.doctor_id, favorite.medicine_name, usage_count)
     
-    return {"success": True, "usage_count": favorite.usage_count}
+    return {"success": True, "usage_count": usage_count}
 
 
 @router.get("/categories/list")
 async def get_categories(
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -403,11 +391,7 @@ async def get_categories(
         )
     
     # Get doctor
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    if not doctor:
+    if identity.doctor_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Doctor profile not found"
@@ -417,7 +401,7 @@ async def get_categories(
     query = (
         select(DoctorMedicineFavorite.category)
         .where(
-            DoctorMedicineFavorite.doctor_id == doctor.id,
+            DoctorMedicineFavorite.doctor_id == identity.doctor_id,
             DoctorMedicineFavorite.category.isnot(None)
         )
         .distinct()
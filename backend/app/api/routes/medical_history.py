@@ -7,11 +7,10 @@ from app.core.database import get_db
 from app.models.medical import MedicalRecord
 from app.models.user import User, UserRole
 from app.models.patient import Patient
-from app.models.doctor import Doctor
 from app.schemas.medical_history import (
     MedicalHistoryCreate, MedicalHistoryUpdate, MedicalHistoryResponse
 )
-from app.api.dependencies import get_current_user
+from app.api.dependencies import Identity, get_current_user, get_identity
 
 router = APIRouter(prefix="/medical-history", tags=["Medical History"])
 
@@ -20,6 +19,7 @@ router = APIRouter(prefix="/medical-history", tags=["Medical History"])
 async def create_medical_history(
     history_data: MedicalHistoryCreate,
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """Create medical history record (Doctor only)."""
@@ -30,11 +30,7 @@ async def create_medical_history(
         )
     
     # Get doctor
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    if not doctor:
+    if identity.doctor_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Doctor profile not found"
@@ -54,7 +50,7 @@ async def create_medical_history(
     # Create medical history
     history = PatientMedicalHistory(
         patient_id=history_data.patient_id,
-        doctor_id=doctor.id,
+        doctor_id=identity.doctor_id,
         appointment_id=history_data.appointment_id,
         recorded_date=history_data.recorded_date,
         past_illnesses=history_data.past_illnesses,
@@ -81,16 +77,13 @@ async def get_patient_history(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """Get patient's medical history."""
     # Verify access rights
     if current_user.role == UserRole.PATIENT:
-        result = await db.execute(
-            select(Patient).where(Patient.user_id == current_user.id)
-        )
-        patient = result.scalar_one_or_none()
-        if not patient or patient.id != patient_id:
+        if identity.patient_id is None or identity.patient_id != patient_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied"
@@ -1,13 +1,14 @@
-from fastapi import APIRouter, Depends, status, HTTPException, Query, Body
+from fastapi import APIRouter, Depends, Request, status, HTTPException, Query, Body
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List, Optional
-from datetime import date
-from app.core.database import get_db
-from app.api.dependencies import get_current_user
+from datetime import date, datetime
+from app.core.database import get_db, get_read_db
+from app.core.responses import RowsResponse
+from app.api.dependencies import Identity, get_current_user, get_identity
 from app.models.user import User, UserRole
 from app.models.medical import MedicalRecord
-from app.models.doctor import Doctor
+from app.services.patient_sync import PatientSync
 from pydantic import BaseModel, Field
 
 
@@ -41,9 +42,11 @@ class MedicalRecordResponse(BaseModel):
     result_summary: str | None = None
     created_at: Optional[str] = None
     
-    @classmethod
-    def from_model(cls, record: MedicalRecord):
-        """Map MedicalRecord model to response format."""
+    @staticmethod
+    def fields(record) -> dict:
+        """
+        Map a MedicalRecord (or a row of RECORD_COLUMNS) to response fields.
+        """
         # Map diagnosis -> title
         # Map visit_date -> test_date
         # Map symptoms + treatment  -> description
@@ -53,17 +56,23 @@ class MedicalRecordResponse(BaseModel):
         if record.treatment:
             description += f"Treatment: {record.treatment}"
         
-        return cls(
-            id=record.id,
-            patient_id=record.patient_id,
-            doctor_id=record.doctor_id,
-            appointment_id=record.appointment_id,
-            title=record.diagnosis,
-            test_date=record.visit_date,
-            description=description.strip() if description.strip() else None,
-            result_summary=record.treatment,  # Use treatment as result_summary
-            record_type="Clinical Note"
-        )
+        return {
+            "id": record.id,
+            "patient_id": record.patient_id,
+            "doctor_id": record.doctor_id,
+            "appointment_id": record.appointment_id,
+            "record_type": "Clinical Note",
+            "title": record.diagnosis,
+            "description": description.strip() if description.strip() else None,
+            "test_date": record.visit_date,
+            "result_summary": record.treatment,  # Use treatment as result_summary
+            "created_at": None,
+        }
+    
+    @classmethod
+    def from_model(cls, record: MedicalRecord):
+        """Map MedicalRecord model to response format."""
+        return cls(**cls.fields(record))
     
     class Config:
         from_attributes = True
@@ -73,24 +82,34 @@ class MedicalRecordsListResponse(BaseModel):
     records: List[MedicalRecordResponse]  # Changed from medical_records to records
 
 
+# Columns MedicalRecordResponse.fields reads; lists skip ORM hydration
+RECORD_COLUMNS = (
+    MedicalRecord.id, MedicalRecord.patient_id, MedicalRecord.doctor_id, MedicalRecord.appointment_id,
+    MedicalRecord.diagnosis, MedicalRecord.symptoms, MedicalRecord.treatment, MedicalRecord.visit_date,
+)
+
+
 @router.get("", response_model=MedicalRecordsListResponse)
 async def get_medical_records(
+    request: Request,
     patient_id: Optional[int] = Query(None, alias="patientId"),
+    since: Optional[datetime] = Query(None, description="Sync watermark: only records changed or deleted after it"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    identity: Identity = Depends(get_identity),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get medical records for a patient."""
+    """
+    Get medical records for a patient.
+
+    With patientId, supports If-None-Match / If-Modified-Since (304) and
+    ?since= delta sync (see app/services/patient_sync.py).
+    """
     # If patient_id is provided
     if patient_id:
         # Patients can only view their own records
         if current_user.role == UserRole.PATIENT:
             # Verify this user owns this patient record
-            from app.models.patient import Patient
-            result = await db.execute(
-                select(Patient).where(Patient.user_id == current_user.id)
-            )
-            patient = result.scalar_one_or_none()
-            if not patient or patient.id != patient_id:
+            if identity.patient_id is None or identity.patient_id != patient_id:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Not authorized to view these records"
@@ -102,13 +121,27 @@ async def get_medical_records(
                 detail="Not authorized to view medical records"
             )
         
+        sync = await PatientSync.state(db, patient_id)
+        if since:
+            return await PatientSync.delta(
+                db, request, sync, since, "records", select(*RECORD_COLUMNS), MedicalRecord,
+                serialize=lambda result: [MedicalRecordResponse.fields(r) for r in result.all()]
+            )
+        not_modified = PatientSync.not_modified(request, sync)
+        if not_modified:
+            return not_modified
+        
         # Get medical records for this patient
         result = await db.execute(
-            select(MedicalRecord)
+            select(*RECORD_COLUMNS)
             .where(MedicalRecord.patient_id == patient_id)
             .order_by(MedicalRecord.visit_date.desc())
         )
-        records = result.scalars().all()
+        records = result.all()
+        return RowsResponse(
+            {"records": [MedicalRecordResponse.fields(r) for r in records]},
+            headers=PatientSync.headers(request, sync)
+        )
     else:
         # No patient_id provided - only for admin/doctor to view all
         if current_user.role not in [UserRole.ADMIN, UserRole.DOCTOR]:
@@ -116,21 +149,25 @@ async def get_medical_records(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to view all medical records"
             )
+        if since:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="since requires patientId"
+            )
         
         result = await db.execute(
-            select(MedicalRecord).order_by(MedicalRecord.visit_date.desc())
+            select(*RECORD_COLUMNS).order_by(MedicalRecord.visit_date.desc())
         )
-        records = result.scalars().all()
+        records = result.all()
     
-    return MedicalRecordsListResponse(
-        records=[MedicalRecordResponse.from_model(r) for r in records]
-    )
+    return RowsResponse({"records": [MedicalRecordResponse.fields(r) for r in records]})
 
 
 @router.get("/{record_id}", response_model=MedicalRecordResponse)
 async def get_medical_record(
     record_id: int,
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """Get a single medical record by ID."""
@@ -149,12 +186,7 @@ async def get_medical_record(
     # Verify access
     if current_user.role == UserRole.PATIENT:
         # Verify this user owns this patient record
-        from app.models.patient import Patient
-        result = await db.execute(
-            select(Patient).where(Patient.user_id == current_user.id)
-        )
-        patient = result.scalar_one_or_none()
-        if not patient or patient.id != record.patient_id:
+        if identity.patient_id is None or identity.patient_id != record.patient_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to view this record"
@@ -172,6 +204,7 @@ async def get_medical_record(
 async def create_medical_record(
     record_data: MedicalRecordCreate,
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new medical record (Doctor only)."""
@@ -182,11 +215,7 @@ async def create_medical_record(
         )
     
     # Get doctor
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    if not doctor:
+    if identity.doctor_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Doctor profile not found"
@@ -212,7 +241,7 @@ async def create_medical_record(
     # Create medical record
     new_record = MedicalRecord(
         patient_id=record_data.patientId,
-        doctor_id=doctor.id,
+        doctor_id=identity.doctor_id,
         appointment_id=record_data.appointmentId,
         diagnosis=diagnosis,
         symptoms=symptoms,
@@ -0,0 +1,51 @@
+"""
+API Routes for Medicines
+Autocomplete for medicine names while writing prescriptions.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.models.user import User, UserRole
+from app.schemas.medicine import MedicineAutocompleteResponse
+from app.services.medicine_index import medicine_index
+from app.api.dependencies import Identity, get_current_user, get_identity
+
+router = APIRouter(prefix="/medicines", tags=["Medicines"])
+
+
+@router.get("/autocomplete", response_model=MedicineAutocompleteResponse)
+async def autocomplete_medicines(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Suggest medicine names for a typed prefix (Doctor only).
+
+    Served from the in-memory index: the doctor's favorites and own
+    prescribing history first, then medicines prescribed across the clinic,
+    each ranked by usage.
+    """
+    if current_user.role != UserRole.DOCTOR:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only doctors can use medicine autocomplete"
+        )
+
+    doctor_id = identity.doctor_id
+    if doctor_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Doctor profile not found"
+        )
+
+    await medicine_index.ensure_loaded(db)
+
+    return MedicineAutocompleteResponse(
+        query=q,
+        results=medicine_index.complete(q, doctor_id=doctor_id, limit=limit)
+    )
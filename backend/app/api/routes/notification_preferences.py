@@ -9,6 +9,7 @@ from sqlalchemy import select
 from typing import Optional
 from uuid import UUID
 from datetime import time
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from pydantic import BaseModel
 
 from app.core.database import get_db
@@ -20,6 +21,7 @@ from app.models.prescription_extras import (
     DevicePlatform
 )
 from app.services.push_notification import PushNotificationService
+from app.services.notification_policy import notification_policies
 from app.api.dependencies import get_current_user
 
 router = APIRouter(prefix="/notification-preferences", tags=["Notification Preferences"])
@@ -36,6 +38,7 @@ class NotificationPreferenceResponse(BaseModel):
     quiet_hours_enabled: bool
     quiet_hours_start: Optional[str] = None
     quiet_hours_end: Optional[str] = None
+    timezone: Optional[str] = None
     preferred_channel: str
     
     class Config:
@@ -51,6 +54,7 @@ class UpdatePreferenceRequest(BaseModel):
     quiet_hours_enabled: Optional[bool] = None
     quiet_hours_start: Optional[str] = None  # HH:MM format
     quiet_hours_end: Optional[str] = None  # HH:MM format
+    timezone: Optional[str] = None  # IANA name, e.g. Asia/Kolkata
     preferred_channel: Optional[str] = None
 
 
@@ -107,6 +111,7 @@ async def get_preferences(
         db.add(prefs)
         await db.commit()
         await db.refresh(prefs)
+        notification_policies.invalidate(current_user.id)
     
     # Convert time to string
     response = NotificationPreferenceResponse(
@@ -119,6 +124,7 @@ async def get_preferences(
         quiet_hours_enabled=prefs.quiet_hours_enabled,
         quiet_hours_start=prefs.quiet_hours_start.strftime("%H:%M") if prefs.quiet_hours_start else None,
         quiet_hours_end=prefs.quiet_hours_end.strftime("%H:%M") if prefs.quiet_hours_end else None,
+        timezone=prefs.timezone,
         preferred_channel=prefs.preferred_channel.value
     )
     
@@ -187,6 +193,16 @@ async def update_preferences(
                 detail="Invalid time format. Use HH:MM (e.g., 07:00)"
             )
     
+    if request.timezone:
+        try:
+            ZoneInfo(request.timezone)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid timezone. Use an IANA name (e.g., Asia/Kolkata)"
+            )
+        prefs.timezone = request.timezone
+    
     # Update preferred channel
     if request.preferred_channel:
         try:
@@ -199,6 +215,7 @@ async def update_preferences(
     
     await db.commit()
     await db.refresh(prefs)
+    notification_policies.invalidate(current_user.id)
     
     # Convert to response
     response = NotificationPreferenceResponse(
@@ -211,6 +228,7 @@ async def update_preferences(
         quiet_hours_enabled=prefs.quiet_hours_enabled,
         quiet_hours_start=prefs.quiet_hours_start.strftime("%H:%M") if prefs.quiet_hours_start else None,
         quiet_hours_end=prefs.quiet_hours_end.strftime("%H:%M") if prefs.quiet_hours_end else None,
+        timezone=prefs.timezone,
         preferred_channel=prefs.preferred_channel.value
     )
     
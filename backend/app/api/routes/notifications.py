@@ -3,11 +3,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from typing import List
 from pydantic import BaseModel, Field
-from datetime import datetime
+from datetime import date, datetime
 from app.core.database import get_db
 from app.models.notification import Notification
 from app.models.user import User, UserRole
 from app.api.dependencies import get_current_user
+from app.services.partitions import hot_window_start
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
@@ -65,11 +66,12 @@ async def get_unread_count(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get count of unread notifications."""
+    """Get count of unread notifications (within the months still kept)."""
     result = await db.execute(
         select(func.count()).select_from(Notification).where(
             Notification.user_id == current_user.id,
-            Notification.is_read == False
+            Notification.is_read == False,
+            Notification.created_at >= hot_window_start("notifications", date.today())
         )
     )
     count = result.scalar()
@@ -80,6 +82,7 @@ async def get_unread_count(
 @router.patch("/{notification_id}/read")
 async def mark_as_read(
     notification_id: int,
+    created_at: datetime = Query(..., alias="createdAt"),  # Partition key, from the listed notification
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -87,6 +90,7 @@ async def mark_as_read(
     result = await db.execute(
         select(Notification).where(
             Notification.id == notification_id,
+            Notification.created_at == created_at,
             Notification.user_id == current_user.id
         )
     )
@@ -3,10 +3,11 @@ Onboarding Routes for SymptoTrack
 Multi-step onboarding process for doctors and patients.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import Optional
+from sqlalchemy import select, update, func, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Optional, Dict, Any
 from datetime import datetime, date, timedelta
 from uuid import UUID
 
@@ -16,6 +17,8 @@ from app.models.user import User, UserRole, RefreshToken
 from app.models.patient import Patient
 from app.models.doctor import Doctor
 from app.schemas.auth import TokenResponse, UserResponse
+from app.services.onboarding_session import OnboardingSession, OnboardingSessionStore
+from app.api.dependencies import require_onboarding_session
 from pydantic import BaseModel, Field, EmailStr, validator
 
 router = APIRouter(prefix="/onboarding", tags=["Onboarding"])
@@ -87,6 +90,7 @@ class DoctorStep2(BaseModel):
     first_name: str = Field(..., min_length=1, max_length=100)
     last_name: str = Field(..., min_length=1, max_length=100)
     gender: str = Field(..., max_length=10)
+    specialization: str = Field("General Physician", max_length=100)
     registration_number: str = Field(..., description="Medical council registration number")
     state_medical_council: str = Field(..., description="State medical council")
     qualification: str = Field(..., min_length=5, max_length=500)
@@ -118,271 +122,470 @@ class DoctorStep5(BaseModel):
 
 
 # ================================
-# Patient Onboarding Endpoints
+# Combined Submission Schemas
 # ================================
 
-@router.post("/patient/step/1", response_model=dict)
-async def patient_onboarding_step1(
-    data: PatientStep1,
-    db: AsyncSession = Depends(get_db)
-):
+class OnboardingStartResponse(BaseModel):
+    """Step 1 response: carries the token for steps 2-5."""
+    success: bool = True
+    message: str
+    user_id: str
+    onboarding_token: str
+
+
+class PatientOnboardingSubmit(BaseModel):
+    """All patient steps in one request (fast mobile clients)."""
+    phone: str = Field(..., description="Phone number in E.164 format")
+    basic: PatientStep2
+    contact: PatientStep3
+    emergency: PatientStep4
+    health: PatientStep5 = Field(default_factory=PatientStep5)
+
+
+class DoctorOnboardingSubmit(BaseModel):
+    """All doctor steps in one request (fast mobile clients)."""
+    phone: str = Field(..., description="Phone number in E.164 format")
+    professional: DoctorStep2
+    consultation: DoctorStep3
+    clinic: DoctorStep4
+    profile: DoctorStep5 = Field(default_factory=DoctorStep5)
+
+
+# ================================
+# Helpers
+# ================================
+
+IdempotencyKey = Header(None, alias="Idempotency-Key")
+
+require_patient_onboarding = require_onboarding_session(UserRole.PATIENT)
+require_doctor_onboarding = require_onboarding_session(UserRole.DOCTOR)
+
+
+def _set_values(**fields) -> Dict[str, Any]:
+    """Drop empty optional fields so they don't overwrite stored values."""
+    return {key: value for key, value in fields.items() if value}
+
+
+def _issue_tokens(db: AsyncSession, user: User) -> TokenResponse:
+    """Create access/refresh tokens; the refresh token is committed by the caller."""
+    access_token = create_access_token({"sub": str(user.id), "role": user.role.value})
+    refresh_token_str = create_refresh_token({"sub": str(user.id)})
+    
+    db.add(RefreshToken(
+        user_id=user.id,
+        token=refresh_token_str,
+        expires_at=datetime.utcnow() + timedelta(days=7)
+    ))
+    
+    return TokenResponse(
+        access_token=access_token,
+        refresh_token=refresh_token_str,
+        user=UserResponse.from_orm(user)
+    )
+
+
+async def _claim_user(
+    phone: str,
+    role: UserRole,
+    is_verified: bool,
+    db: AsyncSession
+) -> int:
     """
-    Patient Onboarding - Step 1: Create user account.
+    Create the user for a phone number, or return the existing one.
     
-    This assumes OTP verification was already done via /auth/verify-otp.
-    Creates a User record with PATIENT role.
+    Existing accounts are never modified here: these endpoints are
+    unauthenticated, so they must not reactivate or change anyone.
+    
+    Raises:
+        HTTPException: 403 if the account is deactivated or deleted,
+            409 if it belongs to another role
     """
-    # Check if phone already exists
     result = await db.execute(
-        select(User).where(User.phone == data.phone, User.is_deleted == False)
+        pg_insert(User)
+        .values(phone=phone, role=role, is_active=True, is_verified=is_verified)
+        .on_conflict_do_nothing(index_elements=[User.phone])
+        .returning(User.id)
     )
-    existing_user = result.scalar_one_or_none()
+    user_id = result.scalar_one_or_none()
+    if user_id is not None:
+        return user_id
     
-    if existing_user:
-        # Check if patient profile already exists
-        result = await db.execute(
-            select(Patient).where(Patient.user_id == existing_user.id, Patient.is_deleted == False)
+    result = await db.execute(
+        select(User.id, User.role, User.is_active, User.is_deleted).where(User.phone == phone)
+    )
+    user_id, existing_role, is_active, is_deleted = result.one()
+    if is_deleted or not is_active:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Account is deactivated"
+        )
+    if existing_role != role:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Phone number is registered with another role"
         )
-        existing_patient = result.scalar_one_or_none()
-        
-        if existing_patient:
+    return user_id
+
+
+async def _start_onboarding(
+    phone: str,
+    role: UserRole,
+    profile_model,
+    db: AsyncSession
+) -> OnboardingStartResponse:
+    """
+    Shared step 1: find or create the user by phone and open an onboarding session.
+    
+    Raises:
+        HTTPException: 409 if the phone already has a profile for this role
+            or belongs to another role, 403 if its account is deactivated
+    """
+    # One round-trip: user plus existing profile (if any)
+    result = await db.execute(
+        select(User.id, User.role, User.is_active, profile_model.id)
+        .outerjoin(profile_model, and_(
+            profile_model.user_id == User.id,
+            profile_model.is_deleted == False
+        ))
+        .where(User.phone == phone, User.is_deleted == False)
+    )
+    row = result.first()
+    
+    if row:
+        user_id, existing_role, is_active, profile_id = row
+        if not is_active:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Account is deactivated"
+            )
+        if existing_role != role:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
-                detail="Patient profile already exists"
+                detail="Phone number is registered with another role"
             )
-        
-        return {
-            "success": True,
-            "message": "User account found. Proceed to step 2.",
-            "user_id": str(existing_user.id)
-        }
-    
-    # Create new user
-    user = User(
-        phone=data.phone,
-        role=UserRole.PATIENT,
-        is_active=True,
-        is_verified=True  # Phone verified via OTP
+        if profile_id is not None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"{role.value.capitalize()} profile already exists"
+            )
+        message = "User account found. Proceed to step 2."
+    else:
+        # Patients are verified via OTP; doctors after NMC check
+        user_id = await _claim_user(phone, role, role == UserRole.PATIENT, db)
+        await db.commit()
+        message = "User account created. Proceed to step 2."
+    
+    session = await OnboardingSessionStore.create(user_id, role.value, phone)
+    
+    return OnboardingStartResponse(
+        message=message,
+        user_id=str(user_id),
+        onboarding_token=session.token
+    )
+
+
+async def _update_profile(
+    profile_model,
+    session: OnboardingSession,
+    values: Dict[str, Any],
+    db: AsyncSession,
+    missing_detail: str
+) -> int:
+    """Single-statement profile update; returns the profile id."""
+    stmt = (
+        update(profile_model)
+        .where(profile_model.user_id == session.user_id, profile_model.is_deleted == False)
+        .values(updated_at=func.now(), **values)
+        .returning(profile_model.id)
+        .execution_options(synchronize_session=False)
+    )
+    profile_id = (await db.execute(stmt)).scalar_one_or_none()
+    
+    if profile_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=missing_detail)
+    
+    return profile_id
+
+
+async def _complete_onboarding(
+    user_id: int,
+    db: AsyncSession,
+    mark_verified: bool
+) -> TokenResponse:
+    """Final step: touch the user and issue tokens in the caller's transaction."""
+    values = {"last_login": datetime.utcnow()}
+    if mark_verified:
+        values["is_verified"] = True
+    
+    result = await db.execute(
+        update(User)
+        .where(User.id == user_id, User.is_deleted == False)
+        .values(**values)
+        .returning(User)
+        .execution_options(synchronize_session=False)
+    )
+    user = result.scalar_one_or_none()
+    
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    
+    return _issue_tokens(db, user)
+
+
+async def _replay_tokens(scope: str, idempotency_key: Optional[str], db: AsyncSession) -> Optional[TokenResponse]:
+    """
+    Answer a repeated completion request with fresh tokens.
+
+    Only the user id is cached for token-issuing steps, never the JWTs
+    themselves, so the replay cache holds no credentials.
+    """
+    cached = await OnboardingSessionStore.replay(scope, idempotency_key)
+    if not cached:
+        return None
+    
+    result = await db.execute(
+        select(User).where(User.id == cached["user_id"], User.is_deleted == False)
     )
-    db.add(user)
+    user = result.scalar_one_or_none()
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    
+    tokens = _issue_tokens(db, user)
     await db.commit()
-    await db.refresh(user)
+    return tokens
+
+
+async def _finish_step(
+    session: OnboardingSession,
+    step: int,
+    idempotency_key: Optional[str],
+    response: Dict[str, Any],
+    profile_id: Optional[int] = None
+) -> Dict[str, Any]:
+    """Record step progress and its idempotent response."""
+    session.mark_step(step, profile_id)
+    await OnboardingSessionStore.save(session)
+    await OnboardingSessionStore.remember(f"{session.session_id}:{step}", idempotency_key, response)
+    return response
+
+
+# ================================
+# Patient Onboarding Endpoints
+# ================================
+
+@router.post("/patient/step/1", response_model=OnboardingStartResponse)
+async def patient_onboarding_step1(
+    data: PatientStep1,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Patient Onboarding - Step 1: Create user account.
     
-    return {
-        "success": True,
-        "message": "User account created. Proceed to step 2.",
-        "user_id": str(user.id)
-    }
+    This assumes OTP verification was already done via /auth/verify-otp.
+    Creates a User record with PATIENT role and returns an onboarding token
+    to send as the X-Onboarding-Token header on steps 2-5.
+    """
+    return await _start_onboarding(data.phone, UserRole.PATIENT, Patient, db)
 
 
 @router.post("/patient/step/2", response_model=dict)
 async def patient_onboarding_step2(
     data: PatientStep2,
-    phone: str,
+    session: OnboardingSession = Depends(require_patient_onboarding),
+    idempotency_key: Optional[str] = IdempotencyKey,
     db: AsyncSession = Depends(get_db)
 ):
     """
     Patient Onboarding - Step 2: Basic information.
     """
-    # Get user by phone
-    result = await db.execute(
-        select(User).where(User.phone == phone, User.is_deleted == False)
-    )
-    user = result.scalar_one_or_none()
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found. Complete step 1 first."
-        )
+    cached = await OnboardingSessionStore.replay(f"{session.session_id}:2", idempotency_key)
+    if cached:
+        return cached
+    
+    values = {
+        "first_name": data.first_name,
+        "last_name": data.last_name,
+        "date_of_birth": data.date_of_birth,
+        "gender": data.gender,
+        "phone": session.phone,
+    }
     
-    # Create or update patient profile
+    # Create or update patient profile in one statement
     result = await db.execute(
-        select(Patient).where(Patient.user_id == user.id, Patient.is_deleted == False)
-    )
-    patient = result.scalar_one_or_none()
-    
-    if patient:
-        # Update existing
-        patient.first_name = data.first_name
-        patient.last_name = data.last_name
-        patient.date_of_birth = data.date_of_birth
-        patient.gender = data.gender
-        patient.phone = phone
-    else:
-        # Create new
-        patient = Patient(
-            user_id=user.id,
-            first_name=data.first_name,
-            last_name=data.last_name,
-            date_of_birth=data.date_of_birth,
-            gender=data.gender,
-            phone=phone
+        pg_insert(Patient)
+        .values(user_id=session.user_id, **values)
+        .on_conflict_do_update(
+            index_elements=[Patient.user_id],
+            set_={**values, "updated_at": func.now()}
         )
-        db.add(patient)
-    
+        .returning(Patient.id)
+    )
+    patient_id = result.scalar_one()
     await db.commit()
     
-    return {
+    return await _finish_step(session, 2, idempotency_key, {
         "success": True,
         "message": "Basic information saved. Proceed to step 3.",
-        "patient_id": str(patient.id)
-    }
+        "patient_id": str(patient_id)
+    }, profile_id=patient_id)
 
 
 @router.post("/patient/step/3", response_model=dict)
 async def patient_onboarding_step3(
     data: PatientStep3,
-    phone: str,
+    session: OnboardingSession = Depends(require_patient_onboarding),
+    idempotency_key: Optional[str] = IdempotencyKey,
     db: AsyncSession = Depends(get_db)
 ):
     """
     Patient Onboarding - Step 3: Contact & address.
     """
-    # Get patient
-    result = await db.execute(
-        select(User).where(User.phone == phone, User.is_deleted == False)
-    )
-    user = result.scalar_one_or_none()
-    
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    
-    result = await db.execute(
-        select(Patient).where(Patient.user_id == user.id, Patient.is_deleted == False)
-    )
-    patient = result.scalar_one_or_none()
-    
-    if not patient:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Complete step 2 first")
-    
-    # Update patient
-    patient.alternate_phone = data.alternate_phone
-    patient.address = data.address
-    patient.city = data.city
-    patient.state = data.state
-    patient.zip_code = data.zip_code
-    patient.country = data.country
-    
+    cached = await OnboardingSessionStore.replay(f"{session.session_id}:3", idempotency_key)
+    if cached:
+        return cached
+    
+    await _update_profile(Patient, session, {
+        "alternate_phone": data.alternate_phone,
+        "address": data.address,
+        "city": data.city,
+        "state": data.state,
+        "zip_code": data.zip_code,
+        "country": data.country,
+    }, db, "Complete step 2 first")
     await db.commit()
     
-    return {
+    return await _finish_step(session, 3, idempotency_key, {
         "success": True,
         "message": "Contact information saved. Proceed to step 4."
-    }
+    })
 
 
 @router.post("/patient/step/4", response_model=dict)
 async def patient_onboarding_step4(
     data: PatientStep4,
-    phone: str,
+    session: OnboardingSession = Depends(require_patient_onboarding),
+    idempotency_key: Optional[str] = IdempotencyKey,
     db: AsyncSession = Depends(get_db)
 ):
     """
     Patient Onboarding - Step 4: Emergency contact & health basics.
     """
-    # Get patient
-    result = await db.execute(
-        select(User).where(User.phone == phone, User.is_deleted == False)
-    )
-    user = result.scalar_one_or_none()
-    
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    
-    result = await db.execute(
-        select(Patient).where(Patient.user_id == user.id, Patient.is_deleted == False)
-    )
-    patient = result.scalar_one_or_none()
-    
-    if not patient:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Complete previous steps first")
-    
-    # Update patient
-    patient.emergency_contact_name = data.emergency_contact_name
-    patient.emergency_contact_phone = data.emergency_contact_phone
-    patient.blood_group = data.blood_group
-    
+    cached = await OnboardingSessionStore.replay(f"{session.session_id}:4", idempotency_key)
+    if cached:
+        return cached
+    
+    await _update_profile(Patient, session, {
+        "emergency_contact_name": data.emergency_contact_name,
+        "emergency_contact_phone": data.emergency_contact_phone,
+        "blood_group": data.blood_group,
+    }, db, "Complete previous steps first")
     await db.commit()
     
-    return {
+    return await _finish_step(session, 4, idempotency_key, {
         "success": True,
         "message": "Emergency contact saved. Proceed to step 5 or complete onboarding."
-    }
+    })
 
 
 @router.post("/patient/step/5", response_model=TokenResponse)
 async def patient_onboarding_step5(
     data: PatientStep5,
-    phone: str,
+    session: OnboardingSession = Depends(require_patient_onboarding),
+    idempotency_key: Optional[str] = IdempotencyKey,
     db: AsyncSession = Depends(get_db)
 ):
     """
     Patient Onboarding - Step 5: Health profile (optional) & complete onboarding.
     
+    Profile update, user update and refresh token are committed together.
     Returns JWT tokens on completion.
     """
-    # Get patient
-    result = await db.execute(
-        select(User).where(User.phone == phone, User.is_deleted == False)
-    )
-    user = result.scalar_one_or_none()
-    
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    replayed = await _replay_tokens(f"{session.session_id}:5", idempotency_key, db)
+    if replayed:
+        return replayed
+    
+    await _update_profile(Patient, session, _set_values(
+        known_allergies=data.known_allergies,
+        chronic_conditions=data.chronic_conditions,
+        caregiver_name=data.caregiver_name,
+        caregiver_phone=data.caregiver_phone,
+        profile_picture=data.profile_picture,
+    ), db, "Complete previous steps first")
+    
+    tokens = await _complete_onboarding(session.user_id, db, mark_verified=True)
+    await db.commit()
     
-    result = await db.execute(
-        select(Patient).where(Patient.user_id == user.id, Patient.is_deleted == False)
-    )
-    patient = result.scalar_one_or_none()
-    
-    if not patient:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Complete previous steps first")
-    
-    # Update optional fields
-    if data.known_allergies:
-        patient.known_allergies = data.known_allergies
-    if data.chronic_conditions:
-        patient.chronic_conditions = data.chronic_conditions
-    if data.caregiver_name:
-        patient.caregiver_name = data.caregiver_name
-    if data.caregiver_phone:
-        patient.caregiver_phone = data.caregiver_phone
-    if data.profile_picture:
-        patient.profile_picture = data.profile_picture
-    
-    # Mark onboarding complete
-    user.is_verified = True
-    user.last_login = datetime.utcnow()
+    await _finish_step(session, 5, idempotency_key, {"user_id": session.user_id})
+    return tokens
+
+
+@router.post("/patient/submit", response_model=TokenResponse)
+async def patient_onboarding_submit(
+    data: PatientOnboardingSubmit,
+    idempotency_key: Optional[str] = IdempotencyKey,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Patient Onboarding - all steps in a single round-trip.
     
-    await db.commit()
-    await db.refresh(user)
+    Creates the user (if needed) and the full patient profile in one
+    transaction and returns JWT tokens.
+    """
+    scope = f"patient-submit:{data.phone}"
+    replayed = await _replay_tokens(scope, idempotency_key, db)
+    if replayed:
+        return replayed
     
-    # Generate tokens
-    access_token = create_access_token({"sub": str(user.id), "role": user.role.value})
-    refresh_token_str = create_refresh_token({"sub": str(user.id)})
+    user_id = await _claim_user(data.phone, UserRole.PATIENT, True, db)
     
-    # Store refresh token
-    refresh_token = RefreshToken(
-        user_id=user.id,
-        token=refresh_token_str,
-        expires_at=datetime.utcnow() + timedelta(days=7)
+    result = await db.execute(
+        pg_insert(Patient)
+        .values(
+            user_id=user_id,
+            phone=data.phone,
+            first_name=data.basic.first_name,
+            last_name=data.basic.last_name,
+            date_of_birth=data.basic.date_of_birth,
+            gender=data.basic.gender,
+            alternate_phone=data.contact.alternate_phone,
+            address=data.contact.address,
+            city=data.contact.city,
+            state=data.contact.state,
+            zip_code=data.contact.zip_code,
+            country=data.contact.country,
+            emergency_contact_name=data.emergency.emergency_contact_name,
+            emergency_contact_phone=data.emergency.emergency_contact_phone,
+            blood_group=data.emergency.blood_group,
+            known_allergies=data.health.known_allergies,
+            chronic_conditions=data.health.chronic_conditions,
+            caregiver_name=data.health.caregiver_name,
+            caregiver_phone=data.health.caregiver_phone,
+            profile_picture=data.health.profile_picture,
+        )
+        .on_conflict_do_nothing(index_elements=[Patient.user_id])
+        .returning(Patient.id)
     )
-    db.add(refresh_token)
+    if result.scalar_one_or_none() is None:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Patient profile already exists"
+        )
+    
+    tokens = await _complete_onboarding(user_id, db, mark_verified=True)
     await db.commit()
     
-    return TokenResponse(
-        access_token=access_token,
-        refresh_token=refresh_token_str,
-        user=UserResponse.from_orm(user)
-    )
+    await OnboardingSessionStore.remember(scope, idempotency_key, {"user_id": user_id})
+    return tokens
 
 
 # ================================
 # Doctor Onboarding Endpoints
 # ================================
 
-@router.post("/doctor/step/1", response_model=dict)
+@router.post("/doctor/step/1", response_model=OnboardingStartResponse)
 async def doctor_onboarding_step1(
     data: DoctorStep1,
     db: AsyncSession = Depends(get_db)
@@ -391,268 +594,224 @@ async def doctor_onboarding_step1(
     Doctor Onboarding - Step 1: Create user account.
     
     This assumes OTP verification was already done via /auth/verify-otp.
-    Creates a User record with DOCTOR role.
+    Creates a User record with DOCTOR role and returns an onboarding token
+    to send as the X-Onboarding-Token header on steps 2-5.
     """
-    # Check if phone already exists
-    result = await db.execute(
-        select(User).where(User.phone == data.phone, User.is_deleted == False)
-    )
-    existing_user = result.scalar_one_or_none()
-    
-    if existing_user:
-        # Check if doctor profile already exists
-        result = await db.execute(
-            select(Doctor).where(Doctor.user_id == existing_user.id, Doctor.is_deleted == False)
-        )
-        existing_doctor = result.scalar_one_or_none()
-        
-        if existing_doctor:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="Doctor profile already exists"
-            )
-        
-        return {
-            "success": True,
-            "message": "User account found. Proceed to step 2.",
-            "user_id": str(existing_user.id)
-        }
-    
-    # Create new user
-    user = User(
-        phone=data.phone,
-        role=UserRole.DOCTOR,
-        is_active=True,
-        is_verified=False  # Will be verified after NMC check
-    )
-    db.add(user)
-    await db.commit()
-    await db.refresh(user)
-    
-    return {
-        "success": True,
-        "message": "User account created. Proceed to step 2.",
-        "user_id": str(user.id)
-    }
+    return await _start_onboarding(data.phone, UserRole.DOCTOR, Doctor, db)
 
 
 @router.post("/doctor/step/2", response_model=dict)
 async def doctor_onboarding_step2(
     data: DoctorStep2,
-    phone: str,
+    session: OnboardingSession = Depends(require_doctor_onboarding),
+    idempotency_key: Optional[str] = IdempotencyKey,
     db: AsyncSession = Depends(get_db)
 ):
     """
     Doctor Onboarding - Step 2: Personal & professional info.
     """
-    # Get user by phone
-    result = await db.execute(
-        select(User).where(User.phone == phone, User.is_deleted == False)
-    )
-    user = result.scalar_one_or_none()
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found. Complete step 1 first."
-        )
+    cached = await OnboardingSessionStore.replay(f"{session.session_id}:2", idempotency_key)
+    if cached:
+        return cached
+    
+    values = {
+        "first_name": data.first_name,
+        "last_name": data.last_name,
+        "gender": data.gender,
+        "phone": session.phone,
+        "specialization": data.specialization,
+        "registration_number": data.registration_number,
+        "state_medical_council": data.state_medical_council,
+        "qualification": data.qualification,
+        "experience_years": data.experience_years,
+    }
     
-    # Check if registration number already exists
-    result = await db.execute(
-        select(Doctor).where(
+    registration_taken = await db.execute(
+        select(Doctor.id).where(
             Doctor.registration_number == data.registration_number,
+            Doctor.user_id != session.user_id,
             Doctor.is_deleted == False
         )
     )
-    existing_doctor = result.scalar_one_or_none()
-    
-    if existing_doctor:
+    if registration_taken.first():
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Registration number already exists"
         )
     
-    # Create or update doctor profile
+    # Create or update doctor profile in one statement
     result = await db.execute(
-        select(Doctor).where(Doctor.user_id == user.id, Doctor.is_deleted == False)
-    )
-    doctor = result.scalar_one_or_none()
-    
-    if doctor:
-        # Update existing
-        doctor.first_name = data.first_name
-        doctor.last_name = data.last_name
-        doctor.gender = data.gender
-        doctor.phone = phone
-        doctor.registration_number = data.registration_number
-        doctor.state_medical_council = data.state_medical_council
-        doctor.qualification = data.qualification
-        doctor.experience_years = data.experience_years
-    else:
-        # Create new
-        doctor = Doctor(
-            user_id=user.id,
-            first_name=data.first_name,
-            last_name=data.last_name,
-            gender=data.gender,
-            phone=phone,
-            registration_number=data.registration_number,
-            state_medical_council=data.state_medical_council,
-            qualification=data.qualification,
-            experience_years=data.experience_years,
-            consultation_fee=0  # Will be set in step 3
+        pg_insert(Doctor)
+        .values(user_id=session.user_id, consultation_fee=0, **values)
+        .on_conflict_do_update(
+            index_elements=[Doctor.user_id],
+            set_={**values, "updated_at": func.now()}
         )
-        db.add(doctor)
-    
+        .returning(Doctor.id)
+    )
+    doctor_id = result.scalar_one()
     await db.commit()
     
-    return {
+    return await _finish_step(session, 2, idempotency_key, {
         "success": True,
         "message": "Professional information saved. Proceed to step 3.",
-        "doctor_id": str(doctor.id)
-    }
+        "doctor_id": str(doctor_id)
+    }, profile_id=doctor_id)
 
 
 @router.post("/doctor/step/3", response_model=dict)
 async def doctor_onboarding_step3(
     data: DoctorStep3,
-    phone: str,
+    session: OnboardingSession = Depends(require_doctor_onboarding),
+    idempotency_key: Optional[str] = IdempotencyKey,
     db: AsyncSession = Depends(get_db)
 ):
     """
     Doctor Onboarding - Step 3: Specialization & consultation details.
     """
-    # Get doctor
-    result = await db.execute(
-        select(User).where(User.phone == phone, User.is_deleted == False)
-    )
-    user = result.scalar_one_or_none()
-    
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == user.id, Doctor.is_deleted == False)
-    )
-    doctor = result.scalar_one_or_none()
-    
-    if not doctor:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Complete step 2 first")
-    
-    # Update doctor
-    doctor.consultation_fee = data.consultation_fee
-    if data.about:
-        doctor.about = data.about
+    cached = await OnboardingSessionStore.replay(f"{session.session_id}:3", idempotency_key)
+    if cached:
+        return cached
     
     # TODO: Handle specialization_ids by creating DoctorSpecialization records
     # For now, we'll skip this as it requires the DoctorSpecialization model
-    
+    await _update_profile(Doctor, session, {
+        "consultation_fee": data.consultation_fee,
+        **_set_values(about=data.about),
+    }, db, "Complete step 2 first")
     await db.commit()
     
-    return {
+    return await _finish_step(session, 3, idempotency_key, {
         "success": True,
         "message": "Consultation details saved. Proceed to step 4."
-    }
+    })
 
 
 @router.post("/doctor/step/4", response_model=dict)
 async def doctor_onboarding_step4(
     data: DoctorStep4,
-    phone: str,
+    session: OnboardingSession = Depends(require_doctor_onboarding),
+    idempotency_key: Optional[str] = IdempotencyKey,
     db: AsyncSession = Depends(get_db)
 ):
     """
     Doctor Onboarding - Step 4: Clinic information.
     """
-    # Get doctor
-    result = await db.execute(
-        select(User).where(User.phone == phone, User.is_deleted == False)
-    )
-    user = result.scalar_one_or_none()
-    
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == user.id, Doctor.is_deleted == False)
-    )
-    doctor = result.scalar_one_or_none()
-    
-    if not doctor:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Complete previous steps first")
-    
-    # Update doctor with clinic info
-    doctor.clinic_name = data.clinic_name
-    doctor.clinic_address = data.clinic_address
+    cached = await OnboardingSessionStore.replay(f"{session.session_id}:4", idempotency_key)
+    if cached:
+        return cached
     
     # TODO: Create Clinic record
     # For now, store in doctor record
-    
+    await _update_profile(Doctor, session, {
+        "clinic_name": data.clinic_name,
+        "clinic_address": data.clinic_address,
+    }, db, "Complete previous steps first")
     await db.commit()
     
-    return {
+    return await _finish_step(session, 4, idempotency_key, {
         "success": True,
         "message": "Clinic information saved. Proceed to step 5 or complete onboarding."
-    }
+    })
 
 
 @router.post("/doctor/step/5", response_model=TokenResponse)
 async def doctor_onboarding_step5(
     data: DoctorStep5,
-    phone: str,
+    session: OnboardingSession = Depends(require_doctor_onboarding),
+    idempotency_key: Optional[str] = IdempotencyKey,
     db: AsyncSession = Depends(get_db)
 ):
     """
     Doctor Onboarding - Step 5: Profile & verification (optional) & complete onboarding.
     
+    Profile update, user update and refresh token are committed together.
     Returns JWT tokens on completion.
     """
-    # Get doctor
-    result = await db.execute(
-        select(User).where(User.phone == phone, User.is_deleted == False)
-    )
-    user = result.scalar_one_or_none()
+    replayed = await _replay_tokens(f"{session.session_id}:5", idempotency_key, db)
+    if replayed:
+        return replayed
+    
+    await _update_profile(Doctor, session, _set_values(
+        profile_picture=data.profile_picture,
+        clinic_logo=data.clinic_logo,
+        hfr_id=data.hfr_id,
+    ), db, "Complete previous steps first")
+    
+    # Onboarding complete (pending verification)
+    tokens = await _complete_onboarding(session.user_id, db, mark_verified=False)
+    await db.commit()
     
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    await _finish_step(session, 5, idempotency_key, {"user_id": session.user_id})
+    return tokens
+
+
+@router.post("/doctor/submit", response_model=TokenResponse)
+async def doctor_onboarding_submit(
+    data: DoctorOnboardingSubmit,
+    idempotency_key: Optional[str] = IdempotencyKey,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Doctor Onboarding - all steps in a single round-trip.
     
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == user.id, Doctor.is_deleted == False)
+    Creates the user (if needed) and the full doctor profile in one
+    transaction and returns JWT tokens. The account stays unverified
+    until the NMC check.
+    """
+    scope = f"doctor-submit:{data.phone}"
+    replayed = await _replay_tokens(scope, idempotency_key, db)
+    if replayed:
+        return replayed
+    
+    registration_taken = await db.execute(
+        select(Doctor.id).where(
+            Doctor.registration_number == data.professional.registration_number,
+            Doctor.is_deleted == False
+        )
     )
-    doctor = result.scalar_one_or_none()
-    
-    if not doctor:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Complete previous steps first")
-    
-    # Update optional fields
-    if data.profile_picture:
-        doctor.profile_picture = data.profile_picture
-    if data.clinic_logo:
-        doctor.clinic_logo = data.clinic_logo
-    if data.hfr_id:
-        doctor.hfr_id = data.hfr_id
-    
-    # Mark onboarding complete (pending verification)
-    user.last_login = datetime.utcnow()
-    
-    await db.commit()
-    await db.refresh(user)
+    if registration_taken.first():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Registration number already exists"
+        )
     
-    # Generate tokens
-    access_token = create_access_token({"sub": str(user.id), "role": user.role.value})
-    refresh_token_str = create_refresh_token({"sub": str(user.id)})
+    user_id = await _claim_user(data.phone, UserRole.DOCTOR, False, db)
     
-    # Store refresh token
-    refresh_token = RefreshToken(
-        user_id=user.id,
-        token=refresh_token_str,
-        expires_at=datetime.utcnow() + timedelta(days=7)
+    professional = data.professional
+    result = await db.execute(
+        pg_insert(Doctor)
+        .values(
+            user_id=user_id,
+            phone=data.phone,
+            first_name=professional.first_name,
+            last_name=professional.last_name,
+            gender=professional.gender,
+            specialization=professional.specialization,
+            registration_number=professional.registration_number,
+            state_medical_council=professional.state_medical_council,
+            qualification=professional.qualification,
+            experience_years=professional.experience_years,
+            consultation_fee=data.consultation.consultation_fee,
+            about=data.consultation.about,
+            clinic_name=data.clinic.clinic_name,
+            clinic_address=data.clinic.clinic_address,
+            profile_picture=data.profile.profile_picture,
+            clinic_logo=data.profile.clinic_logo,
+            hfr_id=data.profile.hfr_id,
+        )
+        .on_conflict_do_nothing(index_elements=[Doctor.user_id])
+        .returning(Doctor.id)
     )
-    db.add(refresh_token)
+    if result.scalar_one_or_none() is None:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Doctor profile already exists"
+        )
+    
+    tokens = await _complete_onboarding(user_id, db, mark_verified=False)
     await db.commit()
     
-    return TokenResponse(
-        access_token=access_token,
-        refresh_token=refresh_token_str,
-        user=UserResponse.from_orm(user)
-    )
+    await OnboardingSessionStore.remember(scope, idempotency_key, {"user_id": user_id})
+    return tokens
@@ -3,7 +3,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List
 from app.core.database import get_db
-from app.api.dependencies import get_current_user
+from app.core.responses import RowsResponse, row_dicts
+from app.api.dependencies import Identity, get_current_user, get_identity
 from app.models.user import User, UserRole
 from app.models.patient import Patient
 from pydantic import BaseModel
@@ -39,6 +40,9 @@ class PatientsListResponse(BaseModel):
     total: int
 
 
+PATIENT_COLUMNS = tuple(getattr(Patient, name) for name in PatientResponse.model_fields)
+
+
 @router.get("", response_model=PatientsListResponse)
 async def get_patients(
     current_user: User = Depends(get_current_user),
@@ -52,33 +56,26 @@ async def get_patients(
             detail="Not authorized to view patients"
         )
     
-    # Get all patients
+    # Get all patients, serialized straight from the selected columns
     result = await db.execute(
-        select(Patient).order_by(Patient.first_name, Patient.last_name)
+        select(*PATIENT_COLUMNS).order_by(Patient.first_name, Patient.last_name)
     )
-    patients = result.scalars().all()
+    patients = row_dicts(result)
     
-    return PatientsListResponse(
-        patients=[PatientResponse.model_validate(p) for p in patients],
-        total=len(patients)
-    )
+    return RowsResponse({"patients": patients, "total": len(patients)})
 
 
 @router.get("/{patient_id}", response_model=PatientResponse)
 async def get_patient(
     patient_id: int,
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """Get a single patient by ID."""
     # Patients can only view their own profile
     if current_user.role == UserRole.PATIENT:
-        # Get the patient record for this user
-        result = await db.execute(
-            select(Patient).where(Patient.user_id == current_user.id)
-        )
-        patient = result.scalar_one_or_none()
-        if not patient or patient.id != patient_id:
+        if identity.patient_id is None or identity.patient_id != patient_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to view this patient"
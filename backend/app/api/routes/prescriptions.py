@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List, Optional
 from pydantic import BaseModel, Field
-from datetime import date
-from app.core.database import get_db
+from datetime import date, datetime
+from app.core.database import get_db, get_read_db
+from app.core.responses import RowsResponse, row_dicts
 from app.models.medical import Prescription, MedicalRecord
 from app.models.user import User, UserRole
 from app.models.doctor import Doctor
@@ -13,8 +14,10 @@ from app.schemas.prescription import (
     PrescriptionCreate, PrescriptionResponse, PrescriptionUpdate,
     MedicalRecordCreate, MedicalRecordResponse, MedicalRecordUpdate
 )
-from app.api.dependencies import get_current_user
+from app.api.dependencies import Identity, get_current_user, get_identity
 from app.services.celery_tasks import send_prescription_notification_email
+from app.services.medicine_index import medicine_index
+from app.services.patient_sync import PatientSync
 
 router = APIRouter(tags=["Prescriptions"])
 
@@ -38,24 +41,38 @@ class PrescriptionsListResponse(BaseModel):
     prescriptions: List[PrescriptionResponse]
 
 
+# List endpoints select just the response fields; the frontend aliases
+# mirror PrescriptionResponse.from_model
+PRESCRIPTION_ALIASES = {"diagnosis": "medication_name", "appointment_date": "prescribed_date", "notes": "instructions"}
+PRESCRIPTION_COLUMNS = tuple(
+    getattr(Prescription, PRESCRIPTION_ALIASES.get(name, name)).label(name)
+    for name in PrescriptionResponse.model_fields
+)
+MEDICAL_RECORD_COLUMNS = tuple(getattr(MedicalRecord, name) for name in MedicalRecordResponse.model_fields)
+
+
 @router.get("/prescriptions", response_model=PrescriptionsListResponse)
 async def get_prescriptions(
+    request: Request,
     patient_id: Optional[int] = Query(None, alias="patientId"),
+    since: Optional[datetime] = Query(None, description="Sync watermark: only rows changed or deleted after it"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    identity: Identity = Depends(get_identity),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get prescriptions for a patient."""
-    query = select(Prescription)
+    """
+    Get prescriptions for a patient.
+
+    Lists of one patient support If-None-Match / If-Modified-Since (304)
+    and ?since= delta sync (see app/services/patient_sync.py).
+    """
+    query = select(*PRESCRIPTION_COLUMNS)
     
     # If patientId is provided, filter by it
     if patient_id:
         # Verify authorization
         if current_user.role == UserRole.PATIENT:
-            result = await db.execute(
-                select(Patient).where(Patient.user_id == current_user.id)
-            )
-            patient = result.scalar_one_or_none()
-            if not patient or patient.id != patient_id:
+            if identity.patient_id is None or identity.patient_id != patient_id:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Not authorized to view these prescriptions"
@@ -63,23 +80,15 @@ async def get_prescriptions(
         query = query.where(Prescription.patient_id == patient_id)
     elif current_user.role == UserRole.PATIENT:
         # No patientId provided, get for current user
-        result = await db.execute(
-            select(Patient).where(Patient.user_id == current_user.id)
-        )
-        patient = result.scalar_one_or_none()
-        if not patient:
+        if identity.patient_id is None:
             return {"prescriptions": []}
-        query = query.where(Prescription.patient_id == patient.id)
+        query = query.where(Prescription.patient_id == identity.patient_id)
     
     elif current_user.role == UserRole.DOCTOR:
         # Get doctor's prescribed medications
-        result = await db.execute(
-            select(Doctor).where(Doctor.user_id == current_user.id)
-        )
-        doctor = result.scalar_one_or_none()
-        if not doctor:
+        if identity.doctor_id is None:
             return {"prescriptions": []}
-        query = query.where(Prescription.doctor_id == doctor.id)
+        query = query.where(Prescription.doctor_id == identity.doctor_id)
     
     elif current_user.role in [UserRole.ADMIN, UserRole.STAFF]:
         # Admins and staff can see all
@@ -87,49 +96,59 @@ async def get_prescriptions(
     else:
         return {"prescriptions": []}
     
+    sync_patient_id = patient_id or (identity.patient_id if current_user.role == UserRole.PATIENT else None)
+    if since and not sync_patient_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="since requires a single patient's prescriptions"
+        )
+    headers = None
+    if sync_patient_id:
+        sync = await PatientSync.state(db, sync_patient_id)
+        if since:
+            return await PatientSync.delta(
+                db, request, sync, since, "prescriptions", select(*PRESCRIPTION_COLUMNS), Prescription
+            )
+        not_modified = PatientSync.not_modified(request, sync)
+        if not_modified:
+            return not_modified
+        headers = PatientSync.headers(request, sync)
+    
     result = await db.execute(query.order_by(Prescription.prescribed_date.desc()))
-    prescriptions = result.scalars().all()
-    return {"prescriptions": [PrescriptionResponse.from_model(p) for p in prescriptions]}
+    return RowsResponse({"prescriptions": row_dicts(result)}, headers=headers)
 
 
 @router.get("/prescriptions/active", response_model=PrescriptionsListResponse)
 async def get_active_prescriptions(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    identity: Identity = Depends(get_identity),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get active prescriptions (prescribed in last 90 days)."""
     from datetime import date, timedelta
     
     cutoff_date = date.today() - timedelta(days=90)
-    query = select(Prescription).where(Prescription.prescribed_date >= cutoff_date)
+    query = select(*PRESCRIPTION_COLUMNS).where(Prescription.prescribed_date >= cutoff_date)
     
     if current_user.role == UserRole.PATIENT:
-        result = await db.execute(
-            select(Patient).where(Patient.user_id == current_user.id)
-        )
-        patient = result.scalar_one_or_none()
-        if not patient:
+        if identity.patient_id is None:
             return {"prescriptions": []}
-        query = query.where(Prescription.patient_id == patient.id)
+        query = query.where(Prescription.patient_id == identity.patient_id)
     
     elif current_user.role == UserRole.DOCTOR:
-        result = await db.execute(
-            select(Doctor).where(Doctor.user_id == current_user.id)
-        )
-        doctor = result.scalar_one_or_none()
-        if not doctor:
+        if identity.doctor_id is None:
             return {"prescriptions": []}
-        query = query.where(Prescription.doctor_id == doctor.id)
+        query = query.where(Prescription.doctor_id == identity.doctor_id)
     
     result = await db.execute(query.order_by(Prescription.prescribed_date.desc()))
-    prescriptions = result.scalars().all()
-    return {"prescriptions": [PrescriptionResponse.from_model(p) for p in prescriptions]}
+    return RowsResponse({"prescriptions": row_dicts(result)})
 
 
 @router.get("/prescriptions/{prescription_id}", response_model=PrescriptionResponse)
 async def get_prescription(
     prescription_id: int,
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific prescription by ID."""
@@ -146,21 +165,13 @@ async def get_prescription(
     
     # Check permissions
     if current_user.role == UserRole.PATIENT:
-        result = await db.execute(
-            select(Patient).where(Patient.user_id == current_user.id)
-        )
-        patient = result.scalar_one_or_none()
-        if not patient or prescription.patient_id != patient.id:
+        if identity.patient_id is None or prescription.patient_id != identity.patient_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to view this prescription"
             )
     elif current_user.role == UserRole.DOCTOR:
-        result = await db.execute(
-            select(Doctor).where(Doctor.user_id == current_user.id)
-        )
-        doctor = result.scalar_one_or_none()
-        if not doctor or prescription.doctor_id != doctor.id:
+        if identity.doctor_id is None or prescription.doctor_id != identity.doctor_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to view this prescription"
@@ -208,6 +219,7 @@ async def create_prescription(
     db.add(prescription)
     await db.commit()
     await db.refresh(prescription)
+    medicine_index.record_prescription(doctor.id, prescription.medication_name)
     
     # Send email notification to patient
     try:
@@ -247,28 +259,21 @@ async def create_prescription(
 @router.get("/medical-history", response_model=List[MedicalRecordResponse])
 async def get_medical_history(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    identity: Identity = Depends(get_identity),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get medical history for current user."""
-    query = select(MedicalRecord)
+    query = select(*MEDICAL_RECORD_COLUMNS)
     
     if current_user.role == UserRole.PATIENT:
-        result = await db.execute(
-            select(Patient).where(Patient.user_id == current_user.id)
-        )
-        patient = result.scalar_one_or_none()
-        if not patient:
+        if identity.patient_id is None:
             return []
-        query = query.where(MedicalRecord.patient_id == patient.id)
+        query = query.where(MedicalRecord.patient_id == identity.patient_id)
     
     elif current_user.role == UserRole.DOCTOR:
-        result = await db.execute(
-            select(Doctor).where(Doctor.user_id == current_user.id)
-        )
-        doctor = result.scalar_one_or_none()
-        if not doctor:
+        if identity.doctor_id is None:
             return []
-        query = query.where(MedicalRecord.doctor_id == doctor.id)
+        query = query.where(MedicalRecord.doctor_id == identity.doctor_id)
     
     elif current_user.role in [UserRole.ADMIN, UserRole.STAFF]:
         # Admins can see all records
@@ -277,8 +282,7 @@ async def get_medical_history(
         return []
     
     result = await db.execute(query.order_by(MedicalRecord.visit_date.desc()))
-    records = result.scalars().all()
-    return records
+    return RowsResponse(row_dicts(result))
 
 
 @router.post("/medical-history", response_model=MedicalRecordResponse, status_code=status.HTTP_201_CREATED)
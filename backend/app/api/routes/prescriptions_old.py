@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from typing import List, Optional
@@ -20,6 +20,7 @@ from app.schemas.prescription import (
 )
 from app.api.dependencies import get_current_user
 from app.services.prescription_service import prescription_service
+from app.services.blob_storage import BlobStorage, is_blob_key
 import json
 
 router = APIRouter(prefix="/prescriptions", tags=["Prescriptions"])
@@ -465,7 +466,14 @@ async def get_prescription_pdf(
         user_role=current_user.role.value
     )
     
-    # Return file
+    # Content-addressed PDFs are served from blob storage via a short-lived URL
+    if is_blob_key(pdf_path):
+        return RedirectResponse(
+            BlobStorage.signed_url(pdf_path, "application/pdf", f"prescription_{prescription_id}.pdf"),
+            status_code=status.HTTP_307_TEMPORARY_REDIRECT
+        )
+    
+    # Return file (PDFs generated before blob storage)
     import os
     if not os.path.exists(pdf_path):
         raise HTTPException(
@@ -3,15 +3,16 @@ API Routes for Reminders
 Sprint 2.1: Reminder Engine Core
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_
-from typing import List, Optional
-from uuid import UUID
+from typing import Dict, List, Literal, Optional
 from datetime import date, datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.responses import RowsResponse
 from app.models.user import User, UserRole
 from app.models.patient import Patient
 from app.models.reminder import (
@@ -23,18 +24,22 @@ from app.models.reminder import (
     MedicineReminderLog
 )
 from app.services.reminder_service import ReminderService
-from app.api.dependencies import get_current_user
+from app.services.patient_sync import PatientSync
+from app.services.reminder_sync import ReminderSync
+from app.services.frequency_registry import merge_timing_overrides
+from app.api.dependencies import Identity, get_current_user, get_identity
 
 router = APIRouter(prefix="/reminders", tags=["Reminders"])
 
 
 # Request/Response Models
 class MedicineReminderResponse(BaseModel):
-    id: UUID
-    prescription_id: UUID
+    id: int
+    prescription_id: int
     medicine_name: str
     dosage: str
     frequency_code: str
+    slot_mask: int
     timing_slots: List[dict]
     start_date: date
     end_date: date
@@ -48,9 +53,9 @@ class MedicineReminderResponse(BaseModel):
 
 
 class FollowUpReminderResponse(BaseModel):
-    id: UUID
-    prescription_id: UUID
-    doctor_id: UUID
+    id: int
+    prescription_id: int
+    doctor_id: int
     follow_up_date: date
     status: str
     reminder_7day_sent: bool
@@ -62,9 +67,9 @@ class FollowUpReminderResponse(BaseModel):
 
 
 class TestReminderResponse(BaseModel):
-    id: UUID
-    prescription_id: UUID
-    test_order_id: UUID
+    id: int
+    prescription_id: int
+    test_order_id: int
     test_name: str
     follow_up_date: Optional[date]
     upload_status: str
@@ -85,16 +90,44 @@ class SnoozeRequest(BaseModel):
     snooze_minutes: int = 15
 
 
+class TimingOverrideRequest(BaseModel):
+    """Patient-specific slot times, e.g. {"night": "22:30"}."""
+    timing_overrides: Dict[str, str]
+
+
+class SyncOperationRequest(BaseModel):
+    """An action the app queued while offline."""
+    idempotency_key: str = Field(..., min_length=1, max_length=64)  # Generated by the app, reused on retries
+    op: Literal["taken", "missed", "snooze", "timings"]
+    reminder_id: int
+    at: Optional[datetime] = None  # When the patient acted; defaults to the sync time
+    scheduled_time: Optional[datetime] = None  # Dose the action is for
+    snooze_minutes: int = Field(15, ge=1, le=720)
+    timing_overrides: Optional[Dict[str, str]] = None  # For "timings"
+
+
+class ReminderSyncRequest(BaseModel):
+    """Queued operations (oldest first) and the checkpoint of the last sync."""
+    checkpoint: Optional[datetime] = None
+    operations: List[SyncOperationRequest] = Field(default_factory=list, max_length=settings.SYNC_MAX_OPERATIONS)
+
+
 @router.get("/medicines", response_model=List[MedicineReminderResponse])
 async def get_medicine_reminders(
+    request: Request,
+    response: Response,
     active_only: bool = Query(True, description="Only show active reminders"),
+    since: Optional[datetime] = Query(None, description="Sync watermark: only reminders changed or deleted after it"),
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get medicine reminders for current patient.
     
     Returns list of active medicine reminders with timing information.
+    Supports If-None-Match / If-Modified-Since (304) and ?since= delta
+    sync, which ignores active_only (see app/services/patient_sync.py).
     """
     if current_user.role != UserRole.PATIENT:
         raise HTTPException(
@@ -103,19 +136,27 @@ async def get_medicine_reminders(
         )
     
     # Get patient
-    result = await db.execute(
-        select(Patient).where(Patient.user_id == current_user.id)
-    )
-    patient = result.scalar_one_or_none()
-    if not patient:
+    if identity.patient_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Patient profile not found"
         )
     
+    sync = await PatientSync.state(db, identity.patient_id)
+    if since:
+        return await PatientSync.delta(
+            db, request, sync, since, "reminders", select(MedicineReminder), MedicineReminder,
+            serialize=lambda result: [
+                MedicineReminderResponse.model_validate(r).model_dump() for r in result.scalars()
+            ]
+        )
+    not_modified = PatientSync.not_modified(request, sync)
+    if not_modified:
+        return not_modified
+    
     # Build query
     query = select(MedicineReminder).where(
-        MedicineReminder.patient_id == patient.id
+        MedicineReminder.patient_id == identity.patient_id
     )
     
     if active_only:
@@ -131,14 +172,17 @@ async def get_medicine_reminders(
     result = await db.execute(query)
     reminders = result.scalars().all()
     
+    for name, value in PatientSync.headers(request, sync).items():
+        response.headers[name] = value
     return reminders
 
 
 @router.post("/medicines/{reminder_id}/taken")
 async def mark_medicine_taken(
-    reminder_id: UUID,
+    reminder_id: int,
     request: MarkTakenRequest,
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -153,11 +197,7 @@ async def mark_medicine_taken(
         )
     
     # Get patient
-    result = await db.execute(
-        select(Patient).where(Patient.user_id == current_user.id)
-    )
-    patient = result.scalar_one_or_none()
-    if not patient:
+    if identity.patient_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Patient profile not found"
@@ -168,7 +208,7 @@ async def mark_medicine_taken(
         select(MedicineReminder).where(
             and_(
                 MedicineReminder.id == reminder_id,
-                MedicineReminder.patient_id == patient.id
+                MedicineReminder.patient_id == identity.patient_id
             )
         )
     )
@@ -204,9 +244,10 @@ async def mark_medicine_taken(
 
 @router.post("/medicines/{reminder_id}/snooze")
 async def snooze_medicine_reminder(
-    reminder_id: UUID,
+    reminder_id: int,
     request: SnoozeRequest,
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -221,11 +262,7 @@ async def snooze_medicine_reminder(
         )
     
     # Get patient
-    result = await db.execute(
-        select(Patient).where(Patient.user_id == current_user.id)
-    )
-    patient = result.scalar_one_or_none()
-    if not patient:
+    if identity.patient_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Patient profile not found"
@@ -236,7 +273,7 @@ async def snooze_medicine_reminder(
         select(MedicineReminder).where(
             and_(
                 MedicineReminder.id == reminder_id,
-                MedicineReminder.patient_id == patient.id
+                MedicineReminder.patient_id == identity.patient_id
             )
         )
     )
@@ -274,10 +311,110 @@ async def snooze_medicine_reminder(
     }
 
 
+@router.put("/medicines/{reminder_id}/timings", response_model=MedicineReminderResponse)
+async def update_medicine_timings(
+    reminder_id: int,
+    request: TimingOverrideRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Override default slot times for a medicine reminder.
+    
+    Only the slots listed are changed (a slot set to its default time loses
+    its override); the frequency itself stays the same.
+    """
+    if current_user.role != UserRole.PATIENT:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only patients can change reminder timings"
+        )
+    
+    # Get reminder owned by this patient
+    result = await db.execute(
+        select(MedicineReminder)
+        .join(Patient, Patient.id == MedicineReminder.patient_id)
+        .where(
+            and_(
+                MedicineReminder.id == reminder_id,
+                Patient.user_id == current_user.id
+            )
+        )
+    )
+    reminder = result.scalar_one_or_none()
+    
+    if not reminder:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Reminder not found"
+        )
+    
+    try:
+        reminder.timing_overrides = merge_timing_overrides(reminder.timing_overrides, request.timing_overrides)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    await db.commit()
+    await db.refresh(reminder)
+    
+    return reminder
+
+
+@router.post("/sync")
+async def sync_reminders(
+    request: ReminderSyncRequest,
+    current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Offline sync for the mobile app, in one round-trip.
+    
+    Applies the queued operations in one transaction and returns a result
+    per operation plus the medicine, follow-up and test reminders changed
+    or deleted since the checkpoint. Store the returned checkpoint for the
+    next sync (see app/services/reminder_sync.py).
+    """
+    if current_user.role != UserRole.PATIENT:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only patients can sync reminders"
+        )
+    
+    # Get patient
+    if identity.patient_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Patient profile not found"
+        )
+    
+    results = await ReminderSync.apply(
+        db, current_user.id, identity.patient_id, [op.model_dump() for op in request.operations]
+    )
+    
+    delta = await ReminderSync.changes(db, identity.patient_id, request.checkpoint, {
+        "medicines": (select(MedicineReminder), MedicineReminder, lambda result: [
+            MedicineReminderResponse.model_validate(r).model_dump() for r in result.scalars()
+        ]),
+        "follow_ups": (select(FollowUpReminder), FollowUpReminder, lambda result: [
+            FollowUpReminderResponse.model_validate(r).model_dump() for r in result.scalars()
+        ]),
+        "tests": (select(TestReminder), TestReminder, lambda result: [
+            TestReminderResponse.model_validate(r).model_dump() for r in result.scalars()
+        ]),
+    })
+    
+    return RowsResponse({"results": results, **delta})
+
+
 @router.get("/follow-ups", response_model=List[FollowUpReminderResponse])
 async def get_follow_up_reminders(
     upcoming_only: bool = Query(True, description="Only show upcoming follow-ups"),
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -292,11 +429,7 @@ async def get_follow_up_reminders(
         )
     
     # Get patient
-    result = await db.execute(
-        select(Patient).where(Patient.user_id == current_user.id)
-    )
-    patient = result.scalar_one_or_none()
-    if not patient:
+    if identity.patient_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Patient profile not found"
@@ -304,7 +437,7 @@ async def get_follow_up_reminders(
     
     # Build query
     query = select(FollowUpReminder).where(
-        FollowUpReminder.patient_id == patient.id
+        FollowUpReminder.patient_id == identity.patient_id
     )
     
     if upcoming_only:
@@ -327,6 +460,7 @@ async def get_follow_up_reminders(
 async def get_test_reminders(
     pending_only: bool = Query(True, description="Only show pending tests"),
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -341,11 +475,7 @@ async def get_test_reminders(
         )
     
     # Get patient
-    result = await db.execute(
-        select(Patient).where(Patient.user_id == current_user.id)
-    )
-    patient = result.scalar_one_or_none()
-    if not patient:
+    if identity.patient_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Patient profile not found"
@@ -353,7 +483,7 @@ async def get_test_reminders(
     
     # Build query
     query = select(TestReminder).where(
-        TestReminder.patient_id == patient.id
+        TestReminder.patient_id == identity.patient_id
     )
     
     if pending_only:
@@ -371,7 +501,7 @@ async def get_test_reminders(
 
 @router.post("/prescriptions/{prescription_id}/generate")
 async def generate_reminders_for_prescription(
-    prescription_id: UUID,
+    prescription_id: int,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -1,15 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from fastapi.responses import RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel, Field
 from datetime import date, datetime
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.models.report import Report
 from app.models.user import User, UserRole
-from app.models.patient import Patient
-from app.models.doctor import Doctor
-from app.api.dependencies import get_current_user
+from app.api.dependencies import Identity, get_current_user, get_identity
+from app.services.blob_storage import BlobInfo, BlobStorage, is_blob_key
+from app.services.celery_tasks import generate_report_derivatives
+from app.services.derivatives import ReportDerivatives
+from app.services.report_uploads import (
+    TUS_VERSION, MultipartFileStream, ReportUploads, max_upload_size, parse_upload_metadata, sniff_report
+)
 
 router = APIRouter(prefix="/reports", tags=["Reports"])
 
@@ -30,6 +35,11 @@ class ReportCreate(ReportBase):
 
 class ReportResponse(ReportBase):
     id: int
+    file_name: str | None = None
+    file_content_type: str | None = None
+    file_size: int | None = None
+    thumbnail_url: str | None = None  # Browser-cacheable; set once generated
+    preview_url: str | None = None
     created_at: datetime
     
     class Config:
@@ -39,30 +49,23 @@ class ReportResponse(ReportBase):
 @router.get("", response_model=List[ReportResponse])
 async def get_reports(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    identity: Identity = Depends(get_identity),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get reports for current user."""
     query = select(Report)
     
     if current_user.role == UserRole.PATIENT:
         # Get patient reports
-        result = await db.execute(
-            select(Patient).where(Patient.user_id == current_user.id)
-        )
-        patient = result.scalar_one_or_none()
-        if not patient:
+        if identity.patient_id is None:
             return []
-        query = query.where(Report.patient_id == patient.id)
+        query = query.where(Report.patient_id == identity.patient_id)
     
     elif current_user.role == UserRole.DOCTOR:
         # Get doctor's reports
-        result = await db.execute(
-            select(Doctor).where(Doctor.user_id == current_user.id)
-        )
-        doctor = result.scalar_one_or_none()
-        if not doctor:
+        if identity.doctor_id is None:
             return []
-        query = query.where(Report.doctor_id == doctor.id)
+        query = query.where(Report.doctor_id == identity.doctor_id)
     
     elif current_user.role in [UserRole.ADMIN, UserRole.STAFF]:
         # Admins and staff can see all
@@ -72,7 +75,7 @@ async def get_reports(
     
     result = await db.execute(query.order_by(Report.report_date.desc()))
     reports = result.scalars().all()
-    return reports
+    return [_report_response(report) for report in reports]
 
 
 @router.post("", response_model=ReportResponse, status_code=status.HTTP_201_CREATED)
@@ -93,3 +96,212 @@ async def create_report(
     await db.commit()
     await db.refresh(report)
     return report
+
+
+async def _report_for_file(
+    report_id: int,
+    current_user: User,
+    identity: Identity,
+    db: AsyncSession
+) -> Report:
+    """The report, if the user may read and replace its file."""
+    result = await db.execute(select(Report).where(Report.id == report_id))
+    report = result.scalar_one_or_none()
+    if not report:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report not found"
+        )
+
+    allowed = (
+        current_user.role == UserRole.ADMIN
+        or (current_user.role == UserRole.DOCTOR and report.doctor_id == identity.doctor_id)
+        or (current_user.role == UserRole.PATIENT and report.patient_id == identity.patient_id)
+    )
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this report"
+        )
+    return report
+
+
+def _report_response(report: Report) -> ReportResponse:
+    response = ReportResponse.model_validate(report)
+    if report.file_previews and is_blob_key(report.file_url):
+        urls = ReportDerivatives.urls(report.file_url)
+        response.thumbnail_url = urls["thumbnail"]
+        response.preview_url = urls["preview"]
+    return response
+
+
+def _attach_file(report: Report, blob: BlobInfo, filename: Optional[str]) -> None:
+    report.file_url = blob.key
+    report.file_name = (filename or f"report_{report.id}")[:255]
+    report.file_content_type = blob.content_type
+    report.file_size = blob.size
+    report.file_previews = False
+
+
+def _queue_derivatives(blob: BlobInfo) -> None:
+    try:
+        generate_report_derivatives.delay(blob.key, blob.content_type)
+    except Exception as e:
+        # Log error but don't fail the upload; list screens fall back to no thumbnail
+        print(f"Failed to queue report derivatives: {str(e)}")
+
+
+@router.post("/{report_id}/file", response_model=ReportResponse)
+async def upload_report_file(
+    report_id: int,
+    request: Request,
+    content_length: Optional[int] = Header(None),
+    current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Upload the report's file as multipart/form-data (field "file").
+
+    The body is streamed: hashed, checked against ALLOWED_FILE_TYPES by its
+    magic bytes and size-checked while it arrives, never held in memory.
+    On unreliable networks use the resumable endpoints instead.
+    """
+    if content_length is not None and content_length > max_upload_size() + 64 * 1024:  # Form overhead
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File exceeds {max_upload_size() // (1024 * 1024)} MB"
+        )
+    report = await _report_for_file(report_id, current_user, identity, db)
+    await db.commit()  # Return the connection to the pool while the body streams
+
+    upload = MultipartFileStream(request, "file")
+    blob = await BlobStorage.put_stream(upload, None, max_size=max_upload_size(), sniff=sniff_report)
+    _attach_file(report, blob, upload.filename)
+    await db.commit()
+    await db.refresh(report)
+    _queue_derivatives(blob)
+    return _report_response(report)
+
+
+@router.get("/{report_id}/file")
+async def download_report_file(
+    report_id: int,
+    current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Redirect to a short-lived URL for the report's file."""
+    report = await _report_for_file(report_id, current_user, identity, db)
+    if not report.file_url:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report has no file"
+        )
+    if not is_blob_key(report.file_url):
+        # Externally hosted file recorded with the report
+        return RedirectResponse(report.file_url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+
+    return RedirectResponse(
+        BlobStorage.signed_url(
+            report.file_url,
+            report.file_content_type or "application/octet-stream",
+            report.file_name or f"report_{report.id}"
+        ),
+        status_code=status.HTTP_307_TEMPORARY_REDIRECT
+    )
+
+
+# ===== Resumable uploads (tus 1.0 core protocol) =====
+
+@router.post("/{report_id}/uploads", status_code=status.HTTP_201_CREATED)
+async def create_report_upload(
+    report_id: int,
+    request: Request,
+    upload_length: int = Header(..., ge=0),
+    upload_metadata: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Start a resumable upload of the report's file.
+
+    Send Upload-Length (bytes) and optionally Upload-Metadata
+    ("filename <base64>"). The Location header is the upload's URL.
+    """
+    await _report_for_file(report_id, current_user, identity, db)
+    metadata = parse_upload_metadata(upload_metadata)
+    upload = await ReportUploads.create(current_user.id, report_id, upload_length, metadata.get("filename"))
+
+    return Response(status_code=status.HTTP_201_CREATED, headers={
+        "Location": str(request.url_for("append_report_upload", upload_id=upload.upload_id)),
+        "Upload-Offset": "0",
+        "Tus-Resumable": TUS_VERSION,
+    })
+
+
+@router.head("/uploads/{upload_id}")
+async def get_report_upload_offset(
+    upload_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Bytes received so far; resume the upload from Upload-Offset."""
+    upload = await ReportUploads.load(upload_id, current_user.id)
+    return Response(headers={
+        "Upload-Offset": str(upload.offset),
+        "Upload-Length": str(upload.length),
+        "Tus-Resumable": TUS_VERSION,
+        "Cache-Control": "no-store",
+    })
+
+
+@router.patch("/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def append_report_upload(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., ge=0),
+    content_type: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Append bytes (Content-Type: application/offset+octet-stream) at
+    Upload-Offset. The last PATCH attaches the file to the report.
+    """
+    if content_type != "application/offset+octet-stream":
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Content-Type must be application/offset+octet-stream"
+        )
+    upload = await ReportUploads.load(upload_id, current_user.id)
+    await db.commit()  # Return the connection to the pool while the body streams
+    blob = await ReportUploads.append(upload, upload_offset, request.stream())
+
+    if blob is not None:
+        result = await db.execute(select(Report).where(Report.id == upload.report_id))
+        report = result.scalar_one_or_none()
+        if not report:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Report not found"
+            )
+        _attach_file(report, blob, upload.filename)
+        await db.commit()
+        _queue_derivatives(blob)
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers={
+        "Upload-Offset": str(upload.offset),
+        "Tus-Resumable": TUS_VERSION,
+    })
+
+
+@router.delete("/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_report_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Abandon a resumable upload."""
+    upload = await ReportUploads.load(upload_id, current_user.id)
+    await ReportUploads.delete(upload)
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers={"Tus-Resumable": TUS_VERSION})
@@ -0,0 +1,88 @@
+"""
+API Routes for Search
+Ranked full-text search over prescriptions, medical records and favorites.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_read_db
+from app.models.user import User, UserRole
+from app.schemas.search import SearchResponse
+from app.services.search_service import SearchService
+from app.api.dependencies import Identity, get_current_user, get_identity
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get("", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=2, max_length=200, description="Search text (supports \"quoted phrases\" and -exclusions)"),
+    scope: str = Query("all", pattern="^(all|prescriptions|records|favorites)$"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Search prescriptions, medical records (diagnosis/symptoms) and favorites.
+
+    Patients search their own history, doctors search their own patients'
+    records and their favorites. Results are ranked and include <mark>
+    highlighted snippets.
+    """
+    patient_id = doctor_id = None
+
+    if current_user.role == UserRole.PATIENT:
+        patient_id = identity.patient_id
+        if patient_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Patient profile not found"
+            )
+    elif current_user.role == UserRole.DOCTOR:
+        doctor_id = identity.doctor_id
+        if doctor_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Doctor profile not found"
+            )
+    elif current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Search not available for this role"
+        )
+
+    if scope == "favorites" and doctor_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only doctors can search favorites"
+        )
+
+    # For a single scope the database pages; for "all" each source returns
+    # its top (offset + limit) and the merged list is paged here.
+    window = limit if scope != "all" else offset + limit
+    window_offset = offset if scope != "all" else 0
+
+    results = []
+    if scope in ("all", "prescriptions"):
+        results += await SearchService.search_prescriptions(
+            db, q, patient_id=patient_id, doctor_id=doctor_id,
+            limit=window, offset=window_offset
+        )
+    if scope in ("all", "records"):
+        results += await SearchService.search_medical_records(
+            db, q, patient_id=patient_id, doctor_id=doctor_id,
+            limit=window, offset=window_offset
+        )
+    if scope == "favorites":
+        results += await SearchService.search_favorites(
+            db, q, doctor_id=doctor_id, limit=window, offset=window_offset
+        )
+
+    if scope == "all":
+        results.sort(key=lambda hit: hit["rank"], reverse=True)
+        results = results[offset:offset + limit]
+
+    return SearchResponse(query=q, results=results, limit=limit, offset=offset)
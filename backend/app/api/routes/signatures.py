@@ -4,19 +4,16 @@ Sprint 1.3: Digital Signature System
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Response
-from fastapi.responses import StreamingResponse
+from fastapi.responses import RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from pydantic import BaseModel, constr
 from typing import Optional
 from uuid import UUID
-from io import BytesIO
 
 from app.core.database import get_db
 from app.models.user import User, UserRole
-from app.models.doctor import Doctor
 from app.services.signature_service import SignatureService
-from app.api.dependencies import get_current_user
+from app.api.dependencies import Identity, get_current_user, get_identity
 
 
 router = APIRouter(prefix="/signatures", tags=["Digital Signatures"])
@@ -59,6 +56,7 @@ async def setup_signature(
     pin: str = File(..., description="4-6 digit PIN", regex=r'^\d{4,6}$'),
     signature: UploadFile = File(..., description="Signature image (PNG/JPEG, max 2MB)"),
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -74,11 +72,7 @@ async def setup_signature(
         )
     
     # Get doctor
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    if not doctor:
+    if identity.doctor_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Doctor profile not found"
@@ -94,20 +88,10 @@ async def setup_signature(
     # Validate file
     SignatureService.validate_signature_file(signature)
     
-    # Read file data
-    file_data = await signature.read()
-    
-    # Check file size
-    if len(file_data) > SignatureService.MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File too large. Max size: {SignatureService.MAX_FILE_SIZE / 1024 / 1024}MB"
-        )
-    
-    # Create signature
+    # Create signature (image streamed to blob storage, size-checked on the way)
     sig = await SignatureService.create_signature(
-        doctor_id=doctor.id,
-        signature_data=file_data,
+        doctor_id=identity.doctor_id,
+        signature_file=signature,
         pin=pin,
         db=db
     )
@@ -122,6 +106,7 @@ async def setup_signature(
 @router.get("/status", response_model=SignatureStatusResponse)
 async def get_signature_status(
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -136,18 +121,14 @@ async def get_signature_status(
         )
     
     # Get doctor
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    if not doctor:
+    if identity.doctor_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Doctor profile not found"
         )
     
     # Get signature
-    signature = await SignatureService.get_signature(doctor.id, db)
+    signature = await SignatureService.get_signature(identity.doctor_id, db)
     
     if not signature:
         return SignatureStatusResponse(
@@ -166,12 +147,13 @@ async def get_signature_status(
 @router.get("/download")
 async def download_signature(
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Download signature image.
     
-    Returns the signature as PNG/JPEG image.
+    Redirects to a short-lived signed URL for the PNG/JPEG image.
     """
     if current_user.role != UserRole.DOCTOR:
         raise HTTPException(
@@ -180,34 +162,24 @@ async def download_signature(
         )
     
     # Get doctor
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    if not doctor:
+    if identity.doctor_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Doctor profile not found"
         )
     
     # Get signature
-    signature = await SignatureService.get_signature(doctor.id, db)
+    signature = await SignatureService.get_signature(identity.doctor_id, db)
     if not signature:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Digital signature not setup"
         )
     
-    # Decode signature
-    image_data = SignatureService.decode_signature(signature.signature_data)
-    
-    # Return as streaming response
-    return StreamingResponse(
-        BytesIO(image_data),
-        media_type="image/png",
-        headers={
-            "Content-Disposition": f"attachment; filename=signature_{doctor.id}.png"
-        }
+    # Redirect to a short-lived URL; the bytes never pass through this worker on S3
+    return RedirectResponse(
+        SignatureService.signature_url(signature),
+        status_code=status.HTTP_307_TEMPORARY_REDIRECT
     )
 
 
@@ -215,6 +187,7 @@ async def download_signature(
 async def verify_pin(
     request: VerifyPINRequest,
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -229,11 +202,7 @@ async def verify_pin(
         )
     
     # Get doctor
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    if not doctor:
+    if identity.doctor_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Doctor profile not found"
@@ -241,7 +210,7 @@ async def verify_pin(
     
     # Verify PIN
     is_valid = await SignatureService.verify_signature_pin(
-        doctor_id=doctor.id,
+        doctor_id=identity.doctor_id,
         pin=request.pin,
         db=db
     )
@@ -262,6 +231,7 @@ async def verify_pin(
 async def update_pin(
     request: UpdatePINRequest,
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -276,11 +246,7 @@ async def update_pin(
         )
     
     # Get doctor
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    if not doctor:
+    if identity.doctor_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Doctor profile not found"
@@ -288,7 +254,7 @@ async def update_pin(
     
     # Update PIN
     await SignatureService.update_pin(
-        doctor_id=doctor.id,
+        doctor_id=identity.doctor_id,
         old_pin=request.old_pin,
         new_pin=request.new_pin,
         db=db
@@ -304,6 +270,7 @@ async def update_pin(
 async def deactivate_signature(
     request: VerifyPINRequest,
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -318,11 +285,7 @@ async def deactivate_signature(
         )
     
     # Get doctor
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    if not doctor:
+    if identity.doctor_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Doctor profile not found"
@@ -330,7 +293,7 @@ async def deactivate_signature(
     
     # Deactivate signature
     await SignatureService.deactivate_signature(
-        doctor_id=doctor.id,
+        doctor_id=identity.doctor_id,
         pin=request.pin,
         db=db
     )
@@ -20,7 +20,8 @@ from app.schemas.template import (
     PrescriptionTemplateListResponse,
     PrescriptionFromTemplateRequest
 )
-from app.api.dependencies import get_current_user
+from app.api.dependencies import Identity, get_current_user, get_identity
+from app.services.usage_counter import UsageCounter
 
 router = APIRouter(prefix="/templates", tags=["Prescription Templates"])
 
@@ -29,6 +30,7 @@ router = APIRouter(prefix="/templates", tags=["Prescription Templates"])
 async def create_template(
     template_data: PrescriptionTemplateCreate,
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -43,11 +45,7 @@ async def create_template(
         )
     
     # Get doctor
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    if not doctor:
+    if identity.doctor_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Doctor profile not found"
@@ -59,7 +57,7 @@ async def create_template(
     
     # Create template
     template = PrescriptionTemplate(
-        doctor_id=doctor.id,
+        doctor_id=identity.doctor_id,
         template_name=template_data.template_name,
         diagnosis=template_data.diagnosis,
         diagnosis_icd10_code=template_data.diagnosis_icd10_code,
@@ -85,6 +83,7 @@ async def get_templates(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -99,11 +98,7 @@ async def get_templates(
         )
     
     # Get doctor
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    if not doctor:
+    if identity.doctor_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Doctor profile not found"
@@ -111,7 +106,7 @@ async def get_templates(
     
     # Build query
     query = select(PrescriptionTemplate).where(
-        PrescriptionTemplate.doctor_id == doctor.id
+        PrescriptionTemplate.doctor_id == identity.doctor_id
     )
     
     # Apply filters
@@ -152,6 +147,7 @@ async def get_templates(
 async def get_template(
     template_id: UUID,
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific template by ID."""
@@ -162,11 +158,7 @@ async def get_template(
         )
     
     # Get doctor
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    if not doctor:
+    if identity.doctor_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Doctor profile not found"
@@ -176,7 +168,7 @@ async def get_template(
     result = await db.execute(
         select(PrescriptionTemplate).where(
             PrescriptionTemplate.id == template_id,
-            PrescriptionTemplate.doctor_id == doctor.id
+            PrescriptionTemplate.doctor_id == identity.doctor_id
         )
     )
     template = result.scalar_one_or_none()
@@ -195,6 +187,7 @@ async def update_template(
     template_id: UUID,
     template_data: PrescriptionTemplateUpdate,
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """Update a template."""
@@ -205,11 +198,7 @@ async def update_template(
         )
     
     # Get doctor
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    if not doctor:
+    if identity.doctor_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Doctor profile not found"
@@ -219,7 +208,7 @@ async def update_template(
     result = await db.execute(
         select(PrescriptionTemplate).where(
             PrescriptionTemplate.id == template_id,
-            PrescriptionTemplate.doctor_id == doctor.id
+            PrescriptionTemplate.doctor_id == identity.doctor_id
         )
     )
     template = result.scalar_one_or_none()
@@ -258,6 +247,7 @@ async def update_template(
 async def delete_template(
     template_id: UUID,
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """Delete a template."""
@@ -268,11 +258,7 @@ async def delete_template(
         )
     
     # Get doctor
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    if not doctor:
+    if identity.doctor_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Doctor profile not found"
@@ -282,7 +268,7 @@ async def delete_template(
     result = await db.execute(
         select(PrescriptionTemplate).where(
             PrescriptionTemplate.id == template_id,
-            PrescriptionTemplate.doctor_id == doctor.id
+            PrescriptionTemplate.doctor_id == identity.doctor_id
         )
     )
     template = result.scalar_one_or_none()
@@ -316,25 +302,16 @@ async def use_template(
             detail="Only doctors can use templates"
         )
     
-    # Get doctor
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    if not doctor:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Doctor profile not found"
-        )
-    
-    # Get template
+    # Ownership check and current count in one read; the increment is buffered
     result = await db.execute(
-        select(PrescriptionTemplate).where(
+        select(PrescriptionTemplate.id, PrescriptionTemplate.usage_count)
+        .join(Doctor, Doctor.id == PrescriptionTemplate.doctor_id)
+        .where(
             PrescriptionTemplate.id == template_id,
-            PrescriptionTemplate.doctor_id == doctor.id
+            Doctor.user_id == current_user.id
         )
     )
-    template = result.scalar_one_or_none()
+    template = result.first()
     
     if not template:
         raise HTTPException(
@@ -342,7 +319,6 @@ async def use_template(
             detail="Template not found"
         )
     
-    template.usage_count += 1
-    await db.commit()
+    usage_count = await UsageCounter.increment(db, "templates", template.id, template.usage_count)
     
-    return {"success": True, "usage_count": template.usage_count}
+    return {"success": True, "usage_count": usage_count}
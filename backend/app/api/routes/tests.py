@@ -13,7 +13,6 @@ from datetime import date, datetime
 from app.core.database import get_db
 from app.models.user import User, UserRole
 from app.models.doctor import Doctor
-from app.models.patient import Patient
 from app.models.medical import Prescription
 from app.models.prescription_extras import TestOrdered, TestOrderStatus
 from app.schemas.test_order import (
@@ -25,7 +24,7 @@ from app.schemas.test_order import (
     TestOrderListResponse,
     PendingTestsSummary
 )
-from app.api.dependencies import get_current_user
+from app.api.dependencies import Identity, get_current_user, get_identity
 
 router = APIRouter(prefix="/tests", tags=["Test Orders"])
 
@@ -35,6 +34,7 @@ async def add_test_to_prescription(
     prescription_id: UUID,
     test_data: TestOrderCreate,
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -61,11 +61,7 @@ async def add_test_to_prescription(
         )
     
     # Get doctor and verify
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    if not doctor or prescription.doctor_id != doctor.id:
+    if identity.doctor_id is None or prescription.doctor_id != identity.doctor_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Cannot add tests to this prescription"
@@ -92,6 +88,7 @@ async def add_test_to_prescription(
 async def get_prescription_tests(
     prescription_id: UUID,
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -113,21 +110,13 @@ async def get_prescription_tests(
     
     # Verify access
     if current_user.role == UserRole.DOCTOR:
-        result = await db.execute(
-            select(Doctor).where(Doctor.user_id == current_user.id)
-        )
-        doctor = result.scalar_one_or_none()
-        if not doctor or prescription.doctor_id != doctor.id:
+        if identity.doctor_id is None or prescription.doctor_id != identity.doctor_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Cannot view tests for this prescription"
             )
     elif current_user.role == UserRole.PATIENT:
-        result = await db.execute(
-            select(Patient).where(Patient.user_id == current_user.id)
-        )
-        patient = result.scalar_one_or_none()
-        if not patient or prescription.patient_id != patient.id:
+        if identity.patient_id is None or prescription.patient_id != identity.patient_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Cannot view tests for this prescription"
@@ -151,6 +140,7 @@ async def update_test_order(
     test_id: UUID,
     test_data: TestOrderUpdate,
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -180,11 +170,7 @@ async def update_test_order(
     )
     prescription = result.scalar_one_or_none()
     
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    if not doctor or prescription.doctor_id != doctor.id:
+    if identity.doctor_id is None or prescription.doctor_id != identity.doctor_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Cannot update this test order"
@@ -213,6 +199,7 @@ async def update_test_status(
     test_id: UUID,
     status_data: TestOrderStatusUpdate,
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -240,21 +227,13 @@ async def update_test_status(
     
     # Verify access
     if current_user.role == UserRole.DOCTOR:
-        result = await db.execute(
-            select(Doctor).where(Doctor.user_id == current_user.id)
-        )
-        doctor = result.scalar_one_or_none()
-        if not doctor or prescription.doctor_id != doctor.id:
+        if identity.doctor_id is None or prescription.doctor_id != identity.doctor_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Cannot update this test"
             )
     elif current_user.role == UserRole.PATIENT:
-        result = await db.execute(
-            select(Patient).where(Patient.user_id == current_user.id)
-        )
-        patient = result.scalar_one_or_none()
-        if not patient or prescription.patient_id != patient.id:
+        if identity.patient_id is None or prescription.patient_id != identity.patient_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Cannot update this test"
@@ -281,6 +260,7 @@ async def update_test_status(
 @router.get("/pending", response_model=PendingTestsSummary)
 async def get_pending_tests(
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -295,11 +275,7 @@ async def get_pending_tests(
         )
     
     # Get patient
-    result = await db.execute(
-        select(Patient).where(Patient.user_id == current_user.id)
-    )
-    patient = result.scalar_one_or_none()
-    if not patient:
+    if identity.patient_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Patient profile not found"
@@ -313,7 +289,7 @@ async def get_pending_tests(
         .join(User, Doctor.user_id == User.id)
         .where(
             and_(
-                Prescription.patient_id == patient.id,
+                Prescription.patient_id == identity.patient_id,
                 TestOrdered.status == TestOrderStatus.ORDERED
             )
         )
@@ -367,6 +343,7 @@ async def get_pending_tests(
 async def delete_test_order(
     test_id: UUID,
     current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -396,11 +373,7 @@ async def delete_test_order(
     )
     prescription = result.scalar_one_or_none()
     
-    result = await db.execute(
-        select(Doctor).where(Doctor.user_id == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    if not doctor or prescription.doctor_id != doctor.id:
+    if identity.doctor_id is None or prescription.doctor_id != identity.doctor_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Cannot delete this test order"
@@ -0,0 +1,77 @@
+"""
+API Routes for the Patient Timeline
+A patient's whole history (appointments, medical records, prescriptions,
+reports) in one newest-first, keyset-paginated list.
+"""
+
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_read_db
+from app.models.user import User, UserRole
+from app.schemas.timeline import TimelineResponse
+from app.services.patient_timeline import PatientTimeline, SOURCES
+from app.api.dependencies import Identity, get_current_user, get_identity
+
+router = APIRouter(prefix="/timeline", tags=["Timeline"])
+
+EVENT_TYPES = {event_type for event_type, _ in SOURCES.values()}
+
+
+@router.get("", response_model=TimelineResponse)
+async def get_timeline(
+    patient_id: Optional[int] = Query(None, alias="patientId"),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    types: Optional[List[str]] = Query(None, description="Filter by event type"),
+    current_user: User = Depends(get_current_user),
+    identity: Identity = Depends(get_identity),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get a patient's chronological history.
+
+    Patients see their own timeline; doctors and admins pass patientId.
+    """
+    if current_user.role == UserRole.PATIENT:
+        own_id = identity.patient_id
+        if own_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Patient profile not found"
+            )
+        if patient_id is not None and patient_id != own_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to view this timeline"
+            )
+        patient_id = own_id
+    elif current_user.role in [UserRole.DOCTOR, UserRole.ADMIN]:
+        if patient_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="patientId is required"
+            )
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view timelines"
+        )
+
+    if types and not set(types) <= EVENT_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown event type; expected one of {sorted(EVENT_TYPES)}"
+        )
+
+    try:
+        events, next_cursor = await PatientTimeline.page(db, patient_id, cursor, limit, types)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+    return TimelineResponse(patient_id=patient_id, events=events, next_cursor=next_cursor)
@@ -16,16 +16,41 @@ class Settings(BaseSettings):
     HOST: str = "0.0.0.0"
     PORT: int = 8000
 
+    # Server workers (uvicorn --workers / gunicorn); used to size DB pools
+    WEB_CONCURRENCY: int = 1
+
     # Database
     DATABASE_URL: str
-    DATABASE_POOL_SIZE: int = 20
+    DATABASE_REPLICA_URL: str = ""  # Read replica for read-only routes; empty = use primary
+    DATABASE_ECHO: bool = False  # Log SQL statements (independent of DEBUG)
+    DATABASE_MAX_CONNECTIONS: int = 100  # The server's max_connections (Postgres default 100)
+    DATABASE_RESERVED_CONNECTIONS: int = 30  # Kept free for Celery workers, superuser and admin sessions
+    DATABASE_POOL_SIZE: int = 0  # > 0 overrides the pool size derived from the budget
     DATABASE_MAX_OVERFLOW: int = 0
+    DATABASE_POOL_RECYCLE: int = 1800  # Seconds
+    DATABASE_POOL_PRE_PING: bool = False
+    DATABASE_STATEMENT_CACHE_SIZE: int = 500  # 0 behind PgBouncer (transaction mode)
+    DATABASE_COMMAND_TIMEOUT: int = 30  # Seconds
+    CELERY_DB_POOL_SIZE: int = 2  # Per Celery worker process (app/core/task_runtime.py)
+    CELERY_DB_MAX_OVERFLOW: int = 2
+
+    # Monthly partitions (migrations/007): months kept attached before archiving
+    APPOINTMENTS_HOT_MONTHS: int = 36
+    NOTIFICATIONS_HOT_MONTHS: int = 6
+    REMINDER_LOGS_HOT_MONTHS: int = 12
+    PARTITION_ARCHIVE_TABLESPACE: str = ""  # Move archived months here; empty = stay put
+    PARTITION_ARCHIVE_DROP_MONTHS: int = 0  # Drop archived months older than this; 0 = keep
+
+    # Doctor dashboard materialized views (migrations/009)
+    DASHBOARD_REFRESH_SECONDS: int = 30  # How often flagged views are refreshed
+    DASHBOARD_MAX_STALENESS_SECONDS: int = 900  # Refresh unflagged views at least this often
 
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    ONBOARDING_TOKEN_EXPIRE_MINUTES: int = 60
 
     # CORS
     CORS_ORIGINS: Union[List[str], str] = ["http://localhost:3000", "http://localhost:3001", "http://localhost:5173", "http://localhost:5174"]
@@ -50,6 +75,8 @@ class Settings(BaseSettings):
     # Celery
     CELERY_BROKER_URL: str = "redis://localhost:6379/1"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/2"
+    USAGE_COUNT_FLUSH_SECONDS: int = 30  # Write-behind template/favorite usage counts
+    USAGE_FLUSH_BATCH_RETENTION_DAYS: int = 7  # Applied flush batch ids, see UsageCounter.flush
 
     # Email (Gmail SMTP)
     EMAIL_HOST: str = "smtp.gmail.com"
@@ -83,9 +110,18 @@ class Settings(BaseSettings):
     FIREBASE_CREDENTIALS_PATH: str = "./firebase-credentials.json"
 
     # WhatsApp Business API
+    WHATSAPP_ENABLED: bool = False
     WHATSAPP_API_TOKEN: str = ""
     WHATSAPP_PHONE_NUMBER_ID: str = ""
 
+    # Notification preferences (app/services/notification_policy.py)
+    NOTIFICATION_DEFAULT_TIMEZONE: str = "Asia/Kolkata"  # Quiet hours of users without a timezone
+    NOTIFICATION_POLICY_TTL_SECONDS: int = 300  # Other workers see preference changes within this
+
+    # Follow-up reminder cascade (app/services/follow_up_cascade.py)
+    FOLLOW_UP_CASCADE_TICK_SECONDS: int = 300  # How often due 7-day / 1-day / morning-of reminders are sent
+    FOLLOW_UP_CASCADE_BATCH_SIZE: int = 100  # Reminders per queued send task
+
     # ABDM (Ayushman Bharat Digital Mission)
     ABDM_CLIENT_ID: str = ""
     ABDM_CLIENT_SECRET: str = ""
@@ -99,6 +135,8 @@ class Settings(BaseSettings):
     MAX_FILE_SIZE_MB: int = 10
     ALLOWED_FILE_TYPES: List[str] = ["pdf", "jpg", "jpeg", "png"]
     UPLOAD_DIR: str = "./uploads"
+    UPLOAD_SPOOL_THRESHOLD_KB: int = 1024  # Larger uploads spool to disk instead of memory
+    UPLOAD_SESSION_TTL_HOURS: int = 24  # Unfinished resumable uploads are dropped after this
 
     # AWS S3
     USE_S3: bool = False
@@ -106,6 +144,17 @@ class Settings(BaseSettings):
     AWS_SECRET_ACCESS_KEY: str = ""
     AWS_REGION: str = "us-east-1"
     S3_BUCKET_NAME: str = ""
+    S3_ENDPOINT_URL: str = ""  # S3-compatible store (e.g. http://localhost:9000 for MinIO); empty = AWS
+
+    # Blob storage (app/services/blob_storage.py)
+    BLOB_URL_TTL_SECONDS: int = 300  # Lifetime of signed download URLs
+    BLOB_ORPHAN_GRACE_HOURS: int = 24  # Unreferenced blobs younger than this are kept
+    DERIVATIVE_URL_CACHE_HOURS: int = 24  # Thumbnail/preview URLs stay identical (browser-cacheable) this long
+
+    # Delta sync (app/services/patient_sync.py)
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 30  # Clients with an older ?since= watermark refetch in full
+    SYNC_OPERATION_RETENTION_DAYS: int = 30  # Idempotency keys of offline reminder operations
+    SYNC_MAX_OPERATIONS: int = 200  # Per POST /reminders/sync
 
     # Pagination
     DEFAULT_PAGE_SIZE: int = 20
@@ -114,6 +163,10 @@ class Settings(BaseSettings):
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
 
+    # Response compression (app/core/compression.py)
+    RESPONSE_COMPRESSION: bool = True  # brotli/gzip in the app, for deployments without the nginx proxy
+    COMPRESSION_MIN_SIZE: int = 1024  # Bytes; smaller responses are sent as is
+
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_FILE: str = "logs/app.log"
@@ -130,6 +183,7 @@ class Settings(BaseSettings):
     # Appointment
     APPOINTMENT_SLOT_DURATION_MINUTES: int = 30
     APPOINTMENT_CANCELLATION_HOURS: int = 24
+    APPOINTMENT_BOOKING_HORIZON_DAYS: int = 365  # Partitions are created this far ahead
 
     # Billing
     TAX_RATE: float = 0.18
@@ -1,17 +1,79 @@
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.core.config import settings
 
-# Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_size=settings.DATABASE_POOL_SIZE,
-    max_overflow=settings.DATABASE_MAX_OVERFLOW,
-    pool_pre_ping=True,
+# An async worker gains nothing from more connections than this: past it,
+# requests queue on the pool instead of on the server
+MAX_CONNECTIONS_PER_WORKER = 20
+
+
+def pool_limits(engines: int = 1) -> tuple:
+    """
+    Split a server's connection budget across worker processes and engines.
+
+    The budget is the server's max_connections (DATABASE_MAX_CONNECTIONS)
+    less DATABASE_RESERVED_CONNECTIONS for Celery workers, superuser and
+    admin sessions. Every uvicorn/gunicorn worker owns its own pool per
+    engine, so the budget is divided by WEB_CONCURRENCY and by the number of
+    the app's engines connecting to that server. DATABASE_POOL_SIZE > 0
+    overrides.
+    """
+    if settings.DATABASE_POOL_SIZE > 0:
+        return settings.DATABASE_POOL_SIZE, settings.DATABASE_MAX_OVERFLOW
+    budget = settings.DATABASE_MAX_CONNECTIONS - settings.DATABASE_RESERVED_CONNECTIONS
+    per_worker = budget // (max(1, settings.WEB_CONCURRENCY) * engines)
+    per_worker = max(2, min(MAX_CONNECTIONS_PER_WORKER, per_worker))
+    pool_size = max(1, per_worker * 3 // 4)
+    return pool_size, per_worker - pool_size
+
+
+def same_server(url: str, other: str) -> bool:
+    """Whether two database URLs reach the same server (host and port)."""
+    a, b = make_url(url), make_url(other)
+    return (a.host, a.port or 5432) == (b.host, b.port or 5432)
+
+
+def create_engine(url: str, role: str, pool_size: int, max_overflow: int):
+    """Async engine with the app's connection settings; `role` labels it in pg_stat_activity."""
+    return create_async_engine(
+        url,
+        echo=settings.DATABASE_ECHO,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        connect_args={
+            # SQLAlchemy's prepared statement cache and asyncpg's own statement
+            # cache; set both to 0 behind PgBouncer in transaction mode
+            "prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+            "command_timeout": settings.DATABASE_COMMAND_TIMEOUT,
+            "server_settings": {
+                "application_name": f"{settings.APP_NAME[:40]} ({role})",
+                "jit": "off",  # JIT compilation only slows short OLTP queries
+            },
+        },
+    )
+
+
+# Engines connecting to the primary's server: a "replica" URL may be the
+# same server under another name or role, sharing its budget
+_engines_on_primary = (
+    2 if settings.DATABASE_REPLICA_URL and same_server(settings.DATABASE_URL, settings.DATABASE_REPLICA_URL)
+    else 1
 )
 
-# Create async session factory
+# Primary (read-write) engine
+engine = create_engine(settings.DATABASE_URL, "primary", *pool_limits(_engines_on_primary))
+
+# Read replica engine; shares the primary when no replica is configured
+read_engine = (
+    create_engine(settings.DATABASE_REPLICA_URL, "replica", *pool_limits(_engines_on_primary))
+    if settings.DATABASE_REPLICA_URL else engine
+)
+
+# Create async session factories
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -20,6 +82,14 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
 # Base class for models
 Base = declarative_base()
 
@@ -31,3 +101,25 @@ async def get_db() -> AsyncSession:
             yield session
         finally:
             await session.close()
+
+
+# Dependency for read-only routes (lists, catalogue, history)
+async def get_read_db() -> AsyncSession:
+    """
+    Session on the read replica.
+
+    Replicas lag the primary slightly: use only for routes that never write
+    and can tolerate data a moment old.
+    """
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def dispose_engines() -> None:
+    """Close all pooled connections (primary and replica)."""
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
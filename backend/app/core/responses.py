@@ -0,0 +1,161 @@
+"""
+API responses for SymptoTrack.
+
+ApiResponse is the app's default response class (see main.py). It renders
+JSON with orjson, or MessagePack when the client's Accept header prefers
+application/msgpack (mobile clients on cellular links): WireFormatMiddleware
+records the negotiated format per request and every response built from
+route return values follows it. Error responses stay JSON.
+
+Large list endpoints go a step further: they select only the response
+columns as Core rows and return a RowsResponse, which serializes the row
+mappings straight to bytes, skipping ORM hydration and the Pydantic
+validate-then-dump pass. Their response_model stays for the OpenAPI
+schema; FastAPI does not re-validate a Response returned by the handler.
+"""
+
+import logging
+from contextvars import ContextVar
+from decimal import Decimal
+from typing import Any, Dict, List, Mapping, Optional
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.engine import Result
+from starlette.background import BackgroundTask
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Try to import msgpack for the binary wire format
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    logger.warning("msgpack not installed. Responses will always be JSON. Install with: pip install msgpack")
+    MSGPACK_AVAILABLE = False
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_ALIASES = {MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack"}
+
+# OPT_UTC_Z writes UTC offsets as "Z", as Pydantic does
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)  # Pydantic v2 also serializes Decimal as a string
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+def _msgpack_default(value: Any) -> Any:
+    # Same strings as the JSON encoding (dates, UUIDs, enums, Decimal)
+    if isinstance(value, Decimal):
+        return str(value)
+    return orjson.loads(orjson.dumps(value, option=ORJSON_OPTIONS))
+
+
+def packb(content: Any) -> bytes:
+    return msgpack.packb(content, default=_msgpack_default, use_bin_type=True, datetime=False)
+
+
+def pack_rows(content: Any) -> bytes:
+    """
+    MessagePack of raw row content. One orjson pass turns every date and
+    Decimal into its JSON string, which is faster than packb's per-value
+    default hook on date-heavy rows.
+    """
+    return packb(orjson.loads(dumps(content)))
+
+
+def negotiate(accept: str) -> str:
+    """
+    Media type to answer with for an Accept header: MessagePack only when
+    the client ranks it above JSON, so browsers sending */* keep JSON.
+    """
+    if not MSGPACK_AVAILABLE or "msgpack" not in accept.lower():
+        return JSON_MEDIA_TYPE
+    best, best_q = JSON_MEDIA_TYPE, 0.0
+    for index, item in enumerate(accept.split(",")):
+        media_type, *params = [part.strip() for part in item.split(";")]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        media_type = media_type.lower()
+        if media_type in MSGPACK_ALIASES:
+            candidate = MSGPACK_MEDIA_TYPE
+        elif media_type in (JSON_MEDIA_TYPE, "application/*", "*/*"):
+            candidate = JSON_MEDIA_TYPE
+        else:
+            continue
+        if q > best_q:  # Ties keep the earlier entry
+            best, best_q = candidate, q
+    return best
+
+
+_wire_format: ContextVar[str] = ContextVar("wire_format", default=JSON_MEDIA_TYPE)
+
+
+class WireFormatMiddleware:
+    """Record the response format negotiated from the Accept header for ApiResponse."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _wire_format.set(negotiate(Headers(scope=scope).get("accept", "")))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _wire_format.reset(token)
+
+
+class ApiResponse(ORJSONResponse):
+    """ORJSONResponse that switches to MessagePack when the client asked for it."""
+
+    def __init__(
+        self,
+        content: Any = None,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+        background: Optional[BackgroundTask] = None,
+    ):
+        self.msgpack = media_type is None and _wire_format.get() == MSGPACK_MEDIA_TYPE
+        if self.msgpack:
+            media_type = MSGPACK_MEDIA_TYPE
+        super().__init__(content, status_code, headers, media_type, background)
+        self.headers.add_vary_header("Accept")
+
+    def render(self, content: Any) -> bytes:
+        if self.msgpack:
+            return packb(content)
+        return super().render(content)
+
+
+class RowsResponse(ApiResponse):
+    """ApiResponse that also accepts Decimal values from raw rows."""
+
+    def render(self, content: Any) -> bytes:
+        if self.msgpack:
+            return pack_rows(content)
+        return dumps(content)
+
+
+def row_dicts(result: Result) -> List[Dict[str, Any]]:
+    """Rows of a column select as plain dicts keyed by column label."""
+    return [dict(row) for row in result.mappings()]
@@ -74,6 +74,15 @@ def create_refresh_token(data: Dict[str, Any]) -> str:
     return encoded_jwt
 
 
+def create_onboarding_token(data: Dict[str, Any]) -> str:
+    """Create short-lived JWT that identifies an in-progress onboarding session."""
+    to_encode = data.copy()
+    expire = datetime.utcnow() + timedelta(minutes=settings.ONBOARDING_TOKEN_EXPIRE_MINUTES)
+    to_encode.update({"exp": expire, "type": "onboarding"})
+    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return encoded_jwt
+
+
 def decode_token(token: str) -> Dict[str, Any]:
     """Decode and validate JWT token."""
     try:
@@ -0,0 +1,115 @@
+"""
+Async runtime for Celery tasks.
+
+Tasks stay plain synchronous Celery functions and hand their async work to
+run_async / run_in_session. Each worker process keeps one event loop,
+running in a background thread from first use (after the prefork fork)
+until the process exits, and its own database engine sized for a worker
+(CELERY_DB_POOL_SIZE) rather than for the API (pool_limits). Connections
+and the Redis client therefore survive between tasks instead of being
+created and torn down by asyncio.run every time.
+
+Works with the prefork, solo and threads pools; with threads, concurrent
+tasks interleave on the one loop.
+"""
+
+import asyncio
+import os
+import threading
+from typing import Awaitable, Callable, Coroutine, Optional, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import create_engine
+
+T = TypeVar("T")
+
+
+class _Runtime:
+    """Event loop thread, engine and session factory of one worker process."""
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="task-event-loop", daemon=True)
+        self.thread.start()
+        self.engine = create_engine(
+            settings.DATABASE_URL,
+            "worker",
+            settings.CELERY_DB_POOL_SIZE,
+            settings.CELERY_DB_MAX_OVERFLOW,
+        )
+        self.sessions = async_sessionmaker(
+            self.engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autocommit=False,
+            autoflush=False,
+        )
+
+
+_runtime: Optional[_Runtime] = None
+_lock = threading.Lock()
+
+
+def _current() -> _Runtime:
+    global _runtime
+    if _runtime is None or _runtime.pid != os.getpid():  # Not started in this process yet
+        with _lock:
+            if _runtime is None or _runtime.pid != os.getpid():
+                _runtime = _Runtime()
+    return _runtime
+
+
+def task_engine() -> AsyncEngine:
+    """This worker process's engine (for services that take an engine)."""
+    return _current().engine
+
+
+def run_async(coro: Coroutine[None, None, T]) -> T:
+    """
+    Run a coroutine on the worker's event loop and wait for its result.
+
+    If the task is interrupted while waiting (soft time limit, revoke),
+    the coroutine is cancelled too.
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, _current().loop)
+    try:
+        return future.result()
+    except BaseException:
+        future.cancel()
+        raise
+
+
+def run_in_session(work: Callable[[AsyncSession], Awaitable[T]]) -> T:
+    """
+    Run `work(db)` with a session from the worker's engine, e.g.
+    run_in_session(lambda db: ReminderService.auto_generate_all_reminders(..., db=db)).
+    The session is closed afterwards; commit inside `work`.
+    """
+    async def with_session() -> T:
+        async with _current().sessions() as db:
+            return await work(db)
+
+    return run_async(with_session())
+
+
+def shutdown() -> None:
+    """Close pooled connections and stop the loop (worker process exit)."""
+    global _runtime
+    runtime = _runtime
+    if runtime is None or runtime.pid != os.getpid():
+        return
+    from app.core.redis import close_redis
+
+    async def close() -> None:
+        await runtime.engine.dispose()
+        await close_redis()  # Created on this loop by the tasks that used it
+
+    try:
+        asyncio.run_coroutine_threadsafe(close(), runtime.loop).result(timeout=10)
+    finally:
+        runtime.loop.call_soon_threadsafe(runtime.loop.stop)
+        runtime.thread.join(timeout=5)
+        _runtime = None
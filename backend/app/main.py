@@ -5,11 +5,15 @@ from fastapi.exceptions import RequestValidationError
 from contextlib import asynccontextmanager
 import logging
 from app.core.config import settings
-from app.core.database import engine
+from app.core.compression import CompressionMiddleware
+from app.core.responses import ApiResponse, WireFormatMiddleware
+from app.core.database import dispose_engines
+from app.core.redis import close_redis
 from app.api.routes import (
     auth, doctors, appointments, prescriptions, patients,
-    reports, billing, notifications, onboarding, medical_records
-    # Commented out - tables don't exist: templates, favorites, signatures, tests, reminders, notification_preferences
+    reports, billing, notifications, onboarding, medical_records, search, medicines, timeline,
+    dashboard, blobs, reminders
+    # Commented out - tables don't exist: templates, favorites, signatures, tests, notification_preferences
     # Commented out -  routes moved to prescriptions.py: medical_history
 )
 
@@ -29,7 +33,8 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     logger.info("Shutting down Healthcare Management Platform API")
-    await engine.dispose()
+    await dispose_engines()
+    await close_redis()
 
 
 # Create FastAPI app
@@ -40,6 +45,7 @@ app = FastAPI(
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     openapi_url="/api/openapi.json",
+    default_response_class=ApiResponse,  # JSON or MessagePack (Accept)
     lifespan=lifespan
 )
 
@@ -50,8 +56,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Sync-Watermark"],  # Conditional GETs and delta sync
 )
 
+# JSON / MessagePack negotiation for ApiResponse
+app.add_middleware(WireFormatMiddleware)
+
+# brotli/gzip compression (added last, so it wraps everything above)
+if settings.RESPONSE_COMPRESSION:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
 
 # Exception handlers
 @app.exception_handler(RequestValidationError)
@@ -110,16 +124,21 @@ app.include_router(patients.router, prefix="/api/v1/patients", tags=["Patients"]
 app.include_router(appointments.router, prefix="/api/v1")
 app.include_router(prescriptions.router, prefix="/api/v1")  # includes medical-history
 app.include_router(medical_records.router, prefix="/api/v1/medical-records", tags=["Medical Records"])
+app.include_router(reminders.router, prefix="/api/v1")
 # Commented out - tables don't exist:
 # app.include_router(templates.router, prefix="/api/v1")
 # app.include_router(favorites.router, prefix="/api/v1")
 # app.include_router(signatures.router, prefix="/api/v1")
 # app.include_router(tests.router, prefix="/api/v1")
-# app.include_router(reminders.router, prefix="/api/v1")
 # app.include_router(notification_preferences.router, prefix="/api/v1")
 app.include_router(reports.router, prefix="/api/v1")
 app.include_router(billing.router, prefix="/api/v1")
 app.include_router(notifications.router, prefix="/api/v1")
+app.include_router(search.router, prefix="/api/v1")
+app.include_router(medicines.router, prefix="/api/v1")
+app.include_router(timeline.router, prefix="/api/v1")
+app.include_router(dashboard.router, prefix="/api/v1")
+app.include_router(blobs.router, prefix="/api/v1")
 
 
 # Root endpoint
@@ -2,13 +2,15 @@
 from app.models.user import User, RefreshToken, UserRole
 from app.models.patient import Patient, Gender
 from app.models.doctor import Doctor
-from app.models.appointment import Appointment
+from app.models.appointment import Appointment, AppointmentDate
 from app.models.medical import (
     MedicalRecord, Prescription
 )
 from app.models.report import Report
 from app.models.billing import Bill, BillItem, ChargeType, PaymentStatus
 from app.models.notification import Notification
+from app.models.timeline import PatientTimelineEvent
+from app.models.sync import PatientSyncVersion, PatientSyncTombstone, SyncOperation, UsageFlushBatch
 
 # --- SymptoTrack PRD v1.0: New models ---
 from app.models.reminder import (
@@ -33,16 +35,22 @@ from app.models.prescription_extras import (
     TestOrderStatus, NotificationChannel, DevicePlatform
 )
 
+# Registers the after_flush hook that keeps patient_timeline in step with
+# its source tables, in every process that writes through the ORM
+from app.services import patient_timeline  # noqa: F401
+
 __all__ = [
     # Existing
     "User", "RefreshToken", "UserRole",
     "Patient", "Gender",
     "Doctor",
-    "Appointment",
+    "Appointment", "AppointmentDate",
     "MedicalRecord", "Prescription",
     "Report",
     "Bill", "BillItem", "ChargeType", "PaymentStatus",
     "Notification",
+    "PatientTimelineEvent",
+    "PatientSyncVersion", "PatientSyncTombstone", "SyncOperation", "UsageFlushBatch",
     # Reminders
     "MedicineReminder", "MedicineReminderLog", "FollowUpReminder", "TestReminder",
     "ReminderStatus", "FollowUpStatus", "TestUploadStatus",
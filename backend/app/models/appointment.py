@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Date, Time, Text, DateTime
+from sqlalchemy import Column, String, Integer, Date, Time, Text, DateTime, Index, text
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -9,7 +9,9 @@ class Appointment(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     patient_id = Column(Integer, nullable=True)
     doctor_id = Column(Integer, nullable=True)
-    appointment_date = Column(Date, nullable=False)
+    # Partition key (monthly, migrations/007); part of the primary key so
+    # ORM updates/deletes of a loaded row touch a single partition
+    appointment_date = Column(Date, primary_key=True, nullable=False)
     appointment_time = Column(Time, nullable=False)
     status = Column(String(20), default='scheduled')
     reason = Column(Text, nullable=True)
@@ -19,3 +21,29 @@ class Appointment(Base):
     status_updated_at = Column(DateTime, nullable=True)
     cancellation_reason = Column(Text, nullable=True)
     rescheduled_from = Column(Integer, nullable=True)
+
+    # Created by migrations/006_hot_query_indexes.sql
+    __table_args__ = (
+        Index("ix_appointments_patient_date", "patient_id", "appointment_date"),
+        Index("ix_appointments_doctor_date", "doctor_id", "appointment_date"),
+        Index(
+            "ix_appointments_scheduled_date", "appointment_date",
+            postgresql_where=text("status = 'scheduled'")
+        ),
+        Index(
+            "ix_appointments_reminder_sweep", "appointment_date",
+            postgresql_where=text("status IN ('confirmed', 'booked')")
+        ),
+        {"postgresql_partition_by": "RANGE (appointment_date)"},
+    )
+
+
+class AppointmentDate(Base):
+    """
+    Partition key of each appointment by id (see migrations/017_appointment_dates.sql).
+    Maintained by a database trigger, never by the app.
+    """
+    __tablename__ = "appointment_dates"
+
+    id = Column(Integer, primary_key=True)
+    appointment_date = Column(Date, nullable=False)
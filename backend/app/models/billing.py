@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Numeric, Date, Text, Boolean, DateTime, Enum as SQLEnum, ForeignKey
+from sqlalchemy import Column, String, Integer, Numeric, Date, Text, Boolean, DateTime, Enum as SQLEnum, ForeignKey, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 import uuid
@@ -32,7 +32,8 @@ class Bill(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     bill_number = Column(String(50), unique=True, nullable=False, index=True)
     patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.id", ondelete="CASCADE"), nullable=False, index=True)
-    appointment_id = Column(UUID(as_uuid=True), ForeignKey("appointments.id", ondelete="SET NULL"), nullable=True)
+    # No FK: partitioned appointments are unique on (id, appointment_date) only
+    appointment_id = Column(UUID(as_uuid=True), nullable=True)
     bill_date = Column(Date, nullable=False, index=True)
     subtotal = Column(Numeric(10, 2), nullable=False)
     tax_amount = Column(Numeric(10, 2), default=0)
@@ -47,6 +48,14 @@ class Bill(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     is_deleted = Column(Boolean, default=False)
 
+    # Created by migrations/006_hot_query_indexes.sql
+    __table_args__ = (
+        Index(
+            "ix_bills_patient_date_active", "patient_id", "bill_date",
+            postgresql_where=text("is_deleted = false")
+        ),
+    )
+
 
 class BillItem(Base):
     __tablename__ = "bill_items"
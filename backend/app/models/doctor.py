@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Numeric, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, Numeric, Boolean, DateTime, Text, ForeignKey
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -20,6 +20,20 @@ class Doctor(Base):
     is_available = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Onboarding profile fields
+    gender = Column(String(10), nullable=True)
+    registration_number = Column(String(100), unique=True, nullable=True)
+    about = Column(Text, nullable=True)
+    profile_picture = Column(String(500), nullable=True)
+    is_deleted = Column(Boolean, default=False)
+
+    # SymptoTrack: Clinic, NMC
+    clinic_name = Column(String(200), nullable=True)
+    clinic_address = Column(Text, nullable=True)
+    clinic_logo = Column(String(500), nullable=True)
+    state_medical_council = Column(String(100), nullable=True)
+    hfr_id = Column(String(50), nullable=True)
     
     @property
     def full_name(self) -> str:
@@ -1,4 +1,6 @@
-from sqlalchemy import Column, String, Integer, Date, Text, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, Date, Text, DateTime, ForeignKey, Computed, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -9,7 +11,8 @@ class MedicalRecord(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     patient_id = Column(Integer, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False, index=True)
     doctor_id = Column(Integer, ForeignKey("doctors.id", ondelete="CASCADE"), nullable=False, index=True)
-    appointment_id = Column(Integer, ForeignKey("appointments.id", ondelete="SET NULL"), nullable=True)
+    # No FK: partitioned appointments are unique on (id, appointment_date) only
+    appointment_id = Column(Integer, nullable=True)
     diagnosis = Column(Text, nullable=False)
     symptoms = Column(Text, nullable=True)
     treatment = Column(Text, nullable=True)
@@ -17,6 +20,20 @@ class MedicalRecord(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    # Full-text search document, maintained by Postgres (see migrations/004_search_indexes.sql)
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(diagnosis, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(symptoms, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(treatment, '')), 'C')",
+        persisted=True
+    )))
+
+    # Created by migrations/006_hot_query_indexes.sql
+    __table_args__ = (
+        Index("ix_medical_records_patient_visit", "patient_id", "visit_date"),
+        Index("ix_medical_records_doctor_visit", "doctor_id", "visit_date"),
+    )
+
 
 class Prescription(Base):
     __tablename__ = "prescriptions"
@@ -32,3 +49,17 @@ class Prescription(Base):
     instructions = Column(Text, nullable=True)
     prescribed_date = Column(Date, nullable=True, server_default=func.current_date())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Full-text search document, maintained by Postgres (see migrations/004_search_indexes.sql)
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(medication_name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(instructions, '')), 'C')",
+        persisted=True
+    )))
+
+    # Created by migrations/006_hot_query_indexes.sql
+    __table_args__ = (
+        Index("ix_prescriptions_patient_date", "patient_id", "prescribed_date"),
+        Index("ix_prescriptions_doctor_date", "doctor_id", "prescribed_date"),
+    )
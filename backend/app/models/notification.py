@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, Text, Boolean, DateTime, ForeignKey, Index, text
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -14,4 +14,15 @@ class Notification(Base):
     priority = Column(String(20), nullable=True)
     is_read = Column(Boolean, default=False)
     send_via = Column(String(20), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Partition key (monthly, migrations/007)
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+
+    # Created by migrations/006_hot_query_indexes.sql
+    __table_args__ = (
+        Index("ix_notifications_user_created", "user_id", "created_at"),
+        Index(
+            "ix_notifications_user_unread", "user_id", "created_at",
+            postgresql_where=text("is_read = false")
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
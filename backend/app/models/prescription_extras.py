@@ -10,9 +10,10 @@ SymptoTrack Prescription Extras Models
 """
 from sqlalchemy import (
     Column, String, Integer, Text, Boolean, DateTime, Date, Time,
-    Enum as SQLEnum, ForeignKey
+    Enum as SQLEnum, ForeignKey, Computed
 )
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 import uuid
 import enum
@@ -114,6 +115,14 @@ class DoctorMedicineFavorite(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    # Full-text search document, maintained by Postgres (see migrations/004_search_indexes.sql)
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(medicine_name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(category, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(usage_instructions, '')), 'C')",
+        persisted=True
+    )))
+
 
 # ============================================================
 # PRESCRIPTION TEMPLATES
@@ -216,6 +225,7 @@ class NotificationPreference(Base):
     quiet_hours_enabled = Column(Boolean, default=True)
     quiet_hours_start = Column(Time, nullable=True)  # Default: 22:00
     quiet_hours_end = Column(Time, nullable=True)  # Default: 07:00
+    timezone = Column(String(64), nullable=True)  # IANA name; NULL = NOTIFICATION_DEFAULT_TIMEZONE
 
     # Preferred channel
     preferred_channel = Column(
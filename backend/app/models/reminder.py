@@ -5,14 +5,14 @@ SymptoTrack Reminder Models
 - TestReminder: Tracks ordered tests and upload status
 """
 from sqlalchemy import (
-    Column, String, Integer, Date, Boolean, DateTime,
-    Enum as SQLEnum, ForeignKey, Time
+    Column, String, Integer, SmallInteger, Date, Boolean, DateTime,
+    Enum as SQLEnum, ForeignKey, Time, Index, text
 )
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
-import uuid
 import enum
 from app.core.database import Base
+from app.services.frequency_registry import timing_slots_for, encode_timing_slots
 
 
 # ============================================================
@@ -40,6 +40,14 @@ class TestUploadStatus(str, enum.Enum):
     MISSING = "missing"
 
 
+def _status_column_type(enum_cls):
+    """VARCHAR + CHECK in migrations/001_symptotrack_schema_integer.sql, not a PG enum"""
+    return SQLEnum(
+        enum_cls, native_enum=False, create_constraint=False, length=20,
+        values_callable=lambda members: [m.value for m in members]
+    )
+
+
 # ============================================================
 # MEDICINE REMINDERS
 # ============================================================
@@ -52,19 +60,14 @@ class MedicineReminder(Base):
     """
     __tablename__ = "medicine_reminders"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     prescription_id = Column(
-        UUID(as_uuid=True),
+        Integer,
         ForeignKey("prescriptions.id", ondelete="CASCADE"),
         nullable=False, index=True
     )
-    prescription_medicine_id = Column(
-        UUID(as_uuid=True),
-        ForeignKey("prescription_medicines.id", ondelete="CASCADE"),
-        nullable=False
-    )
     patient_id = Column(
-        UUID(as_uuid=True),
+        Integer,
         ForeignKey("patients.id", ondelete="CASCADE"),
         nullable=False, index=True
     )
@@ -74,16 +77,18 @@ class MedicineReminder(Base):
     dosage = Column(String(100), nullable=False)
     frequency_code = Column(String(50), nullable=False)  # e.g. "1-0-1"
 
-    # Timing slots derived from frequency_code
-    # e.g. [{"time": "08:00", "label": "Morning"}, {"time": "20:00", "label": "Night"}]
-    timing_slots = Column(JSONB, nullable=False, default=[])
+    # Timing slots derived from frequency_code, stored as a bitmask
+    # (see app.services.frequency_registry) plus patient-specific times
+    # e.g. slot_mask=9 (Morning | Night), timing_overrides={"night": "22:30"}
+    slot_mask = Column(SmallInteger, nullable=False, default=1)
+    timing_overrides = Column(JSONB, nullable=True)
 
     # Duration
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
 
     # State
-    status = Column(SQLEnum(ReminderStatus), default=ReminderStatus.ACTIVE, index=True)
+    status = Column(_status_column_type(ReminderStatus), default=ReminderStatus.ACTIVE, index=True)
     is_active = Column(Boolean, default=True, index=True)
     is_critical = Column(Boolean, default=False)  # Insulin, heart meds → vibrate only in quiet hours
 
@@ -99,6 +104,15 @@ class MedicineReminder(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    @property
+    def timing_slots(self):
+        """Expanded slots, e.g. [{"time": "08:00", "label": "Morning"}, ...]"""
+        return timing_slots_for(self.slot_mask or 0, self.timing_overrides)
+
+    @timing_slots.setter
+    def timing_slots(self, slots):
+        self.slot_mask, self.timing_overrides = encode_timing_slots(slots)
+
 
 class MedicineReminderLog(Base):
     """
@@ -106,18 +120,23 @@ class MedicineReminderLog(Base):
     """
     __tablename__ = "medicine_reminder_logs"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     reminder_id = Column(
-        UUID(as_uuid=True),
+        Integer,
         ForeignKey("medicine_reminders.id", ondelete="CASCADE"),
         nullable=False, index=True
     )
-    scheduled_time = Column(DateTime(timezone=True), nullable=False)
+    # Partition key (monthly, migrations/007)
+    scheduled_time = Column(DateTime(timezone=True), primary_key=True, nullable=False)
     action = Column(String(20), nullable=False)  # taken, missed, snoozed
     action_time = Column(DateTime(timezone=True), nullable=True)
     snoozed_until = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        {"postgresql_partition_by": "RANGE (scheduled_time)"},
+    )
+
 
 # ============================================================
 # FOLLOW-UP REMINDERS
@@ -130,19 +149,19 @@ class FollowUpReminder(Base):
     """
     __tablename__ = "follow_up_reminders"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     prescription_id = Column(
-        UUID(as_uuid=True),
+        Integer,
         ForeignKey("prescriptions.id", ondelete="CASCADE"),
         nullable=False, index=True
     )
     patient_id = Column(
-        UUID(as_uuid=True),
+        Integer,
         ForeignKey("patients.id", ondelete="CASCADE"),
         nullable=False, index=True
     )
     doctor_id = Column(
-        UUID(as_uuid=True),
+        Integer,
         ForeignKey("doctors.id", ondelete="CASCADE"),
         nullable=False
     )
@@ -156,13 +175,24 @@ class FollowUpReminder(Base):
     reminder_1day_sent_at = Column(DateTime(timezone=True), nullable=True)
     reminder_morning_sent = Column(Boolean, default=False)
     reminder_morning_sent_at = Column(DateTime(timezone=True), nullable=True)
+    # When the cascade next needs a look (app/services/follow_up_cascade.py);
+    # NULL once no stage is left
+    next_fire_at = Column(DateTime(timezone=True), nullable=True)
 
     # Status
-    status = Column(SQLEnum(FollowUpStatus), default=FollowUpStatus.UPCOMING, index=True)
+    status = Column(_status_column_type(FollowUpStatus), default=FollowUpStatus.UPCOMING, index=True)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    # Created by migrations/015_follow_up_cascade.sql
+    __table_args__ = (
+        Index(
+            "ix_follow_up_reminders_next_fire", "next_fire_at",
+            postgresql_where=text("next_fire_at IS NOT NULL")
+        ),
+    )
+
 
 # ============================================================
 # TEST / INVESTIGATION REMINDERS
@@ -175,19 +205,19 @@ class TestReminder(Base):
     """
     __tablename__ = "test_reminders"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     prescription_id = Column(
-        UUID(as_uuid=True),
+        Integer,
         ForeignKey("prescriptions.id", ondelete="CASCADE"),
         nullable=False, index=True
     )
     test_order_id = Column(
-        UUID(as_uuid=True),
+        Integer,
         ForeignKey("tests_ordered.id", ondelete="CASCADE"),
         nullable=False
     )
     patient_id = Column(
-        UUID(as_uuid=True),
+        Integer,
         ForeignKey("patients.id", ondelete="CASCADE"),
         nullable=False, index=True
     )
@@ -203,12 +233,12 @@ class TestReminder(Base):
 
     # Upload tracking
     upload_status = Column(
-        SQLEnum(TestUploadStatus),
+        _status_column_type(TestUploadStatus),
         default=TestUploadStatus.ORDERED, index=True
     )
     report_id = Column(
-        UUID(as_uuid=True),
-        ForeignKey("medical_reports.id", ondelete="SET NULL"),
+        Integer,
+        ForeignKey("reports.id", ondelete="SET NULL"),
         nullable=True
     )
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Date, Text, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, BigInteger, Boolean, Date, Text, DateTime, ForeignKey
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -13,5 +13,9 @@ class Report(Base):
     report_date = Column(Date, nullable=False)
     findings = Column(Text, nullable=True)
     file_url = Column(String(500), nullable=True)
+    file_name = Column(String(255), nullable=True)
+    file_content_type = Column(String(100), nullable=True)  # Sniffed from the bytes on upload
+    file_size = Column(BigInteger, nullable=True)
+    file_previews = Column(Boolean, default=False)  # Thumbnail and preview generated
     test_name = Column(String(200), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
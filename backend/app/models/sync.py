@@ -0,0 +1,67 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Text, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class PatientSyncVersion(Base):
+    """
+    Per-patient change counter (see migrations/012_patient_sync.sql).
+    Bumped by database triggers on every synced row change, never by the app.
+    """
+    __tablename__ = "patient_sync_versions"
+
+    patient_id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    changed_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class PatientSyncTombstone(Base):
+    """A deleted synced row, reported to delta-sync clients."""
+    __tablename__ = "patient_sync_tombstones"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    patient_id = Column(Integer, nullable=False)
+    entity = Column(String(50), nullable=False)  # Table name of the deleted row
+    row_id = Column(Text, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_patient_sync_tombstones_patient", "patient_id", "entity", "deleted_at"),
+        Index("ix_patient_sync_tombstones_deleted_at", "deleted_at"),
+    )
+
+
+class SyncOperation(Base):
+    """
+    An offline operation applied by POST /reminders/sync, keyed by the
+    client's idempotency key (see migrations/013_reminder_sync.sql).
+    """
+    __tablename__ = "sync_operations"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    idempotency_key = Column(String(64), primary_key=True)
+    op = Column(String(20), nullable=False)
+    result = Column(JSONB, nullable=True)  # Replayed when the key is sent again
+    applied_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_sync_operations_applied_at", "applied_at"),
+    )
+
+
+class UsageFlushBatch(Base):
+    """
+    A batch of buffered usage counts applied by UsageCounter.flush, recorded
+    in the same transaction so a batch is never applied twice
+    (see migrations/016_usage_flush_batches.sql).
+    """
+    __tablename__ = "usage_flush_batches"
+
+    batch_id = Column(String(36), primary_key=True)
+    kind = Column(String(20), nullable=False)
+    applied_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_usage_flush_batches_applied_at", "applied_at"),
+    )
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Text, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class PatientTimelineEvent(Base):
+    """
+    Denormalized patient history row (see migrations/008_patient_timeline.sql).
+    Written by app.services.patient_timeline, never directly by routes.
+    """
+    __tablename__ = "patient_timeline"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    patient_id = Column(Integer, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False)
+    event_type = Column(String(30), nullable=False)  # appointment, medical_record, prescription, report
+    source_id = Column(Text, nullable=False)
+    occurred_at = Column(DateTime(timezone=True), nullable=False)
+    doctor_id = Column(Integer, nullable=True)
+    title = Column(String(255), nullable=False)
+    summary = Column(Text, nullable=True)
+    status = Column(String(30), nullable=True)
+    details = Column(JSONB, nullable=False, server_default="{}")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("event_type", "source_id", name="uq_patient_timeline_source"),
+        Index(
+            "ix_patient_timeline_patient_occurred",
+            "patient_id", occurred_at.desc(), id.desc()
+        ),
+    )
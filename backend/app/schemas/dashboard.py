@@ -0,0 +1,38 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from datetime import date, datetime, time
+
+
+class QueueEntry(BaseModel):
+    appointment_id: int
+    patient_id: Optional[int] = None
+    patient_name: Optional[str] = None
+    appointment_time: time
+    status: Optional[str] = None
+    reason: Optional[str] = None
+
+
+class TodaySummary(BaseModel):
+    total: int
+    by_status: Dict[str, int]
+    queue: List[QueueEntry]
+
+
+class PendingTestsSummary(BaseModel):
+    count: int
+    overdue: int
+    next_due_date: Optional[date] = None
+
+
+class ActivePatientsSummary(BaseModel):
+    last_30_days: int
+    last_90_days: int
+
+
+class DoctorDashboardResponse(BaseModel):
+    doctor_id: int
+    date: date
+    refreshed_at: Optional[datetime] = None  # Oldest view refresh; figures may lag writes by this much
+    today: TodaySummary
+    pending_tests: PendingTestsSummary
+    active_patients: ActivePatientsSummary
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class MedicineSuggestion(BaseModel):
+    name: str
+    usage_count: int
+    is_favorite: bool
+    source: str  # doctor, global
+
+
+class MedicineAutocompleteResponse(BaseModel):
+    query: str
+    results: List[MedicineSuggestion]
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import Optional, List, Union
+from datetime import date
+from uuid import UUID
+
+
+class SearchHit(BaseModel):
+    type: str  # prescription, medical_record, favorite
+    id: Union[int, UUID]
+    patient_id: Optional[int] = None
+    doctor_id: Optional[Union[int, UUID]] = None
+    title: str
+    date: Optional[date] = None
+    highlight: Optional[str] = None  # Matched fragments wrapped in <mark>
+    rank: float
+
+
+class SearchResponse(BaseModel):
+    query: str
+    results: List[SearchHit]
+    limit: int
+    offset: int
@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+
+class TimelineEventResponse(BaseModel):
+    id: int
+    event_type: str  # appointment, medical_record, prescription, report
+    source_id: str
+    occurred_at: datetime
+    doctor_id: Optional[int] = None
+    title: str
+    summary: Optional[str] = None
+    status: Optional[str] = None
+    details: Dict[str, Any] = {}
+
+    class Config:
+        from_attributes = True
+
+
+class TimelineResponse(BaseModel):
+    patient_id: int
+    events: List[TimelineEventResponse]
+    next_cursor: Optional[str] = None  # Pass as ?cursor= for the next page; None on the last page
@@ -1,10 +1,12 @@
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_process_shutdown, worker_shutdown
+from kombu import Queue
 from datetime import datetime, timedelta, date
-from typing import Dict
-import asyncio
+from typing import Dict, List, Optional
 
 from app.core.config import settings
+from app.core.task_runtime import run_async, run_in_session, shutdown as shutdown_task_runtime, task_engine
 from app.services.email_service import EmailService
 
 celery_app = Celery(
@@ -19,13 +21,77 @@ celery_app.conf.update(
     result_serializer="json",
     timezone="UTC",
     enable_utc=True,
-    task_track_started=True,
     task_time_limit=30 * 60,  # 30 minutes
     task_soft_time_limit=25 * 60,  # 25 minutes
     broker_connection_retry_on_startup=False,  # Don't block FastAPI startup
     broker_connection_retry=True,  # Retry during task execution
     broker_connection_max_retries=10,
+    # Every task is fire-and-forget: nothing reads results, so don't store them
+    task_ignore_result=True,
+    task_store_errors_even_if_ignored=False,
+    # Tasks are acked when they start (at most once): redelivering a
+    # half-run notification task would send the email or SMS twice. Only
+    # tasks safe to run again opt in to late acks (REDELIVER_ON_CRASH).
+    task_acks_late=False,
+    # Prefetch one message per process so priorities and other workers
+    # are not starved by a backlog held in one worker's buffer
+    worker_prefetch_multiplier=1,
+    # Redis broker: per-priority lists, 0 = most urgent; the visibility
+    # timeout (redelivery of unacked tasks) must exceed task_time_limit
+    broker_transport_options={
+        "queue_order_strategy": "priority",
+        "priority_steps": list(range(10)),
+        "sep": ":",
+        "visibility_timeout": 60 * 60,
+    },
+    task_default_priority=5,
+)
+
+# Options of idempotent tasks: ack after the task runs, so a task lost
+# with its worker is redelivered and run again
+REDELIVER_ON_CRASH = {"acks_late": True, "reject_on_worker_lost": True}
+
+# Queues, each run by its own worker (see Procfile / docker-compose.yml):
+# - realtime: user-facing notifications (booking, status, prescription emails)
+# - bulk: fan-out work (reminder emails from the daily sweep)
+# - scheduled: beat-driven sweeps and maintenance
+# - derivatives: CPU-heavy report rendering; the worker's prefork processes
+#   are the render pool
+# A worker started without -Q consumes all of them (single-process dev setups).
+celery_app.conf.task_queues = (
+    Queue("realtime"),
+    Queue("bulk"),
+    Queue("scheduled"),
+    Queue("derivatives"),
 )
+celery_app.conf.task_default_queue = "bulk"  # Unrouted tasks never crowd out realtime
+celery_app.conf.task_routes = {
+    'send_email': {'queue': 'realtime'},
+    'send_appointment_booking_email': {'queue': 'realtime'},
+    'send_appointment_status_email': {'queue': 'realtime'},
+    'send_prescription_notification_email': {'queue': 'realtime'},
+    'send_sms': {'queue': 'realtime'},
+    'process_prescription_notification': {'queue': 'realtime'},
+    'process_bill_notification': {'queue': 'realtime'},
+    'send_appointment_reminder': {'queue': 'bulk'},
+    'check_appointment_reminders': {'queue': 'scheduled'},
+    'flush_usage_counts': {'queue': 'scheduled'},
+    'maintain_partitions': {'queue': 'scheduled'},
+    'collect_orphan_blobs': {'queue': 'scheduled'},
+    'refresh_dashboard_views': {'queue': 'scheduled'},
+    'rebuild_patient_timeline': {'queue': 'scheduled'},
+    'prune_sync_tombstones': {'queue': 'scheduled'},
+    'dispatch_follow_up_reminders': {'queue': 'scheduled'},
+    'send_follow_up_reminders': {'queue': 'bulk'},
+    'generate_report_derivatives': {'queue': 'derivatives'},
+}
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect  # Solo/threads pools run tasks in the main process
+def _close_task_runtime(**kwargs) -> None:
+    """Release the worker's pooled connections and event loop on exit."""
+    shutdown_task_runtime()
+
 
 # Configure periodic tasks
 celery_app.conf.beat_schedule = {
@@ -33,10 +99,34 @@ celery_app.conf.beat_schedule = {
         'task': 'check_appointment_reminders',
         'schedule': crontab(hour=9, minute=0),  # Run daily at 9 AM
     },
+    'flush-usage-counts': {
+        'task': 'flush_usage_counts',
+        'schedule': settings.USAGE_COUNT_FLUSH_SECONDS,
+    },
+    'maintain-partitions': {
+        'task': 'maintain_partitions',
+        'schedule': crontab(hour=2, minute=30),  # Daily, off-peak
+    },
+    'collect-orphan-blobs': {
+        'task': 'collect_orphan_blobs',
+        'schedule': crontab(hour=3, minute=0),  # Daily, off-peak
+    },
+    'refresh-dashboard-views': {
+        'task': 'refresh_dashboard_views',
+        'schedule': settings.DASHBOARD_REFRESH_SECONDS,
+    },
+    'prune-sync-tombstones': {
+        'task': 'prune_sync_tombstones',
+        'schedule': crontab(hour=3, minute=30),  # Daily, off-peak
+    },
+    'dispatch-follow-up-reminders': {
+        'task': 'dispatch_follow_up_reminders',
+        'schedule': settings.FOLLOW_UP_CASCADE_TICK_SECONDS,
+    },
 }
 
 
-@celery_app.task(name="send_email")
+@celery_app.task(name="send_email", priority=0)
 def send_email_task(to_email: str, subject: str, html_body: str) -> Dict:
     """Send email notification using Gmail SMTP."""
     try:
@@ -51,7 +141,7 @@ def send_email_task(to_email: str, subject: str, html_body: str) -> Dict:
         return {"status": "error", "to": to_email, "error": str(e)}
 
 
-@celery_app.task(name="send_appointment_booking_email")
+@celery_app.task(name="send_appointment_booking_email", priority=0)
 def send_appointment_booking_email(
     patient_email: str,
     patient_name: str,
@@ -82,7 +172,7 @@ def send_appointment_booking_email(
         return {"status": "error", "error": str(e)}
 
 
-@celery_app.task(name="send_appointment_status_email")
+@celery_app.task(name="send_appointment_status_email", priority=1)
 def send_appointment_status_email(
     patient_email: str,
     patient_name: str,
@@ -115,7 +205,7 @@ def send_appointment_status_email(
         return {"status": "error", "error": str(e)}
 
 
-@celery_app.task(name="send_appointment_reminder")
+@celery_app.task(name="send_appointment_reminder", priority=5)
 def send_appointment_reminder_task(
     patient_email: str,
     patient_name: str,
@@ -146,7 +236,7 @@ def send_appointment_reminder_task(
         return {"status": "error", "error": str(e)}
 
 
-@celery_app.task(name="send_prescription_notification_email")
+@celery_app.task(name="send_prescription_notification_email", priority=1)
 def send_prescription_notification_email(
     patient_email: str,
     patient_name: str,
@@ -189,71 +279,233 @@ def check_appointment_reminders() -> Dict:
         from app.models.user import User
         from app.models.patient import Patient
         from app.models.doctor import Doctor
-        from app.core.database import AsyncSessionLocal
         
-        async def send_reminders():
+        async def send_reminders(db):
             tomorrow = date.today() + timedelta(days=1)
             
-            async with AsyncSessionLocal() as db:
-                # Get appointments for tomorrow with status 'confirmed' or 'booked'
-                result = await db.execute(
-                    select(Appointment)
-                    .where(
-                        and_(
-                            Appointment.appointment_date == tomorrow,
-                            Appointment.status.in_(['confirmed', 'booked'])
-                        )
+            # Get appointments for tomorrow with status 'confirmed' or 'booked'
+            result = await db.execute(
+                select(Appointment)
+                .where(
+                    and_(
+                        Appointment.appointment_date == tomorrow,
+                        Appointment.status.in_(['confirmed', 'booked'])
                     )
                 )
-                appointments = result.scalars().all()
+            )
+            appointments = result.scalars().all()
+            
+            sent_count = 0
+            for appointment in appointments:
+                # Get patient details
+                patient_result = await db.execute(
+                    select(Patient, User)
+                    .join(User, Patient.user_id == User.id)
+                    .where(Patient.id == appointment.patient_id)
+                )
+                patient_data = patient_result.first()
+                if not patient_data:
+                    continue
                 
-                sent_count = 0
-                for appointment in appointments:
-                    # Get patient details
-                    patient_result = await db.execute(
-                        select(Patient, User)
-                        .join(User, Patient.user_id == User.id)
-                        .where(Patient.id == appointment.patient_id)
-                    )
-                    patient_data = patient_result.first()
-                    if not patient_data:
-                        continue
-                    
-                    patient, patient_user = patient_data
-                    
-                    # Get doctor details
-                    doctor_result = await db.execute(
-                        select(Doctor, User)
-                        .join(User, Doctor.user_id == User.id)
-                        .where(Doctor.id == appointment.doctor_id)
-                    )
-                    doctor_data = doctor_result.first()
-                    if not doctor_data:
-                        continue
-                    
-                    doctor, doctor_user = doctor_data
-                    
-                    # Send reminder
-                    send_appointment_reminder_task.delay(
-                        patient_email=patient_user.email,
-                        patient_name=patient.full_name,
-                        doctor_name=doctor.full_name,
-                        appointment_date=appointment.appointment_date.isoformat(),
-                        appointment_time=str(appointment.appointment_time),
-                        appointment_id=appointment.id
-                    )
-                    sent_count += 1
+                patient, patient_user = patient_data
+                
+                # Get doctor details
+                doctor_result = await db.execute(
+                    select(Doctor, User)
+                    .join(User, Doctor.user_id == User.id)
+                    .where(Doctor.id == appointment.doctor_id)
+                )
+                doctor_data = doctor_result.first()
+                if not doctor_data:
+                    continue
                 
-                return {"status": "completed", "reminders_sent": sent_count, "date": tomorrow.isoformat()}
+                doctor, doctor_user = doctor_data
+                
+                # Send reminder
+                send_appointment_reminder_task.delay(
+                    patient_email=patient_user.email,
+                    patient_name=patient.full_name,
+                    doctor_name=doctor.full_name,
+                    appointment_date=appointment.appointment_date.isoformat(),
+                    appointment_time=str(appointment.appointment_time),
+                    appointment_id=appointment.id
+                )
+                sent_count += 1
+            
+            return {"status": "completed", "reminders_sent": sent_count, "date": tomorrow.isoformat()}
         
-        # Run async function
-        return asyncio.run(send_reminders())
+        return run_in_session(send_reminders)
         
     except Exception as e:
         print(f"Error checking appointment reminders: {str(e)}")
         return {"status": "error", "error": str(e)}
 
 
+@celery_app.task(name="flush_usage_counts", **REDELIVER_ON_CRASH)
+def flush_usage_counts() -> Dict:
+    """
+    Periodic task applying buffered template/favorite usage counts.
+    Runs every USAGE_COUNT_FLUSH_SECONDS.
+    """
+    try:
+        from app.services.usage_counter import UsageCounter
+        
+        flushed = run_in_session(UsageCounter.flush)
+        return {
+            "status": "completed",
+            "flushed": {
+                kind: {"rows": rows, "increments": increments}
+                for kind, (rows, increments) in flushed.items()
+            },
+        }
+        
+    except Exception as e:
+        print(f"Error flushing usage counts: {str(e)}")
+        return {"status": "error", "error": str(e)}
+
+
+@celery_app.task(name="maintain_partitions", **REDELIVER_ON_CRASH)
+def maintain_partitions() -> Dict:
+    """
+    Periodic task creating upcoming monthly partitions and archiving old ones.
+    Runs daily at 2:30 AM.
+    """
+    try:
+        from app.services.partitions import PartitionMaintenance
+        
+        return {"status": "completed", **run_async(PartitionMaintenance.run(task_engine()))}
+        
+    except Exception as e:
+        print(f"Error maintaining partitions: {str(e)}")
+        return {"status": "error", "error": str(e)}
+
+
+@celery_app.task(name="collect_orphan_blobs", **REDELIVER_ON_CRASH)
+def collect_orphan_blobs() -> Dict:
+    """
+    Periodic task deleting stored blobs (signatures, reports, PDFs) that no
+    row references any more, and resumable report uploads left unfinished.
+    Runs daily at 3 AM.
+    """
+    try:
+        from app.services.blob_storage import BlobStorage
+        from app.services.report_uploads import ReportUploads
+        
+        expired_uploads = ReportUploads.expire_stale()
+        deleted = run_in_session(BlobStorage.collect_orphans)
+        return {"status": "completed", "deleted": len(deleted), "expired_uploads": expired_uploads}
+        
+    except Exception as e:
+        print(f"Error collecting orphan blobs: {str(e)}")
+        return {"status": "error", "error": str(e)}
+
+
+@celery_app.task(name="prune_sync_tombstones", **REDELIVER_ON_CRASH)
+def prune_sync_tombstones() -> Dict:
+    """
+    Periodic task deleting delta-sync tombstones older than
+    SYNC_TOMBSTONE_RETENTION_DAYS and offline-sync idempotency keys older
+    than SYNC_OPERATION_RETENTION_DAYS. Runs daily at 3:30 AM.
+    """
+    try:
+        from app.services.patient_sync import PatientSync
+        from app.services.reminder_sync import ReminderSync
+        
+        deleted = run_in_session(PatientSync.prune_tombstones)
+        operations = run_in_session(ReminderSync.prune_operations)
+        return {"status": "completed", "deleted": deleted, "operations": operations}
+        
+    except Exception as e:
+        print(f"Error pruning sync tombstones: {str(e)}")
+        return {"status": "error", "error": str(e)}
+
+
+@celery_app.task(name="dispatch_follow_up_reminders", **REDELIVER_ON_CRASH)
+def dispatch_follow_up_reminders() -> Dict:
+    """
+    Periodic task claiming due follow-up reminder stages (7 days before,
+    1 day before, morning of) and queueing them in batches.
+    Runs every FOLLOW_UP_CASCADE_TICK_SECONDS.
+    """
+    try:
+        from app.services.follow_up_cascade import FollowUpCascade
+        
+        batches = run_in_session(FollowUpCascade.claim_due)
+        for batch in batches:
+            send_follow_up_reminders.delay(batch)
+        return {"status": "completed", "reminders": sum(len(batch) for batch in batches), "batches": len(batches)}
+        
+    except Exception as e:
+        print(f"Error dispatching follow-up reminders: {str(e)}")
+        return {"status": "error", "error": str(e)}
+
+
+@celery_app.task(name="send_follow_up_reminders", priority=5)
+def send_follow_up_reminders(batch: List[Dict]) -> Dict:
+    """Send a batch of follow-up reminders claimed by dispatch_follow_up_reminders."""
+    try:
+        from app.services.follow_up_cascade import FollowUpCascade
+        
+        counts = run_in_session(lambda db: FollowUpCascade.send_batch(db, batch))
+        return {"status": "completed", **counts}
+        
+    except Exception as e:
+        print(f"Error sending follow-up reminders: {str(e)}")
+        return {"status": "error", "error": str(e)}
+
+
+@celery_app.task(name="generate_report_derivatives", **REDELIVER_ON_CRASH)
+def generate_report_derivatives(file_url: str, content_type: str) -> Dict:
+    """
+    Render the thumbnail and first-page preview of an uploaded report file
+    and flag the reports that use it. Queued after each upload.
+    """
+    try:
+        from app.services.derivatives import ReportDerivatives
+        
+        rendered = run_in_session(lambda db: ReportDerivatives.generate(db, file_url, content_type))
+        return {"status": "completed", "file_url": file_url, "rendered": rendered}
+        
+    except Exception as e:
+        print(f"Error generating derivatives for {file_url}: {str(e)}")
+        return {"status": "error", "file_url": file_url, "error": str(e)}
+
+
+@celery_app.task(name="refresh_dashboard_views", **REDELIVER_ON_CRASH)
+def refresh_dashboard_views() -> Dict:
+    """
+    Periodic task refreshing doctor dashboard views flagged by writes or
+    older than DASHBOARD_MAX_STALENESS_SECONDS.
+    Runs every DASHBOARD_REFRESH_SECONDS.
+    """
+    try:
+        from app.services.dashboard_views import DashboardViews
+        
+        return {"status": "completed", "refreshed": run_async(DashboardViews.refresh_due(task_engine()))}
+        
+    except Exception as e:
+        print(f"Error refreshing dashboard views: {str(e)}")
+        return {"status": "error", "error": str(e)}
+
+
+@celery_app.task(name="rebuild_patient_timeline", **REDELIVER_ON_CRASH)
+def rebuild_patient_timeline(patient_id: Optional[int] = None) -> Dict:
+    """
+    Backfill or repair the patient timeline read model.
+    Run on demand, e.g. after migrations/008 or bulk imports:
+        celery -A app.services.celery_tasks call rebuild_patient_timeline
+    """
+    try:
+        from app.services.patient_timeline import PatientTimeline
+        
+        events = run_in_session(lambda db: PatientTimeline.rebuild(db, patient_id))
+        return {"status": "completed", "patient_id": patient_id, "events": events}
+        
+    except Exception as e:
+        print(f"Error rebuilding patient timeline: {str(e)}")
+        return {"status": "error", "error": str(e)}
+
+
 @celery_app.task(name="send_sms")
 def send_sms_task(to_phone: str, message: str) -> Dict:
     """Send SMS notification (Twilio integration needed)."""
@@ -262,7 +514,7 @@ def send_sms_task(to_phone: str, message: str) -> Dict:
     return {"status": "not_implemented", "to": to_phone}
 
 
-@celery_app.task(name="process_prescription_notification")
+@celery_app.task(name="process_prescription_notification", priority=3)
 def process_prescription_notification_task(prescription_id: str, patient_email: str) -> Dict:
     """Legacy task - kept for compatibility."""
     subject = "New Prescription Available"
@@ -270,7 +522,7 @@ def process_prescription_notification_task(prescription_id: str, patient_email:
     return send_email_task(patient_email, subject, body)
 
 
-@celery_app.task(name="process_bill_notification")
+@celery_app.task(name="process_bill_notification", priority=6)
 def process_bill_notification_task(bill_id: str, patient_email: str, amount: str) -> Dict:
     """Notify patient about new bill."""
     subject = "Medical Bill Generated"
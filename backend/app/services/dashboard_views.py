@@ -0,0 +1,126 @@
+"""
+Dashboard Views Service for SymptoTrack
+Reads and refreshes the doctor dashboard materialized views
+(migrations/009_doctor_dashboard_views.sql).
+
+Statement triggers on the source tables flag the views a write affects in
+dashboard_view_state. The refresh_dashboard_views Celery task refreshes the
+flagged views, plus any view older than DASHBOARD_MAX_STALENESS_SECONDS
+(date-relative views such as "today" must move at midnight even without
+writes). REFRESH ... CONCURRENTLY never blocks dashboard reads.
+"""
+
+import logging
+from datetime import date
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_VIEWS = ("mv_doctor_queue", "mv_doctor_pending_tests", "mv_doctor_patients")
+REFRESH_LOCK = "dashboard_view_refresh"
+
+DUE_VIEWS = text("""
+    SELECT view_name FROM dashboard_view_state
+    WHERE dirty_since IS NOT NULL
+       OR refreshed_at IS NULL
+       OR refreshed_at < now() - make_interval(secs => :max_age)
+    ORDER BY dirty_since NULLS LAST
+""")
+
+QUEUE = text("""
+    SELECT appointment_id, patient_id, patient_name, appointment_time, status, reason
+    FROM mv_doctor_queue
+    WHERE doctor_id = :doctor_id AND appointment_date = :today
+    ORDER BY appointment_time, appointment_id
+""")
+
+STATS = text("""
+    SELECT t.pending_tests, t.overdue_tests, t.next_due_date,
+           p.active_patients_30d, p.active_patients_90d,
+           (SELECT min(refreshed_at) FROM dashboard_view_state) AS refreshed_at
+    FROM (SELECT CAST(:doctor_id AS integer) AS doctor_id) d
+    LEFT JOIN mv_doctor_pending_tests t ON t.doctor_id = d.doctor_id
+    LEFT JOIN mv_doctor_patients p ON p.doctor_id = d.doctor_id
+""")
+
+
+class DashboardViews:
+    """Doctor dashboard reads and materialized view refresh."""
+
+    @staticmethod
+    async def doctor_dashboard(db: AsyncSession, doctor_id: int) -> Dict:
+        """Today's queue and aggregate stats for one doctor, in two index lookups."""
+        today = date.today()
+        queue = (await db.execute(QUEUE, {"doctor_id": doctor_id, "today": today})).mappings().all()
+        stats = (await db.execute(STATS, {"doctor_id": doctor_id})).mappings().one()
+
+        by_status: Dict[str, int] = {}
+        for row in queue:
+            by_status[row["status"]] = by_status.get(row["status"], 0) + 1
+
+        return {
+            "doctor_id": doctor_id,
+            "date": today,
+            "refreshed_at": stats["refreshed_at"],
+            "today": {"total": len(queue), "by_status": by_status, "queue": [dict(row) for row in queue]},
+            "pending_tests": {
+                "count": stats["pending_tests"] or 0,
+                "overdue": stats["overdue_tests"] or 0,
+                "next_due_date": stats["next_due_date"],
+            },
+            "active_patients": {
+                "last_30_days": stats["active_patients_30d"] or 0,
+                "last_90_days": stats["active_patients_90d"] or 0,
+            },
+        }
+
+    @staticmethod
+    async def refresh_due(engine: AsyncEngine) -> List[str]:
+        """
+        Refresh flagged or stale views; returns the views refreshed.
+
+        An advisory lock keeps overlapping runs from refreshing the same
+        view twice. The flag is cleared before refreshing, so writes that
+        land during the refresh flag the view again for the next run.
+        """
+        refreshed = []
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            locked = (await conn.execute(
+                text("SELECT pg_try_advisory_lock(hashtext(:name))"), {"name": REFRESH_LOCK}
+            )).scalar_one()
+            if not locked:
+                return refreshed
+            try:
+                due = (await conn.execute(
+                    DUE_VIEWS, {"max_age": settings.DASHBOARD_MAX_STALENESS_SECONDS}
+                )).scalars().all()
+                for view in due:
+                    if view not in DASHBOARD_VIEWS:
+                        continue
+                    await conn.execute(
+                        text("UPDATE dashboard_view_state SET dirty_since = NULL WHERE view_name = :view"),
+                        {"view": view},
+                    )
+                    try:
+                        await conn.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"))
+                    except Exception:
+                        logger.exception(f"Refreshing {view} failed; will retry")
+                        await conn.execute(
+                            text("UPDATE dashboard_view_state SET dirty_since = now() WHERE view_name = :view"),
+                            {"view": view},
+                        )
+                        continue
+                    await conn.execute(
+                        text("UPDATE dashboard_view_state SET refreshed_at = now() WHERE view_name = :view"),
+                        {"view": view},
+                    )
+                    refreshed.append(view)
+            finally:
+                await conn.execute(text("SELECT pg_advisory_unlock(hashtext(:name))"), {"name": REFRESH_LOCK})
+        return refreshed
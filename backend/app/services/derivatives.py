@@ -0,0 +1,117 @@
+"""
+Derivative Service for SymptoTrack
+Thumbnails and first-page previews of uploaded report files, so list screens
+never download the multi-MB original.
+
+Derivatives are JPEGs stored next to the source's content hash
+(blob_storage.derived_key), so a file attached to several reports is
+rendered once. Rendering is CPU-bound and runs in the Celery worker
+processes of the "derivatives" queue (generate_report_derivatives task),
+never in the API. reports.file_previews is set once both variants exist.
+"""
+
+import logging
+from io import BytesIO
+from typing import Dict, List
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.report import Report
+from app.services.blob_storage import BlobStorage, derived_key
+
+logger = logging.getLogger(__name__)
+
+# Try to import Pillow for image derivatives
+try:
+    from PIL import Image, ImageOps
+    PIL_AVAILABLE = True
+except ImportError:
+    logger.warning("Pillow not installed. Report thumbnails will not be generated. Install with: pip install pillow")
+    PIL_AVAILABLE = False
+
+# Try to import pypdfium2 for PDF first-page rendering
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    PDFIUM_AVAILABLE = False
+
+# Variant -> longest edge in pixels; largest first, each is scaled from the previous
+VARIANTS = {"preview": 1280, "thumbnail": 320}
+JPEG_QUALITY = {"preview": 85, "thumbnail": 75}
+SUPPORTED_TYPES = {"application/pdf", "image/jpeg", "image/png"}
+MAX_SOURCE_PIXELS = 50_000_000  # Refuse decompression bombs
+
+
+def _first_page(data: bytes, content_type: str) -> "Image.Image":
+    largest = max(VARIANTS.values())
+    if content_type == "application/pdf":
+        if not PDFIUM_AVAILABLE:
+            raise RuntimeError("PDF previews need pypdfium2. Install with: pip install pypdfium2")
+        pdf = pdfium.PdfDocument(data)
+        try:
+            page = pdf[0]
+            width, height = page.get_size()  # Points
+            image = page.render(scale=largest / max(width, height)).to_pil()
+            page.close()
+        finally:
+            pdf.close()
+        return image
+
+    image = Image.open(BytesIO(data))
+    if image.width * image.height > MAX_SOURCE_PIXELS:
+        raise ValueError(f"Image too large to preview ({image.width}x{image.height})")
+    image.draft("RGB", (largest, largest))  # JPEG: decode at a reduced scale
+    return ImageOps.exif_transpose(image)
+
+
+def render_derivatives(data: bytes, content_type: str) -> Dict[str, bytes]:
+    """JPEG bytes of every variant of a PDF's first page or an image."""
+    image = _first_page(data, content_type).convert("RGB")
+    rendered = {}
+    for variant, edge in VARIANTS.items():
+        image.thumbnail((edge, edge), Image.LANCZOS)  # In place; never upscales
+        buffer = BytesIO()
+        image.save(buffer, "JPEG", quality=JPEG_QUALITY[variant], optimize=True, progressive=True)
+        rendered[variant] = buffer.getvalue()
+    return rendered
+
+
+class ReportDerivatives:
+    """Generate and link report thumbnails and previews."""
+
+    @staticmethod
+    def urls(file_url: str) -> Dict[str, str]:
+        """Cacheable URLs of a file's variants, e.g. {"thumbnail": ..., "preview": ...}."""
+        return {
+            variant: BlobStorage.cacheable_url(derived_key(file_url, variant), "image/jpeg", f"{variant}.jpg")
+            for variant in VARIANTS
+        }
+
+    @staticmethod
+    async def generate(db: AsyncSession, file_url: str, content_type: str) -> List[str]:
+        """
+        Render the variants of a stored file that do not exist yet, then flag
+        every report pointing at the file.
+
+        Returns:
+            Variants rendered (empty when all were cached)
+        """
+        if content_type not in SUPPORTED_TYPES or not PIL_AVAILABLE:
+            return []
+
+        missing = [v for v in VARIANTS if not await BlobStorage.exists(derived_key(file_url, v))]
+        if missing:
+            # Rendered in this worker process; variants are cheap once the page is decoded
+            rendered = render_derivatives(await BlobStorage.read_bytes(file_url), content_type)
+            for variant in missing:
+                await BlobStorage.put_derived(derived_key(file_url, variant), rendered[variant], "image/jpeg")
+
+        await db.execute(
+            update(Report)
+            .where(Report.file_url == file_url, Report.file_previews.isnot(True))
+            .values(file_previews=True)
+        )
+        await db.commit()
+        return missing
@@ -0,0 +1,167 @@
+"""
+Follow-up Reminder Cascade for SymptoTrack
+Reminds a patient of a follow-up visit three times: 7 days before, the
+day before and on the morning of the visit (STAGES), at local times in
+the patient's notification timezone.
+
+Each stage is deliverable from its fire time until the next stage's (the
+morning-of one until the end of the visit day), so a follow-up created 3
+days ahead still gets a "in 3 days" reminder, and a stage missed while
+the dispatcher was down is not sent late on top of the next one.
+
+follow_up_reminders.next_fire_at holds when a follow-up next needs
+attention. The dispatch_follow_up_reminders task runs every
+FOLLOW_UP_CASCADE_TICK_SECONDS and:
+1. claims every due follow-up across all patients with one indexed query
+   (FOR UPDATE SKIP LOCKED, so overlapping ticks never double-send);
+2. sets the due stage's sent marker, moves next_fire_at to the next
+   stage, and commits;
+3. queues the reminders to the bulk queue in batches of
+   FOLLOW_UP_CASCADE_BATCH_SIZE, each sent by send_batch with the
+   patients' notification policies loaded in one query.
+Stages are marked before they are sent: a send that fails is not retried
+by the next tick.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.doctor import Doctor
+from app.models.patient import Patient
+from app.models.reminder import FollowUpReminder, FollowUpStatus
+from app.services.notification_policy import notification_policies
+
+MAX_CLAIMED_PER_TICK = 5000  # The rest stay due for the next tick
+
+
+@dataclass(frozen=True)
+class CascadeStage:
+    """One reminder of the cascade."""
+    key: str
+    days_before: int
+    at: time  # Local time of day
+    sent_flag: str  # FollowUpReminder columns
+    sent_at: str
+
+
+STAGES: Tuple[CascadeStage, ...] = (
+    CascadeStage("7day", 7, time(10, 0), "reminder_7day_sent", "reminder_7day_sent_at"),
+    CascadeStage("1day", 1, time(18, 0), "reminder_1day_sent", "reminder_1day_sent_at"),
+    CascadeStage("morning", 0, time(8, 0), "reminder_morning_sent", "reminder_morning_sent_at"),
+)
+
+
+def _local(day: date, at: time, tz: ZoneInfo) -> datetime:
+    return datetime.combine(day, at, tzinfo=tz).astimezone(timezone.utc)
+
+
+def stage_windows(follow_up_date: date, tz: ZoneInfo) -> List[Tuple[CascadeStage, datetime, datetime]]:
+    """(stage, fire time, end of its window) in UTC, in cascade order."""
+    fires = [_local(follow_up_date - timedelta(days=s.days_before), s.at, tz) for s in STAGES]
+    ends = fires[1:] + [_local(follow_up_date + timedelta(days=1), time(0, 0), tz)]
+    return list(zip(STAGES, fires, ends))
+
+
+def due_stage(reminder: FollowUpReminder, tz: ZoneInfo, now: datetime) -> Optional[CascadeStage]:
+    """The unsent stage whose window contains `now`, if any."""
+    for stage, fire, end in stage_windows(reminder.follow_up_date, tz):
+        if fire <= now < end and not getattr(reminder, stage.sent_flag):
+            return stage
+    return None
+
+
+def next_fire_at(reminder: FollowUpReminder, tz: ZoneInfo, now: datetime) -> Optional[datetime]:
+    """Fire time of the first unsent stage whose window is still open."""
+    if reminder.status != FollowUpStatus.UPCOMING:
+        return None
+    for stage, fire, end in stage_windows(reminder.follow_up_date, tz):
+        if end > now and not getattr(reminder, stage.sent_flag):
+            return fire
+    return None
+
+
+class FollowUpCascade:
+    """Scheduling and batched dispatch of follow-up reminder stages."""
+
+    @staticmethod
+    async def schedule(db: AsyncSession, reminder: FollowUpReminder) -> None:
+        """Set next_fire_at of a new (or rescheduled) follow-up; the caller commits."""
+        result = await db.execute(select(Patient.user_id).where(Patient.id == reminder.patient_id))
+        user_id = result.scalar_one_or_none()
+        policy = await notification_policies.get(db, user_id)
+        reminder.next_fire_at = next_fire_at(reminder, policy.tz, datetime.now(timezone.utc))
+
+    @staticmethod
+    async def claim_due(db: AsyncSession) -> List[List[Dict[str, Any]]]:
+        """
+        Mark the due stage of every due follow-up as sent and advance its
+        next_fire_at, in one transaction.
+
+        Returns:
+            Batches of reminders to send ({"user_id", "doctor_name",
+            "follow_up_date", "days_remaining", "stage", "follow_up_id"}),
+            at most FOLLOW_UP_CASCADE_BATCH_SIZE each
+        """
+        now = datetime.now(timezone.utc)
+        result = await db.execute(
+            select(FollowUpReminder, Patient.user_id, Doctor.first_name, Doctor.last_name)
+            .join(Patient, Patient.id == FollowUpReminder.patient_id)
+            .join(Doctor, Doctor.id == FollowUpReminder.doctor_id)
+            .where(FollowUpReminder.next_fire_at <= now)
+            .order_by(FollowUpReminder.next_fire_at)
+            .limit(MAX_CLAIMED_PER_TICK)
+            .with_for_update(of=FollowUpReminder, skip_locked=True)
+        )
+        rows = result.all()
+        if not rows:
+            return []
+
+        policies = await notification_policies.get_many(db, [row.user_id for row in rows])
+        due = []
+        for reminder, user_id, first_name, last_name in rows:
+            tz = policies[user_id].tz
+            stage = due_stage(reminder, tz, now) if reminder.status == FollowUpStatus.UPCOMING else None
+            if stage:
+                setattr(reminder, stage.sent_flag, True)
+                setattr(reminder, stage.sent_at, now)
+                due.append({
+                    "user_id": user_id,
+                    "doctor_name": f"{first_name} {last_name}",
+                    "follow_up_date": reminder.follow_up_date.isoformat(),
+                    "days_remaining": (reminder.follow_up_date - now.astimezone(tz).date()).days,
+                    "stage": stage.key,
+                    "follow_up_id": str(reminder.id),
+                })
+            reminder.next_fire_at = next_fire_at(reminder, tz, now)
+        await db.commit()
+
+        size = settings.FOLLOW_UP_CASCADE_BATCH_SIZE
+        return [due[i:i + size] for i in range(0, len(due), size)]
+
+    @staticmethod
+    async def send_batch(db: AsyncSession, batch: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Send one batch from claim_due; returns sent/failed counts."""
+        from app.services.notification_service import NotificationService  # Pulls in firebase/twilio
+
+        policies = await notification_policies.get_many(db, [item["user_id"] for item in batch])
+        sent = failed = 0
+        for item in batch:
+            result = await NotificationService.send_follow_up_reminder(
+                user_id=item["user_id"],
+                doctor_name=item["doctor_name"],
+                follow_up_date=item["follow_up_date"],
+                days_remaining=item["days_remaining"],
+                db=db,
+                policy=policies[item["user_id"]],
+            )
+            if result.get("success"):
+                sent += 1
+            else:
+                failed += 1
+        return {"sent": sent, "failed": failed}
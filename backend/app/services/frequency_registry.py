@@ -0,0 +1,173 @@
+"""
+Frequency Registry
+Sprint 2.1: Reminder Engine Core
+
+Canonical, immutable table of medicine frequency codes.
+
+Each code resolves to a slot bitmask (Morning / Afternoon / Evening / Night).
+Reminders persist the bitmask in ``medicine_reminders.slot_mask`` and only
+store patient-specific time overrides, instead of repeating the full
+timing-slot JSON on every row.
+"""
+
+from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+
+# ============================================================
+# SLOT BITS
+# ============================================================
+
+SLOT_MORNING = 1
+SLOT_AFTERNOON = 2
+SLOT_EVENING = 4
+SLOT_NIGHT = 8
+
+
+class TimingSlot(NamedTuple):
+    """A single daily reminder slot."""
+    bit: int
+    key: str
+    label: str
+    time: str
+
+
+# Chronological order; slot JSON is always emitted in this order.
+SLOTS: Tuple[TimingSlot, ...] = (
+    TimingSlot(SLOT_MORNING, "morning", "Morning", "08:00"),
+    TimingSlot(SLOT_AFTERNOON, "afternoon", "Afternoon", "13:00"),
+    TimingSlot(SLOT_EVENING, "evening", "Evening", "18:00"),
+    TimingSlot(SLOT_NIGHT, "night", "Night", "21:00"),
+)
+
+DEFAULT_TIMINGS: Mapping[str, str] = MappingProxyType({s.key: s.time for s in SLOTS})
+
+_SLOTS_BY_LABEL: Mapping[str, TimingSlot] = MappingProxyType({s.label: s for s in SLOTS})
+
+# Abbreviation → slot mask
+FREQUENCY_CODES: Mapping[str, int] = MappingProxyType({
+    "OD": SLOT_MORNING,
+    "ONCE": SLOT_MORNING,
+    "BD": SLOT_MORNING | SLOT_NIGHT,
+    "BID": SLOT_MORNING | SLOT_NIGHT,
+    "TDS": SLOT_MORNING | SLOT_AFTERNOON | SLOT_NIGHT,
+    "TID": SLOT_MORNING | SLOT_AFTERNOON | SLOT_NIGHT,
+    "QDS": SLOT_MORNING | SLOT_AFTERNOON | SLOT_EVENING | SLOT_NIGHT,
+    "QID": SLOT_MORNING | SLOT_AFTERNOON | SLOT_EVENING | SLOT_NIGHT,
+})
+
+# Position in an "N-N-N[-N]" code → slot bit.
+# The 3rd position is the night dose and the 4th adds an evening dose,
+# matching how existing reminders were generated.
+_POSITION_BITS: Tuple[int, ...] = (SLOT_MORNING, SLOT_AFTERNOON, SLOT_NIGHT, SLOT_EVENING)
+
+
+@lru_cache(maxsize=1024)
+def slot_mask_for(frequency: str) -> int:
+    """
+    Resolve a frequency code to its slot bitmask.
+
+    Examples:
+    - "1-0-1" → SLOT_MORNING | SLOT_NIGHT
+    - "TDS"   → SLOT_MORNING | SLOT_AFTERNOON | SLOT_NIGHT
+
+    Unknown or empty patterns fall back to once daily (morning).
+    """
+    code = frequency.upper().strip()
+    mask = FREQUENCY_CODES.get(code)
+    if mask is not None:
+        return mask
+
+    mask = 0
+    for bit, part in zip(_POSITION_BITS, frequency.split("-")):
+        if part.strip() != "0":
+            mask |= bit
+
+    return mask or SLOT_MORNING
+
+
+@lru_cache(maxsize=None)
+def _default_slots(mask: int) -> Tuple[Tuple[str, str], ...]:
+    return tuple((s.time, s.label) for s in SLOTS if mask & s.bit)
+
+
+def timing_slots_for(
+    mask: int,
+    overrides: Optional[Dict[str, str]] = None
+) -> List[Dict[str, str]]:
+    """
+    Expand a slot mask into timing-slot dictionaries.
+
+    Args:
+        mask: Slot bitmask
+        overrides: Optional patient-specific times keyed by slot key,
+            e.g. {"night": "22:30"}
+
+    Returns:
+        List of {"time", "label"} dictionaries in chronological order
+    """
+    if not overrides:
+        return [{"time": t, "label": label} for t, label in _default_slots(mask)]
+
+    return [
+        {"time": overrides.get(s.key, s.time), "label": s.label}
+        for s in SLOTS
+        if mask & s.bit
+    ]
+
+
+def encode_timing_slots(slots: List[Dict[str, str]]) -> Tuple[int, Optional[Dict[str, str]]]:
+    """
+    Compress timing-slot dictionaries into (slot_mask, overrides).
+
+    Only times that differ from the registry defaults are kept as overrides.
+    """
+    mask = 0
+    overrides: Dict[str, str] = {}
+    for entry in slots:
+        slot = _SLOTS_BY_LABEL.get(entry.get("label"))
+        if slot is None:
+            continue
+        mask |= slot.bit
+        time_value = entry.get("time")
+        if time_value and time_value != slot.time:
+            overrides[slot.key] = time_value
+
+    return mask, (overrides or None)
+
+
+def timing_overrides_from(times: Dict[str, str]) -> Optional[Dict[str, str]]:
+    """
+    Validate patient slot times keyed by slot key, e.g. {"night": "22:30"},
+    and keep only those that differ from the defaults.
+
+    Raises:
+        ValueError: Unknown slot key, or a time that is not HH:MM
+    """
+    unknown = set(times) - set(DEFAULT_TIMINGS)
+    if unknown:
+        raise ValueError(f"Unknown timing slots: {', '.join(sorted(unknown))}")
+
+    for value in times.values():
+        try:
+            datetime.strptime(value, "%H:%M")
+        except ValueError:
+            raise ValueError(f"Invalid time '{value}', expected HH:MM") from None
+
+    overrides = {key: value for key, value in times.items() if value != DEFAULT_TIMINGS[key]}
+    return overrides or None
+
+
+def merge_timing_overrides(current: Optional[Dict[str, str]], changes: Dict[str, str]) -> Optional[Dict[str, str]]:
+    """
+    Overrides after changing the slots in `changes`; other slots keep their
+    current times, and a slot set back to its default loses its override.
+    Returns a new dict, so assigning it marks the JSON column changed.
+
+    Raises:
+        ValueError: As timing_overrides_from, for the changed slots
+    """
+    timing_overrides_from(changes)
+    return timing_overrides_from({**(current or {}), **changes})
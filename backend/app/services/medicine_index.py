@@ -0,0 +1,301 @@
+"""
+Medicine Autocomplete Index for SymptoTrack
+In-memory prefix index used while doctors type medicine names.
+
+Built from DoctorMedicineFavorite rows and past prescriptions, ranked by
+usage (favorite usage_count + times prescribed). Keeps one global index and
+one index per doctor, updated incrementally on writes and rebuilt
+periodically (in the background, on the read replica) so other worker
+processes converge.
+"""
+
+import asyncio
+import heapq
+import logging
+import time
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, func
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import ReadSessionLocal
+from app.models.medical import Prescription
+from app.models.prescription_extras import DoctorMedicineFavorite
+
+logger = logging.getLogger(__name__)
+
+REFRESH_INTERVAL_SECONDS = 300
+MAX_COMPLETIONS = 50  # Results cached per prefix
+MAX_CACHED_PREFIXES = 20000
+
+
+def normalize(name: str) -> str:
+    """Case- and whitespace-insensitive key for a medicine name."""
+    return " ".join(name.lower().split())
+
+
+@dataclass
+class MedicineEntry:
+    """One distinct medicine within an index."""
+    name: str
+    favorite_usage: int = 0
+    prescribed_count: int = 0
+    is_favorite: bool = False
+
+    @property
+    def score(self) -> int:
+        return self.favorite_usage + self.prescribed_count
+
+
+class PrefixIndex:
+    """
+    Sorted-array prefix index.
+
+    Every word start of a medicine name is a key ("insulin glargine" is found
+    by "ins" and "gla"); keys are kept sorted so a prefix is two bisects plus
+    a contiguous scan. Ranked results are cached per prefix and invalidated
+    only for the prefixes of a name whose score changed, so repeated
+    keystrokes are answered from the cache.
+    """
+
+    def __init__(self):
+        self._keys: List[Tuple[str, str]] = []  # (word-start suffix, normalized name)
+        self._entries: Dict[str, MedicineEntry] = {}
+        self._cache: Dict[str, List[MedicineEntry]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _suffixes(key: str) -> List[str]:
+        words = key.split(" ")
+        return [" ".join(words[i:]) for i in range(len(words))]
+
+    def _invalidate(self, key: str) -> None:
+        if not self._cache:
+            return
+        for suffix in self._suffixes(key):
+            for end in range(1, len(suffix) + 1):
+                self._cache.pop(suffix[:end], None)
+
+    def _entry(self, name: str) -> MedicineEntry:
+        key = normalize(name)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = MedicineEntry(name=name.strip())
+            self._entries[key] = entry
+            for suffix in self._suffixes(key):
+                insort(self._keys, (suffix, key))
+        self._invalidate(key)
+        return entry
+
+    def touch(self, name: str) -> None:
+        self._entry(name)
+
+    def add_prescribed(self, name: str, count: int = 1) -> None:
+        self._entry(name).prescribed_count += count
+
+    def favorite_usage(self, name: str) -> int:
+        entry = self._entries.get(normalize(name))
+        return entry.favorite_usage if entry is not None and entry.is_favorite else 0
+
+    def set_favorite(self, name: str, usage_count: int) -> None:
+        entry = self._entry(name)
+        entry.is_favorite = True
+        entry.favorite_usage = usage_count or 0
+
+    def unset_favorite(self, name: str) -> None:
+        key = normalize(name)
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry.is_favorite = False
+        entry.favorite_usage = 0
+        self._invalidate(key)
+        if entry.prescribed_count == 0:
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        del self._entries[key]
+        for suffix in self._suffixes(key):
+            i = bisect_left(self._keys, (suffix, key))
+            if i < len(self._keys) and self._keys[i] == (suffix, key):
+                del self._keys[i]
+
+    def complete(self, prefix: str, limit: int) -> List[MedicineEntry]:
+        """Top `limit` entries whose name has a word starting with `prefix`."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        ranked = self._cache.get(prefix)
+        if ranked is None:
+            keys = self._keys
+            start = bisect_left(keys, (prefix,))
+            end = bisect_left(keys, (prefix + "\uffff",), start)
+            matched = {name_key for _, name_key in keys[start:end]}
+            entries = self._entries
+            ranked = heapq.nlargest(
+                MAX_COMPLETIONS,
+                (entries[name_key] for name_key in matched),
+                key=lambda e: (e.score, -len(e.name))
+            )
+            if len(self._cache) >= MAX_CACHED_PREFIXES:
+                self._cache.clear()
+            self._cache[prefix] = ranked
+
+        return ranked[:limit]
+
+
+class MedicineAutocomplete:
+    """Global + per-doctor medicine indexes."""
+
+    def __init__(self):
+        self._global = PrefixIndex()
+        self._by_doctor: Dict[object, PrefixIndex] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def _doctor(self, doctor_id) -> PrefixIndex:
+        index = self._by_doctor.get(doctor_id)
+        if index is None:
+            index = self._by_doctor[doctor_id] = PrefixIndex()
+        return index
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        """
+        Build on first use (with `db`). Once built, a stale index keeps
+        serving while a background task rebuilds it on its own session.
+        """
+        if self._loaded_at is None:
+            async with self._lock:
+                if self._loaded_at is None:
+                    await self.rebuild(db)
+            return
+        if time.monotonic() - self._loaded_at > REFRESH_INTERVAL_SECONDS and self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh())
+
+    async def _refresh(self) -> None:
+        try:
+            async with self._lock, ReadSessionLocal() as db:
+                await self.rebuild(db)
+        except Exception as e:
+            self._loaded_at = time.monotonic()  # Keep the old index; retry after the next interval
+            logger.warning(f"Medicine index refresh failed: {e}")
+        finally:
+            self._refresh_task = None
+
+    async def rebuild(self, db: AsyncSession) -> None:
+        """Rebuild all indexes from the database and swap them in."""
+        global_index = PrefixIndex()
+        by_doctor: Dict[object, PrefixIndex] = {}
+
+        def doctor_index(doctor_id) -> PrefixIndex:
+            index = by_doctor.get(doctor_id)
+            if index is None:
+                index = by_doctor[doctor_id] = PrefixIndex()
+            return index
+
+        try:
+            result = await db.execute(
+                select(Prescription.doctor_id, Prescription.medication_name, func.count())
+                .group_by(Prescription.doctor_id, Prescription.medication_name)
+            )
+            for doctor_id, name, count in result.all():
+                global_index.add_prescribed(name, count)
+                doctor_index(doctor_id).add_prescribed(name, count)
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.warning(f"Medicine index: prescriptions not loaded: {e}")
+
+        try:
+            result = await db.execute(
+                select(
+                    DoctorMedicineFavorite.doctor_id,
+                    DoctorMedicineFavorite.medicine_name,
+                    DoctorMedicineFavorite.usage_count
+                )
+            )
+            for doctor_id, name, usage_count in result.all():
+                global_index.add_prescribed(name, usage_count or 0)
+                doctor_index(doctor_id).set_favorite(name, usage_count)
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.warning(f"Medicine index: favorites not loaded: {e}")
+
+        self._global, self._by_doctor = global_index, by_doctor
+        self._loaded_at = time.monotonic()
+        logger.info(f"Medicine index built: {len(global_index)} medicines, {len(by_doctor)} doctors")
+
+    # ---- Incremental updates (no-ops until the index is first built) ----
+
+    def record_prescription(self, doctor_id, name: str) -> None:
+        if not self.is_loaded or not name:
+            return
+        self._global.add_prescribed(name)
+        self._doctor(doctor_id).add_prescribed(name)
+
+    def upsert_favorite(self, doctor_id, name: str, usage_count: int, previous_name: Optional[str] = None) -> None:
+        if not self.is_loaded:
+            return
+        index = self._doctor(doctor_id)
+        if previous_name and normalize(previous_name) != normalize(name):
+            self.remove_favorite(doctor_id, previous_name)
+        # Global scores include favorite usage (see rebuild): apply the change
+        previous_usage = index.favorite_usage(name)
+        index.set_favorite(name, usage_count)
+        self._global.add_prescribed(name, (usage_count or 0) - previous_usage)
+
+    def remove_favorite(self, doctor_id, name: str) -> None:
+        if not self.is_loaded:
+            return
+        index = self._doctor(doctor_id)
+        usage = index.favorite_usage(name)
+        if usage:
+            self._global.add_prescribed(name, -usage)
+        index.unset_favorite(name)
+
+    # ---- Queries ----
+
+    def complete(self, prefix: str, doctor_id=None, limit: int = 10) -> List[Dict]:
+        """
+        Personal matches first (favorites and own history), then global ones.
+        """
+        results = []
+        seen = set()
+
+        if doctor_id is not None and doctor_id in self._by_doctor:
+            for entry in self._by_doctor[doctor_id].complete(prefix, limit):
+                seen.add(normalize(entry.name))
+                results.append({
+                    "name": entry.name,
+                    "usage_count": entry.score,
+                    "is_favorite": entry.is_favorite,
+                    "source": "doctor",
+                })
+
+        if len(results) < limit:
+            for entry in self._global.complete(prefix, limit + len(seen)):
+                if normalize(entry.name) in seen:
+                    continue
+                results.append({
+                    "name": entry.name,
+                    "usage_count": entry.score,
+                    "is_favorite": False,
+                    "source": "global",
+                })
+                if len(results) >= limit:
+                    break
+
+        return results
+
+
+medicine_index = MedicineAutocomplete()
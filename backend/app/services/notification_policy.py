@@ -0,0 +1,158 @@
+"""
+Notification Policy Cache for SymptoTrack
+Compiled, per-user notification preferences for the send path.
+
+A NotificationPolicy is an immutable snapshot of a user's
+notification_preferences row: enabled notification types, channels in the
+order to try them, and the quiet-hours window in the user's timezone.
+Evaluating one needs no database access, so a send (or a batch of them)
+costs at most one bulk SELECT for the users not yet cached, and never
+writes: users without a row get the default policy, not an inserted row.
+
+Policies are cached per process. PUT /notification-preferences invalidates
+the user's entry in the process that served it; other processes (API
+workers, Celery workers) reload after NOTIFICATION_POLICY_TTL_SECONDS.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, time as dt_time, timezone
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.prescription_extras import NotificationPreference, NotificationChannel
+
+logger = logging.getLogger(__name__)
+
+MAX_CACHED_POLICIES = 50000
+
+# Notification type → (preference toggle, label). Other types are always sent.
+TYPE_TOGGLES: Dict[str, Tuple[str, str]] = {
+    "medicine_reminder": ("medicine_reminders", "Medicine reminders"),
+    "follow_up_reminder": ("follow_up_reminders", "Follow-up reminders"),
+    "test_reminder": ("test_reminders", "Test reminders"),
+}
+
+
+def _zone(name: Optional[str]) -> ZoneInfo:
+    try:
+        return ZoneInfo(name or settings.NOTIFICATION_DEFAULT_TIMEZONE)
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.warning(f"Unknown timezone '{name}', using {settings.NOTIFICATION_DEFAULT_TIMEZONE}")
+        return ZoneInfo(settings.NOTIFICATION_DEFAULT_TIMEZONE)
+
+
+def _channels(preferred: Optional[NotificationChannel]) -> Tuple[NotificationChannel, ...]:
+    """Preferred channel first, then push, WhatsApp (if enabled) and SMS."""
+    channels = [preferred or NotificationChannel.PUSH]
+    for fallback in (NotificationChannel.PUSH, NotificationChannel.WHATSAPP, NotificationChannel.SMS):
+        if fallback not in channels:
+            channels.append(fallback)
+    if not settings.WHATSAPP_ENABLED:
+        channels.remove(NotificationChannel.WHATSAPP)
+    return tuple(channels)
+
+
+@dataclass(frozen=True)
+class NotificationPolicy:
+    """A user's notification preferences, compiled for evaluation."""
+    user_id: Any
+    enabled_types: FrozenSet[str]
+    channels: Tuple[NotificationChannel, ...]
+    tz: ZoneInfo
+    quiet_start: Optional[dt_time] = None  # No quiet window when either end is None
+    quiet_end: Optional[dt_time] = None
+
+    @classmethod
+    def compile(cls, user_id: Any, prefs: Optional[NotificationPreference]) -> "NotificationPolicy":
+        """Policy from a preferences row, or the defaults when there is none."""
+        if prefs is None:
+            return cls(
+                user_id=user_id,
+                enabled_types=frozenset(TYPE_TOGGLES),
+                channels=_channels(None),
+                tz=_zone(None),
+            )
+        quiet = prefs.quiet_hours_enabled and prefs.quiet_hours_start and prefs.quiet_hours_end
+        return cls(
+            user_id=user_id,
+            enabled_types=frozenset(
+                kind for kind, (toggle, _) in TYPE_TOGGLES.items()
+                if getattr(prefs, toggle) is not False  # NULL columns default to on
+            ),
+            channels=_channels(prefs.preferred_channel),
+            tz=_zone(prefs.timezone),
+            quiet_start=prefs.quiet_hours_start if quiet else None,
+            quiet_end=prefs.quiet_hours_end if quiet else None,
+        )
+
+    def allows(self, notification_type: str) -> bool:
+        return notification_type not in TYPE_TOGGLES or notification_type in self.enabled_types
+
+    def in_quiet_hours(self, at: Optional[datetime] = None) -> bool:
+        """Whether `at` (default now; naive means UTC) is in the user's quiet window."""
+        if self.quiet_start is None or self.quiet_end is None:
+            return False
+        at = at or datetime.now(timezone.utc)
+        if at.tzinfo is None:
+            at = at.replace(tzinfo=timezone.utc)
+        local = at.astimezone(self.tz).time()
+
+        # Overnight windows (e.g. 22:00 - 07:00) wrap past midnight
+        if self.quiet_start > self.quiet_end:
+            return local >= self.quiet_start or local < self.quiet_end
+        return self.quiet_start <= local < self.quiet_end
+
+
+class NotificationPolicyCache:
+    """Per-process cache of compiled policies, loaded in bulk."""
+
+    def __init__(self):
+        self._policies: Dict[Any, Tuple[NotificationPolicy, float]] = {}
+
+    def _cached(self, user_id: Any) -> Optional[NotificationPolicy]:
+        entry = self._policies.get(user_id)
+        if entry is None or time.monotonic() - entry[1] > settings.NOTIFICATION_POLICY_TTL_SECONDS:
+            return None
+        return entry[0]
+
+    async def get(self, db: AsyncSession, user_id: Any) -> NotificationPolicy:
+        return (await self.get_many(db, [user_id]))[user_id]
+
+    async def get_many(self, db: AsyncSession, user_ids: Iterable[Any]) -> Dict[Any, NotificationPolicy]:
+        """Policies of the users; those not cached are loaded in one query."""
+        policies: Dict[Any, NotificationPolicy] = {}
+        missing = []
+        for user_id in dict.fromkeys(user_ids):
+            policy = self._cached(user_id)
+            if policy is None:
+                missing.append(user_id)
+            else:
+                policies[user_id] = policy
+
+        if missing:
+            result = await db.execute(
+                select(NotificationPreference).where(NotificationPreference.user_id.in_(missing))
+            )
+            rows = {prefs.user_id: prefs for prefs in result.scalars()}
+            if len(self._policies) + len(missing) > MAX_CACHED_POLICIES:
+                self._policies.clear()
+            loaded_at = time.monotonic()
+            for user_id in missing:
+                policy = NotificationPolicy.compile(user_id, rows.get(user_id))
+                self._policies[user_id] = (policy, loaded_at)
+                policies[user_id] = policy
+
+        return policies
+
+    def invalidate(self, user_id: Any) -> None:
+        """Drop a user's policy after their preferences change."""
+        self._policies.pop(user_id, None)
+
+
+notification_policies = NotificationPolicyCache()
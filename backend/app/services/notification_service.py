@@ -8,9 +8,8 @@ Multi-channel notification delivery with fallback:
 3. SMS (if all else fails)
 """
 
-from typing import Dict, List
+from typing import Dict, List, Optional
 from uuid import UUID
-from datetime import datetime
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -21,6 +20,7 @@ from app.models.prescription_extras import NotificationPreference, NotificationC
 from app.services.push_notification import PushNotificationService
 from app.services.whatsapp_service import WhatsAppService
 from app.services.otp_service import OTPService
+from app.services.notification_policy import TYPE_TOGGLES, NotificationPolicy, notification_policies
 
 
 class NotificationService:
@@ -40,7 +40,7 @@ class NotificationService:
         user_id: UUID,
         db: AsyncSession
     ) -> NotificationPreference:
-        """Get user's notification preferences."""
+        """Get user's notification preferences (unsaved defaults if not set)."""
         result = await db.execute(
             select(NotificationPreference).where(
                 NotificationPreference.user_id == user_id
@@ -57,9 +57,6 @@ class NotificationService:
                 test_reminders=True,
                 preferred_channel=NotificationChannel.PUSH
             )
-            db.add(prefs)
-            await db.commit()
-            await db.refresh(prefs)
         
         return prefs
     
@@ -73,32 +70,13 @@ class NotificationService:
         
         Args:
             user_id: User ID
-            db: Database session
+            db: Database session (only read when the policy is not cached)
             
         Returns:
             True if notification can be sent
         """
-        prefs = await NotificationService.get_notification_preferences(user_id, db)
-        
-        if not prefs.quiet_hours_enabled:
-            return True
-        
-        # Check if current time is within quiet hours
-        now = datetime.now().time()
-        
-        if prefs.quiet_hours_start and prefs.quiet_hours_end:
-            start = prefs.quiet_hours_start
-            end = prefs.quiet_hours_end
-            
-            # Handle overnight quiet hours (e.g., 22:00 - 07:00)
-            if start > end:
-                if now >= start or now < end:
-                    return False
-            else:
-                if start <= now < end:
-                    return False
-        
-        return True
+        policy = await notification_policies.get(db, user_id)
+        return not policy.in_quiet_hours()
     
     @staticmethod
     async def send_notification(
@@ -108,7 +86,8 @@ class NotificationService:
         message: str,
         data: Dict = None,
         force_send: bool = False,
-        db: AsyncSession = None
+        db: AsyncSession = None,
+        policy: Optional[NotificationPolicy] = None
     ) -> Dict:
         """
         Send notification through appropriate channel with fallback.
@@ -121,46 +100,33 @@ class NotificationService:
             data: Optional data payload
             force_send: Skip quiet hours check
             db: Database session
+            policy: The user's policy, if already loaded (e.g. by
+                notification_policies.get_many for a batch)
             
         Returns:
             Dict with delivery status and channel used
         """
-        # Check quiet hours
-        if not force_send:
-            if not await NotificationService.should_send_now(user_id, db):
-                return {
-                    "success": False,
-                    "reason": "quiet_hours",
-                    "message": "Notification suppressed due to quiet hours"
-                }
+        if policy is None:
+            policy = await notification_policies.get(db, user_id)
         
-        # Get preferences
-        prefs = await NotificationService.get_notification_preferences(user_id, db)
+        # Check quiet hours
+        if not force_send and policy.in_quiet_hours():
+            return {
+                "success": False,
+                "reason": "quiet_hours",
+                "message": "Notification suppressed due to quiet hours"
+            }
         
         # Check if notification type is enabled
-        if notification_type == "medicine_reminder" and not prefs.medicine_reminders:
-            return {"success": False, "reason": "disabled", "message": "Medicine reminders disabled"}
-        elif notification_type == "follow_up_reminder" and not prefs.follow_up_reminders:
-            return {"success": False, "reason": "disabled", "message": "Follow-up reminders disabled"}
-        elif notification_type == "test_reminder" and not prefs.test_reminders:
-            return {"success": False, "reason": "disabled", "message": "Test reminders disabled"}
+        if not policy.allows(notification_type):
+            return {"success": False, "reason": "disabled", "message": f"{TYPE_TOGGLES[notification_type][1]} disabled"}
         
         phone_number = await NotificationService.get_user_phone(user_id, db)
         
-        # Try channels in order based on preference
-        channels_to_try = [prefs.preferred_channel]
-        
-        # Add fallback channels
-        if NotificationChannel.PUSH not in channels_to_try:
-            channels_to_try.append(NotificationChannel.PUSH)
-        if NotificationChannel.WHATSAPP not in channels_to_try and settings.WHATSAPP_ENABLED:
-            channels_to_try.append(NotificationChannel.WHATSAPP)
-        if NotificationChannel.SMS not in channels_to_try:
-            channels_to_try.append(NotificationChannel.SMS)
-        
         last_error = None
         
-        for channel in channels_to_try:
+        # Preferred channel first, then the fallbacks
+        for channel in policy.channels:
             try:
                 if channel == NotificationChannel.PUSH:
                     result = await PushNotificationService.send_notification(
@@ -250,7 +216,8 @@ class NotificationService:
         doctor_name: str,
         follow_up_date: str,
         days_remaining: int,
-        db: AsyncSession
+        db: AsyncSession,
+        policy: Optional[NotificationPolicy] = None
     ) -> Dict:
         """Send follow-up appointment reminder."""
         if days_remaining == 0:
@@ -275,7 +242,8 @@ class NotificationService:
                 "days_remaining": str(days_remaining)
             },
             force_send=True,  # Follow-ups are important
-            db=db
+            db=db,
+            policy=policy
         )
     
     @staticmethod
@@ -0,0 +1,159 @@
+"""
+Onboarding Session Service for SymptoTrack
+Caches multi-step onboarding state in Redis, keyed by a signed onboarding token.
+"""
+
+import json
+import uuid
+import logging
+from dataclasses import dataclass, field, asdict
+from typing import Optional, List, Dict, Any
+
+from fastapi import HTTPException, status
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.core.security import create_onboarding_token, decode_token
+
+logger = logging.getLogger(__name__)
+
+SESSION_KEY_PREFIX = "onboarding:session:"
+IDEMPOTENCY_KEY_PREFIX = "onboarding:idem:"
+
+
+@dataclass
+class OnboardingSession:
+    """State of one onboarding flow (patient or doctor)."""
+    session_id: str
+    user_id: int
+    role: str
+    phone: str
+    profile_id: Optional[int] = None
+    completed_steps: List[int] = field(default_factory=list)
+
+    @property
+    def token(self) -> str:
+        """Signed token the client sends back as X-Onboarding-Token."""
+        return create_onboarding_token({
+            "sub": str(self.user_id),
+            "sid": self.session_id,
+            "role": self.role,
+            "phone": self.phone,
+        })
+
+    def mark_step(self, step: int, profile_id: Optional[int] = None) -> None:
+        """Record a completed step (and the profile it created)."""
+        if step not in self.completed_steps:
+            self.completed_steps.append(step)
+            self.completed_steps.sort()
+        if profile_id is not None:
+            self.profile_id = profile_id
+
+
+class OnboardingSessionStore:
+    """
+    Redis-backed store for onboarding sessions and idempotent step responses.
+
+    Redis is a cache here: every step is an upsert keyed by the user id carried
+    in the signed token, so a lost session only loses progress metadata.
+    """
+
+    @staticmethod
+    def _ttl() -> int:
+        return settings.ONBOARDING_TOKEN_EXPIRE_MINUTES * 60
+
+    @staticmethod
+    async def create(user_id: int, role: str, phone: str, profile_id: Optional[int] = None) -> OnboardingSession:
+        """Start a new onboarding session after step 1."""
+        session = OnboardingSession(
+            session_id=uuid.uuid4().hex,
+            user_id=user_id,
+            role=role,
+            phone=phone,
+            profile_id=profile_id,
+            completed_steps=[1],
+        )
+        await OnboardingSessionStore.save(session)
+        return session
+
+    @staticmethod
+    async def load(token: str, role: str) -> OnboardingSession:
+        """
+        Resolve an onboarding token to its session.
+
+        Raises:
+            HTTPException: If the token is invalid, expired or for another role
+        """
+        payload = decode_token(token)
+        if payload.get("type") != "onboarding" or not payload.get("sid"):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid onboarding token"
+            )
+        if payload.get("role") != role:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Onboarding token is not valid for {role} onboarding"
+            )
+
+        session_id = payload["sid"]
+        try:
+            cached = await get_redis().get(f"{SESSION_KEY_PREFIX}{session_id}")
+        except RedisError as e:
+            logger.warning(f"Onboarding session cache unavailable: {e}")
+            cached = None
+
+        if cached:
+            return OnboardingSession(**json.loads(cached))
+
+        # Cache miss: rebuild from the signed claims
+        return OnboardingSession(
+            session_id=session_id,
+            user_id=int(payload["sub"]),
+            role=payload["role"],
+            phone=payload["phone"],
+        )
+
+    @staticmethod
+    async def save(session: OnboardingSession) -> None:
+        """Persist session state (best effort)."""
+        try:
+            await get_redis().set(
+                f"{SESSION_KEY_PREFIX}{session.session_id}",
+                json.dumps(asdict(session)),
+                ex=OnboardingSessionStore._ttl(),
+            )
+        except RedisError as e:
+            logger.warning(f"Failed to cache onboarding session {session.session_id}: {e}")
+
+    @staticmethod
+    async def replay(scope: str, idempotency_key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Return the stored response for a repeated idempotency key, if any."""
+        if not idempotency_key:
+            return None
+        try:
+            cached = await get_redis().get(f"{IDEMPOTENCY_KEY_PREFIX}{scope}:{idempotency_key}")
+        except RedisError as e:
+            logger.warning(f"Idempotency cache unavailable: {e}")
+            return None
+        return json.loads(cached) if cached else None
+
+    @staticmethod
+    async def remember(scope: str, idempotency_key: Optional[str], response: Dict[str, Any]) -> None:
+        """
+        Store a step response under its idempotency key.
+
+        Values are plain JSON in Redis: never pass credentials (token-issuing
+        steps store the user id and mint new tokens on replay).
+        """
+        if not idempotency_key:
+            return
+        try:
+            await get_redis().set(
+                f"{IDEMPOTENCY_KEY_PREFIX}{scope}:{idempotency_key}",
+                json.dumps(response, default=str),
+                ex=OnboardingSessionStore._ttl(),
+            )
+        except RedisError as e:
+            logger.warning(f"Failed to store idempotent response: {e}")
@@ -0,0 +1,179 @@
+"""
+Partition Maintenance Service for SymptoTrack
+Monthly range partitions for appointments, notifications and medicine
+reminder logs (see migrations/007_monthly_partitions.sql).
+
+Run daily by the ``maintain_partitions`` Celery task:
+- creates partitions for the coming months; there is no DEFAULT partition,
+  so an insert into a month without one fails
+- detaches months older than the table's hot window with
+  ``DETACH PARTITION ... CONCURRENTLY``, which never blocks reads or writes
+  on the parent, and moves them to the ``archive`` schema (optionally on a
+  cheaper tablespace)
+- drops archived months past PARTITION_ARCHIVE_DROP_MONTHS, if set
+
+appointment_dates (migrations/017) maps appointment ids to their month;
+its rows for archived months are deleted with them.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SCHEMA = "archive"
+MONTH_SUFFIX = re.compile(r"_p(\d{4})_(\d{2})$")
+
+
+@dataclass(frozen=True)
+class PartitionPolicy:
+    column: str
+    hot_months: int  # Months kept attached, including the current one
+    premake_months: int  # Future months created ahead of inserts
+
+
+PARTITIONED_TABLES: Dict[str, PartitionPolicy] = {
+    "appointments": PartitionPolicy(
+        "appointment_date",
+        settings.APPOINTMENTS_HOT_MONTHS,
+        settings.APPOINTMENT_BOOKING_HORIZON_DAYS // 28 + 1,
+    ),
+    "notifications": PartitionPolicy("created_at", settings.NOTIFICATIONS_HOT_MONTHS, 2),
+    "medicine_reminder_logs": PartitionPolicy("scheduled_time", settings.REMINDER_LOGS_HOT_MONTHS, 2),
+}
+
+# Partitioned table -> id lookup table keyed on the same column
+LOOKUP_TABLES: Dict[str, str] = {"appointments": "appointment_dates"}
+
+PARTITIONS_QUERY = text("""
+    SELECT c.relname, c.relispartition, coalesce(i.inhdetachpending, false) AS pending
+    FROM pg_class c
+    LEFT JOIN pg_inherits i ON i.inhrelid = c.oid
+    WHERE c.relnamespace = CAST(:schema AS regnamespace) AND c.relkind = 'r'
+      AND left(c.relname, length(:prefix)) = :prefix
+""")
+
+
+def month_start(day: date, offset: int = 0) -> date:
+    """First day of the month `offset` months from `day`."""
+    index = day.year * 12 + day.month - 1 + offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def hot_window_start(table: str, today: date) -> date:
+    """First day of the oldest month of `table` still attached."""
+    return month_start(today, 1 - PARTITIONED_TABLES[table].hot_months)
+
+
+def partition_month(table: str, name: str) -> Optional[date]:
+    """Month covered by a partition named <table>_pYYYY_MM, else None."""
+    match = MONTH_SUFFIX.search(name)
+    if not match or name[:match.start()] != table:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+async def _partitions(conn: AsyncConnection, table: str, schema: str):
+    result = await conn.execute(PARTITIONS_QUERY, {"schema": schema, "prefix": f"{table}_p"})
+    for row in result:
+        month = partition_month(table, row.relname)
+        if month:
+            yield row.relname, month, row.relispartition, row.pending
+
+
+class PartitionMaintenance:
+    """Create, archive and drop monthly partitions."""
+
+    @staticmethod
+    async def ensure_partitions(conn: AsyncConnection, today: date) -> List[str]:
+        """Create partitions from the current month through each premake window."""
+        created = []
+        for table, policy in PARTITIONED_TABLES.items():
+            existing = {name async for name, *_ in _partitions(conn, table, "public")}
+            for offset in range(policy.premake_months + 1):
+                name = (await conn.execute(
+                    text("SELECT ensure_monthly_partition(:table, :month)"),
+                    {"table": table, "month": month_start(today, offset)},
+                )).scalar_one()
+                if name not in existing:
+                    created.append(name)
+        return created
+
+    @staticmethod
+    async def archive_partitions(conn: AsyncConnection, today: date) -> List[str]:
+        """
+        Detach months older than the hot window and move them to the archive.
+
+        `conn` must be in AUTOCOMMIT mode: DETACH ... CONCURRENTLY cannot run
+        inside a transaction block. A detach interrupted half way is left
+        "pending" by Postgres and finalized on the next run.
+        """
+        archived = []
+        for table, policy in PARTITIONED_TABLES.items():
+            cutoff = hot_window_start(table, today)
+            async for name, month, attached, pending in _partitions(conn, table, "public"):
+                if month >= cutoff:
+                    continue
+                try:
+                    if pending:
+                        await conn.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}" FINALIZE'))
+                    elif attached:
+                        await conn.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}" CONCURRENTLY'))
+                    await conn.execute(text(f'ALTER TABLE "{name}" SET SCHEMA {ARCHIVE_SCHEMA}'))
+                    if settings.PARTITION_ARCHIVE_TABLESPACE:
+                        # Rewrites only the detached table; the parent is untouched
+                        await conn.execute(text(
+                            f'ALTER TABLE {ARCHIVE_SCHEMA}."{name}" '
+                            f'SET TABLESPACE "{settings.PARTITION_ARCHIVE_TABLESPACE}"'
+                        ))
+                except Exception:
+                    logger.exception(f"Archiving partition {name} failed; will retry")
+                    continue
+                archived.append(name)
+
+                # Only this month's lookup rows: a month that failed to
+                # archive is still live and keeps its rows
+                lookup = LOOKUP_TABLES.get(table)
+                if lookup:
+                    await conn.execute(
+                        text(
+                            f'DELETE FROM "{lookup}" '
+                            f'WHERE "{policy.column}" >= :start AND "{policy.column}" < :end'
+                        ),
+                        {"start": month, "end": month_start(month, 1)},
+                    )
+        return archived
+
+    @staticmethod
+    async def drop_archived(conn: AsyncConnection, today: date) -> List[str]:
+        """Drop archived months older than PARTITION_ARCHIVE_DROP_MONTHS (0 keeps them)."""
+        if settings.PARTITION_ARCHIVE_DROP_MONTHS <= 0:
+            return []
+        cutoff = month_start(today, 1 - settings.PARTITION_ARCHIVE_DROP_MONTHS)
+        dropped = []
+        for table in PARTITIONED_TABLES:
+            async for name, month, _attached, _pending in _partitions(conn, table, ARCHIVE_SCHEMA):
+                if month < cutoff:
+                    await conn.execute(text(f'DROP TABLE {ARCHIVE_SCHEMA}."{name}"'))
+                    dropped.append(name)
+        return dropped
+
+    @staticmethod
+    async def run(engine: AsyncEngine, today: Optional[date] = None) -> Dict[str, List[str]]:
+        """Full maintenance pass; returns the partitions created, archived and dropped."""
+        today = today or date.today()
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            return {
+                "created": await PartitionMaintenance.ensure_partitions(conn, today),
+                "archived": await PartitionMaintenance.archive_partitions(conn, today),
+                "dropped": await PartitionMaintenance.drop_archived(conn, today),
+            }
@@ -0,0 +1,220 @@
+"""
+Patient Sync Service for SymptoTrack
+Conditional GETs and delta sync of a patient's lists (appointments,
+prescriptions, medical records, medicine reminders), so app opens stop
+refetching rows that never change.
+
+Database triggers (migrations/012_patient_sync.sql) keep a change counter
+per patient and stamp every synced row's updated_at, or its tombstone,
+while holding that counter's row lock. Hence:
+- A patient-scoped list has ETag / Last-Modified from the counter; a
+  matching If-None-Match (or If-Modified-Since) gets 304 Not Modified
+  before the list query runs.
+- The counter's changed_at is a watermark: ?since=<watermark> returns the
+  rows updated after it plus the ids deleted after it. Filters and paging
+  do not apply to deltas; the client merges them into its copy.
+
+Every patient-scoped response carries the current watermark in the
+Sync-Watermark header. Tombstones are kept SYNC_TOMBSTONE_RETENTION_DAYS;
+an older watermark gets 410 Gone and the client refetches in full.
+"""
+
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import DateTime, cast, delete, select
+from sqlalchemy.engine import Result
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.core.responses import RowsResponse, row_dicts
+from app.models.sync import PatientSyncTombstone, PatientSyncVersion
+
+WATERMARK_HEADER = "Sync-Watermark"
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _aware(at: datetime) -> datetime:
+    return at if at.tzinfo else at.replace(tzinfo=timezone.utc)  # Naive watermarks are UTC
+
+
+def format_watermark(at: datetime) -> str:
+    """ISO 8601 in UTC with a "Z" suffix (no "+", which breaks in query strings)."""
+    return at.astimezone(timezone.utc).isoformat(timespec="microseconds").replace("+00:00", "Z")
+
+
+@dataclass
+class SyncState:
+    """A patient's change counter as of the start of the request."""
+    patient_id: int
+    version: int = 0
+    changed_at: Optional[datetime] = None  # None until the patient's first change
+
+    @property
+    def watermark(self) -> str:
+        return format_watermark(self.changed_at or EPOCH)
+
+    def changed_since(self, since: datetime) -> bool:
+        return self.changed_at is not None and self.changed_at > _aware(since)
+
+
+def _etag(request: Request, state: SyncState) -> str:
+    # Weak: the bytes also depend on Accept and Content-Encoding
+    params = zlib.crc32(str(sorted(request.query_params.multi_items())).encode())
+    return f'W/"{state.patient_id}-{state.version}-{params:08x}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match list against our ETag."""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def _not_modified_since(if_modified_since: str, changed_at: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return changed_at.replace(microsecond=0) <= since  # HTTP dates have whole seconds
+
+
+class PatientSync:
+    """ETags, 304s and ?since= deltas for patient-scoped lists."""
+
+    @staticmethod
+    async def state(db: AsyncSession, patient_id: int) -> SyncState:
+        """
+        The patient's counter. Read it before the rows: a change committed
+        in between is then returned again next time rather than skipped.
+        """
+        result = await db.execute(
+            select(PatientSyncVersion.version, PatientSyncVersion.changed_at)
+            .where(PatientSyncVersion.patient_id == patient_id)
+        )
+        row = result.first()
+        if row is None:
+            return SyncState(patient_id=patient_id)
+        return SyncState(patient_id=patient_id, version=row.version, changed_at=row.changed_at)
+
+    @staticmethod
+    def headers(request: Request, state: SyncState) -> Dict[str, str]:
+        """Validators and watermark for a patient-scoped list response."""
+        headers = {
+            "ETag": _etag(request, state),
+            "Cache-Control": "private, no-cache",  # Clients revalidate every time
+            WATERMARK_HEADER: state.watermark,
+        }
+        if state.changed_at is not None:
+            headers["Last-Modified"] = format_datetime(state.changed_at.astimezone(timezone.utc), usegmt=True)
+        return headers
+
+    @staticmethod
+    def not_modified(request: Request, state: SyncState) -> Optional[Response]:
+        """
+        304 response when the client's copy is current, else None.
+        If-None-Match takes precedence over If-Modified-Since.
+        """
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            fresh = _etag_matches(if_none_match, _etag(request, state))
+        else:
+            if_modified_since = request.headers.get("if-modified-since")
+            fresh = bool(if_modified_since and state.changed_at
+                         and _not_modified_since(if_modified_since, state.changed_at))
+        if not fresh:
+            return None
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=PatientSync.headers(request, state))
+
+    @staticmethod
+    def expired(since: datetime) -> bool:
+        """True if deletes after `since` may already have been pruned."""
+        horizon = datetime.now(timezone.utc) - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+        return _aware(since) < horizon
+
+    @staticmethod
+    async def changes(
+        db: AsyncSession,
+        state: SyncState,
+        since: Optional[datetime],
+        query: Select,
+        model: Any,
+        serialize: Callable[[Result], List[Dict[str, Any]]] = row_dicts,
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Rows of `query` for the patient with updated_at after `since` (all
+        of them when `since` is None), and ids of the patient's `model` rows
+        deleted after it.
+        """
+        query = query.where(model.patient_id == state.patient_id)
+        if since is None:
+            return serialize(await db.execute(query)), []
+
+        since = _aware(since)
+        updated_at = model.updated_at
+        if not updated_at.type.timezone:  # appointments: local time of the database session
+            updated_at = cast(updated_at, DateTime(timezone=True))
+        rows = serialize(await db.execute(query.where(updated_at > since)))
+
+        T = PatientSyncTombstone
+        result = await db.execute(
+            select(T.row_id).where(
+                T.patient_id == state.patient_id,
+                T.entity == model.__tablename__,
+                T.deleted_at > since,
+            )
+        )
+        present = {str(row["id"]) for row in rows}  # Deleted from the patient, then back
+        deleted = [row_id for row_id in dict.fromkeys(result.scalars()) if row_id not in present]
+        return rows, deleted
+
+    @staticmethod
+    async def delta(
+        db: AsyncSession,
+        request: Request,
+        state: SyncState,
+        since: datetime,
+        key: str,
+        query: Select,
+        model: Any,
+        serialize: Callable[[Result], List[Dict[str, Any]]] = row_dicts,
+    ) -> Response:
+        """
+        ?since= response: {key: [changed rows], "deleted": ["<id>", ...],
+        "watermark": "..."} (see changes).
+
+        Raises:
+            HTTPException: 410 if rows changed and `since` is older than
+                the tombstones kept
+        """
+        rows: List[Dict[str, Any]] = []
+        deleted: List[str] = []
+        if state.changed_since(since):
+            if PatientSync.expired(since):
+                raise HTTPException(
+                    status_code=status.HTTP_410_GONE,
+                    detail="Sync watermark expired; fetch the full list",
+                    headers=PatientSync.headers(request, state),
+                )
+            rows, deleted = await PatientSync.changes(db, state, since, query, model, serialize)
+
+        return RowsResponse(
+            {key: rows, "deleted": deleted, "watermark": state.watermark},
+            headers=PatientSync.headers(request, state),
+        )
+
+    @staticmethod
+    async def prune_tombstones(db: AsyncSession) -> int:
+        """Delete tombstones past SYNC_TOMBSTONE_RETENTION_DAYS; returns the count."""
+        horizon = datetime.now(timezone.utc) - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+        result = await db.execute(delete(PatientSyncTombstone).where(PatientSyncTombstone.deleted_at < horizon))
+        await db.commit()
+        return result.rowcount
@@ -0,0 +1,337 @@
+"""
+Patient Timeline Service for SymptoTrack
+Denormalized per-patient history (migrations/008_patient_timeline.sql).
+
+Every ORM flush that inserts, updates or deletes an appointment, medical
+record, prescription or report upserts (or removes) the matching timeline
+row on the same connection, so the timeline commits or rolls back together
+with the write. Objects with expired or unloaded columns are re-read on
+that connection first, so a partial object never overwrites the row.
+Writes that bypass the ORM (raw SQL, bulk UPDATE, the D1 sync) are repaired
+by ``PatientTimeline.rebuild``, run by the rebuild_patient_timeline Celery
+task.
+
+The hook is registered when this module is imported. app.models imports it,
+so any process that loads a model (API workers, Celery workers, scripts)
+has it before its first flush.
+"""
+
+import base64
+import binascii
+import json
+from collections import defaultdict
+from datetime import date, datetime, time, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+from sqlalchemy import delete, event, func, inspect, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.appointment import Appointment
+from app.models.medical import MedicalRecord, Prescription
+from app.models.report import Report
+from app.models.timeline import PatientTimelineEvent
+
+REBUILD_BATCH_SIZE = 1000
+MAX_PAGE_SIZE = 100
+
+UPDATED_COLUMNS = ("patient_id", "occurred_at", "doctor_id", "title", "summary", "status", "details")
+
+
+def _at(day: date, at: Optional[time] = None) -> datetime:
+    """Dates (and clinic-local times) are stored as UTC purely for ordering."""
+    return datetime.combine(day, at or time.min, tzinfo=timezone.utc)
+
+
+def _jsonable(value):
+    if isinstance(value, (date, time)):  # Includes datetime
+        return value.isoformat()
+    if hasattr(value, "value"):  # Enums
+        return value.value
+    return value
+
+
+def _appointment(v: Dict) -> Dict:
+    return {
+        "occurred_at": _at(v.get("appointment_date"), v.get("appointment_time")),
+        "title": "Appointment",
+        "summary": v.get("reason"),
+        "status": v.get("status"),
+        "details": {"appointment_time": v.get("appointment_time"), "notes": v.get("notes")},
+    }
+
+
+def _medical_record(v: Dict) -> Dict:
+    return {
+        "occurred_at": _at(v.get("visit_date")),
+        "title": v.get("diagnosis") or "Medical record",
+        "summary": v.get("treatment"),
+        "status": None,
+        "details": {"symptoms": v.get("symptoms"), "appointment_id": v.get("appointment_id")},
+    }
+
+
+def _prescription(v: Dict) -> Optional[Dict]:
+    if v.get("prescribed_date") is None:
+        return None
+    return {
+        "occurred_at": _at(v.get("prescribed_date")),
+        "title": v.get("medication_name"),
+        "summary": v.get("instructions"),
+        "status": None,
+        "details": {
+            "dosage": v.get("dosage"),
+            "frequency": v.get("frequency"),
+            "duration": v.get("duration"),
+            "medical_record_id": v.get("medical_record_id"),
+        },
+    }
+
+
+def _report(v: Dict) -> Dict:
+    return {
+        "occurred_at": _at(v.get("report_date")),
+        "title": v.get("test_name") or v.get("report_type"),
+        "summary": v.get("findings"),
+        "status": None,
+        "details": {"report_type": v.get("report_type"), "file_url": v.get("file_url")},
+    }
+
+
+# Source model -> (event_type, projection of the loaded column values)
+SOURCES: Dict[Type, Tuple[str, Callable[[Dict], Optional[Dict]]]] = {
+    Appointment: ("appointment", _appointment),
+    MedicalRecord: ("medical_record", _medical_record),
+    Prescription: ("prescription", _prescription),
+    Report: ("report", _report),
+}
+
+# Columns each projection reads, besides id, patient_id and doctor_id
+PROJECTED_COLUMNS: Dict[Type, Tuple[str, ...]] = {
+    Appointment: ("appointment_date", "appointment_time", "reason", "status", "notes"),
+    MedicalRecord: ("visit_date", "diagnosis", "treatment", "symptoms", "appointment_id"),
+    Prescription: (
+        "prescribed_date", "medication_name", "instructions", "dosage", "frequency", "duration",
+        "medical_record_id",
+    ),
+    Report: ("report_date", "test_name", "report_type", "findings", "file_url"),
+}
+
+
+def _projected_keys(model: Type) -> Tuple[str, ...]:
+    return ("id", "patient_id", "doctor_id", *PROJECTED_COLUMNS[model])
+
+
+def _fully_loaded(obj) -> bool:
+    """Whether every column the projection reads is loaded (not expired or server-generated)."""
+    return not inspect(obj).unloaded & set(_projected_keys(type(obj)))
+
+
+def _identity(obj) -> Tuple:
+    """Primary key values; new objects get their identity only after the flush."""
+    state = inspect(obj)
+    return state.identity or tuple(state.dict.get(prop.key) for prop in state.mapper.primary_key)
+
+
+def _key(obj) -> Tuple[str, str]:
+    return SOURCES[type(obj)][0], str(_identity(obj)[0])
+
+
+def _reload(connection, objs: Sequence) -> Dict[int, Optional[Dict]]:
+    """
+    Current column values of flushed objects, read on the flush's connection,
+    keyed by id(obj); None for rows that no longer exist.
+    """
+    by_model = defaultdict(list)
+    for obj in objs:
+        by_model[type(obj)].append(obj)
+
+    values = {}
+    for model, group in by_model.items():
+        mapper = inspect(model)
+        keys = _projected_keys(model)
+        primary_key = [mapper.get_property_by_column(column).key for column in mapper.primary_key]
+        rows = connection.execute(
+            select(*(mapper.columns[key] for key in keys)).where(
+                tuple_(*mapper.primary_key).in_([_identity(obj) for obj in group])
+            )
+        )
+        found = {}
+        for row in rows:
+            row_values = dict(zip(keys, row))
+            found[tuple(row_values[key] for key in primary_key)] = row_values
+        for obj in group:
+            values[id(obj)] = found.get(_identity(obj))
+    return values
+
+
+def project(obj, values: Optional[Dict] = None) -> Tuple[Tuple[str, str], Optional[Dict]]:
+    """
+    Timeline key and row for a source object (row is None when the object
+    does not belong on the timeline, e.g. an appointment without a patient).
+
+    Projects `values` when given, else the object's loaded attributes; never
+    lazy-loads mid-flush. Callers pass values (see _reload) for objects that
+    are not _fully_loaded.
+    """
+    event_type, projection = SOURCES[type(obj)]
+    if values is None:
+        values = inspect(obj).dict
+    key = (event_type, str(values.get("id")))
+
+    patient_id = values.get("patient_id")
+    if patient_id is None:
+        return key, None
+    row = projection(values)
+    if row is None:
+        return key, None
+
+    row["details"] = {k: _jsonable(v) for k, v in row["details"].items() if v is not None}
+    row.update(
+        event_type=event_type,
+        source_id=key[1],
+        patient_id=patient_id,
+        doctor_id=values.get("doctor_id"),
+        title=(row["title"] or event_type)[:255],
+    )
+    return key, row
+
+
+def _upsert_statement():
+    stmt = insert(PatientTimelineEvent)
+    return stmt.on_conflict_do_update(
+        constraint="uq_patient_timeline_source",
+        set_={**{c: stmt.excluded[c] for c in UPDATED_COLUMNS}, "updated_at": func.now()},
+    )
+
+
+def _remove_statement(keys: Sequence[Tuple[str, str]]):
+    return delete(PatientTimelineEvent).where(
+        tuple_(PatientTimelineEvent.event_type, PatientTimelineEvent.source_id).in_(keys)
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_timeline(session: Session, flush_context) -> None:
+    """Mirror flushed source rows into patient_timeline in the same transaction."""
+    upserts: Dict[Tuple[str, str], Dict] = {}
+    removals = set()
+
+    written = [obj for obj in list(session.new) + list(session.dirty) if type(obj) in SOURCES]
+    deleted = [obj for obj in session.deleted if type(obj) in SOURCES]
+    if not written and not deleted:
+        return
+    connection = session.connection()
+    reloaded = _reload(connection, [obj for obj in written if not _fully_loaded(obj)])
+
+    for obj in written:
+        if id(obj) in reloaded and reloaded[id(obj)] is None:  # Row deleted behind the ORM's back
+            removals.add(_key(obj))
+            continue
+        key, row = project(obj, reloaded.get(id(obj)))
+        if row is None:
+            removals.add(key)
+        else:
+            upserts[key] = row  # One row per key: ON CONFLICT cannot touch a row twice
+    removals.update(_key(obj) for obj in deleted)
+    if upserts:
+        connection.execute(_upsert_statement(), list(upserts.values()))
+    if removals:
+        connection.execute(_remove_statement(list(removals)))
+
+
+def encode_cursor(row: PatientTimelineEvent) -> str:
+    raw = json.dumps([row.occurred_at.isoformat(), row.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Raises ValueError for a malformed cursor."""
+    try:
+        occurred_at, event_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(occurred_at), int(event_id)
+    except (binascii.Error, json.JSONDecodeError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+class PatientTimeline:
+    """Keyset-paginated reads and backfill of the timeline."""
+
+    @staticmethod
+    async def page(
+        db: AsyncSession,
+        patient_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        event_types: Optional[List[str]] = None,
+    ) -> Tuple[List[PatientTimelineEvent], Optional[str]]:
+        """
+        Newest-first events after `cursor`, plus the cursor for the next page
+        (None on the last page).
+        """
+        T = PatientTimelineEvent
+        query = select(T).where(T.patient_id == patient_id)
+        if event_types:
+            query = query.where(T.event_type.in_(event_types))
+        if cursor:
+            query = query.where(tuple_(T.occurred_at, T.id) < tuple_(*decode_cursor(cursor)))
+
+        limit = min(limit, MAX_PAGE_SIZE)
+        result = await db.execute(query.order_by(T.occurred_at.desc(), T.id.desc()).limit(limit + 1))
+        events = list(result.scalars().all())
+
+        has_more = len(events) > limit
+        events = events[:limit]
+        return events, encode_cursor(events[-1]) if has_more else None
+
+    @staticmethod
+    async def rebuild(db: AsyncSession, patient_id: Optional[int] = None) -> Dict[str, int]:
+        """
+        Re-project every source row (optionally for one patient) and drop
+        timeline rows whose source no longer exists.
+
+        Walks each source table in primary-key order, committing every
+        REBUILD_BATCH_SIZE rows; rows written meanwhile by the write hooks
+        are newer than the rebuild start and are kept.
+
+        Returns:
+            {event_type: rows projected}
+        """
+        T = PatientTimelineEvent
+        started = (await db.execute(select(func.now()))).scalar_one()
+        await db.commit()
+
+        counts = {}
+        for model, (event_type, _projection) in SOURCES.items():
+            counts[event_type] = 0
+            last_id = None
+            while True:
+                query = select(model).order_by(model.id).limit(REBUILD_BATCH_SIZE)
+                if patient_id is not None:
+                    query = query.where(model.patient_id == patient_id)
+                if last_id is not None:
+                    query = query.where(model.id > last_id)
+                batch = (await db.execute(query)).scalars().all()
+                if not batch:
+                    break
+                last_id = batch[-1].id
+
+                rows = {}
+                for obj in batch:
+                    key, row = project(obj)
+                    if row is not None:
+                        rows[key] = row
+                if rows:
+                    await db.execute(_upsert_statement(), list(rows.values()))
+                await db.commit()
+                db.expunge_all()
+                counts[event_type] += len(rows)
+
+            stale = delete(T).where(T.event_type == event_type, T.updated_at < started)
+            if patient_id is not None:
+                stale = stale.where(T.patient_id == patient_id)
+            await db.execute(stale)
+            await db.commit()
+
+        return counts
@@ -3,20 +3,20 @@ PDF Generator Service for SymptoTrack
 Generates prescription PDFs with doctor letterhead and digital signature.
 """
 
-from typing import Optional
+from io import BytesIO
 from datetime import datetime
+from typing import Optional, Union
 from uuid import UUID
 import os
-from pathlib import Path
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 import logging
 
-from app.core.config import settings
 from app.models.medical import Prescription, PrescriptionMedicine, Consultation
 from app.models.doctor import Doctor
 from app.models.patient import Patient
 from app.models.prescription_extras import DigitalSignature, PrescriptionSignature
+from app.services.blob_storage import BlobStorage, is_blob_key
 
 logger = logging.getLogger(__name__)
 
@@ -37,12 +37,6 @@ except ImportError:
 class PDFGenerator:
     """Service for generating prescription PDFs."""
 
-    def __init__(self):
-        """Initialize PDF generator."""
-        # Create upload directory if it doesn't exist
-        self.upload_dir = Path(settings.UPLOAD_DIR) / "prescriptions"
-        self.upload_dir.mkdir(parents=True, exist_ok=True)
-
     async def generate_prescription_pdf(
         self,
         db: AsyncSession,
@@ -56,7 +50,7 @@ class PDFGenerator:
             prescription_id: Prescription UUID
             
         Returns:
-            str: Path to generated PDF file
+            str: Blob key of the generated PDF (see BlobStorage)
             
         Raises:
             Exception: If PDF generation fails
@@ -96,7 +90,7 @@ class PDFGenerator:
         medicines = result.scalars().all()
         
         # Get digital signature if prescription is signed
-        signature_image_path = None
+        signature_image = None
         if prescription.is_signed:
             result = await db.execute(
                 select(PrescriptionSignature).where(
@@ -112,50 +106,61 @@ class PDFGenerator:
                 )
                 signature = result.scalar_one_or_none()
                 if signature:
-                    signature_image_path = signature.signature_image_path
-        
-        # Generate PDF
-        filename = f"prescription_{prescription.prescription_number}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        filepath = self.upload_dir / filename
+                    signature_image = await self._load_signature(signature.signature_image_path)
         
+        # Generate PDF in memory, then store it content-addressed
+        output = BytesIO()
         self._create_pdf(
-            filepath=str(filepath),
+            output=output,
             prescription=prescription,
             doctor=doctor,
             patient=patient,
             consultation=consultation,
             medicines=medicines,
-            signature_image_path=signature_image_path
+            signature_image=signature_image
         )
         
-        # Return relative path
-        return str(filepath.relative_to(Path(settings.UPLOAD_DIR).parent))
+        blob = await BlobStorage.put_bytes(output.getvalue(), "application/pdf")
+        logger.info(f"Generated prescription PDF {prescription.prescription_number}: {blob.key}")
+        return blob.key
+
+    async def _load_signature(self, signature_image_path: Optional[str]) -> Union[BytesIO, str, None]:
+        """Signature image from blob storage, or a legacy local file path."""
+        if is_blob_key(signature_image_path):
+            try:
+                return BytesIO(await BlobStorage.read_bytes(signature_image_path))
+            except FileNotFoundError:
+                logger.warning(f"Signature blob missing: {signature_image_path}")
+                return None
+        if signature_image_path and os.path.exists(signature_image_path):
+            return signature_image_path
+        return None
 
     def _create_pdf(
         self,
-        filepath: str,
+        output: BytesIO,
         prescription,
         doctor,
         patient,
         consultation,
         medicines,
-        signature_image_path: Optional[str] = None
+        signature_image: Union[BytesIO, str, None] = None
     ):
         """
         Create the PDF file with prescription details.
         
         Args:
-            filepath: Path to save PDF
+            output: Buffer the PDF is written to
             prescription: Prescription model
             doctor: Doctor model
             patient: Patient model
             consultation: Consultation model
             medicines: List of PrescriptionMedicine models
-            signature_image_path: Optional path to signature image
+            signature_image: Optional signature image (buffer or file path)
         """
         # Create PDF document
         doc = SimpleDocTemplate(
-            filepath,
+            output,
             pagesize=A4,
             rightMargin=1*cm,
             leftMargin=1*cm,
@@ -304,9 +309,9 @@ class PDFGenerator:
         elements.append(Spacer(1, 0.3*inch))
         
         # If signature image exists, add it
-        if signature_image_path and os.path.exists(signature_image_path):
+        if signature_image:
             try:
-                sig_img = Image(signature_image_path, width=2*inch, height=1*inch)
+                sig_img = Image(signature_image, width=2*inch, height=1*inch)
                 elements.append(sig_img)
             except Exception as e:
                 logger.warning(f"Could not add signature image: {e}")
@@ -330,7 +335,6 @@ class PDFGenerator:
         
         # Build PDF
         doc.build(elements)
-        logger.info(f"Generated prescription PDF: {filepath}")
 
     def _calculate_age(self, dob) -> int:
         """Calculate age from date of birth."""
@@ -9,7 +9,6 @@ Auto-generates reminders for:
 """
 
 from typing import List, Dict, Tuple
-from uuid import UUID
 from datetime import datetime, date, time, timedelta
 import json
 
@@ -26,18 +25,15 @@ from app.models.reminder import (
     TestUploadStatus
 )
 from app.models.prescription_extras import TestOrdered
+from app.services.frequency_registry import DEFAULT_TIMINGS, slot_mask_for, timing_slots_for
+from app.services.follow_up_cascade import FollowUpCascade
 
 
 class ReminderService:
     """Service for auto-generating and managing reminders."""
     
     # Default medicine timing slots
-    DEFAULT_TIMINGS = {
-        "morning": "08:00",
-        "afternoon": "13:00",
-        "evening": "18:00",
-        "night": "21:00"
-    }
+    DEFAULT_TIMINGS = DEFAULT_TIMINGS
     
     @staticmethod
     def parse_frequency_code(frequency: str) -> List[Dict[str, str]]:
@@ -52,87 +48,20 @@ class ReminderService:
         - "TDS" → Morning, Afternoon, Night
         - "QDS" → Morning, Afternoon, Evening, Night
         
+        Codes are resolved through the memoized frequency registry.
+        
         Args:
             frequency: Frequency code string
             
         Returns:
             List of timing slots with time and label
         """
-        timing_slots = []
-        
-        # Handle common abbreviations
-        frequency_upper = frequency.upper().strip()
-        
-        if frequency_upper == "BD" or frequency_upper == "BID":
-            timing_slots = [
-                {"time": ReminderService.DEFAULT_TIMINGS["morning"], "label": "Morning"},
-                {"time": ReminderService.DEFAULT_TIMINGS["night"], "label": "Night"}
-            ]
-        elif frequency_upper == "TDS" or frequency_upper == "TID":
-            timing_slots = [
-                {"time": ReminderService.DEFAULT_TIMINGS["morning"], "label": "Morning"},
-                {"time": ReminderService.DEFAULT_TIMINGS["afternoon"], "label": "Afternoon"},
-                {"time": ReminderService.DEFAULT_TIMINGS["night"], "label": "Night"}
-            ]
-        elif frequency_upper == "QDS" or frequency_upper == "QID":
-            timing_slots = [
-                {"time": ReminderService.DEFAULT_TIMINGS["morning"], "label": "Morning"},
-                {"time": ReminderService.DEFAULT_TIMINGS["afternoon"], "label": "Afternoon"},
-                {"time": ReminderService.DEFAULT_TIMINGS["evening"], "label": "Evening"},
-                {"time": ReminderService.DEFAULT_TIMINGS["night"], "label": "Night"}
-            ]
-        elif frequency_upper == "OD" or frequency_upper == "ONCE":
-            timing_slots = [
-                {"time": ReminderService.DEFAULT_TIMINGS["morning"], "label": "Morning"}
-            ]
-        else:
-            # Try to parse as "N-N-N" format
-            parts = frequency.split("-")
-            
-            if len(parts) >= 1 and parts[0].strip() != "0":
-                timing_slots.append({
-                    "time": ReminderService.DEFAULT_TIMINGS["morning"],
-                    "label": "Morning"
-                })
-            
-            if len(parts) >= 2 and parts[1].strip() != "0":
-                timing_slots.append({
-                    "time": ReminderService.DEFAULT_TIMINGS["afternoon"],
-                    "label": "Afternoon"
-                })
-            
-            if len(parts) >= 3 and parts[2].strip() != "0":
-                timing_slots.append({
-                    "time": ReminderService.DEFAULT_TIMINGS["night"],
-                    "label": "Night"
-                })
-            
-            # Handle 4-part frequency (morning-afternoon-evening-night)
-            if len(parts) >= 4 and parts[3].strip() != "0":
-                # Insert evening before night
-                if len(timing_slots) > 0 and timing_slots[-1]["label"] == "Night":
-                    timing_slots.insert(-1, {
-                        "time": ReminderService.DEFAULT_TIMINGS["evening"],
-                        "label": "Evening"
-                    })
-                else:
-                    timing_slots.append({
-                        "time": ReminderService.DEFAULT_TIMINGS["evening"],
-                        "label": "Evening"
-                    })
-        
-        # Default to once daily if no valid pattern found
-        if not timing_slots:
-            timing_slots = [
-                {"time": ReminderService.DEFAULT_TIMINGS["morning"], "label": "Morning"}
-            ]
-        
-        return timing_slots
+        return timing_slots_for(slot_mask_for(frequency))
     
     @staticmethod
     async def create_medicine_reminders(
-        prescription_id: UUID,
-        patient_id: UUID,
+        prescription_id: int,
+        patient_id: int,
         medicines: List[Dict],
         start_date: date,
         db: AsyncSession
@@ -144,6 +73,7 @@ class ReminderService:
             prescription_id: Prescription ID
             patient_id: Patient ID
             medicines: List of medicine dictionaries with name, dosage, frequency, duration_days
+                and optional timing_overrides (e.g. {"night": "22:30"})
             start_date: Start date for reminders
             db: Database session
             
@@ -158,8 +88,8 @@ class ReminderService:
             frequency = medicine.get("frequency", "OD")
             duration_days = medicine.get("duration_days", 7)
             
-            # Parse frequency to timing slots
-            timing_slots = ReminderService.parse_frequency_code(frequency)
+            # Resolve frequency to slot bitmask
+            slot_mask = slot_mask_for(frequency)
             
             # Calculate end date
             end_date = start_date + timedelta(days=duration_days)
@@ -167,12 +97,12 @@ class ReminderService:
             # Create reminder
             reminder = MedicineReminder(
                 prescription_id=prescription_id,
-                prescription_medicine_id=medicine.get("id"),  # May be None
                 patient_id=patient_id,
                 medicine_name=medicine_name,
                 dosage=dosage,
                 frequency_code=frequency,
-                timing_slots=timing_slots,
+                slot_mask=slot_mask,
+                timing_overrides=medicine.get("timing_overrides"),
                 start_date=start_date,
                 end_date=end_date,
                 status=ReminderStatus.ACTIVE,
@@ -188,14 +118,15 @@ class ReminderService:
     
     @staticmethod
     async def create_follow_up_reminder(
-        prescription_id: UUID,
-        patient_id: UUID,
-        doctor_id: UUID,
+        prescription_id: int,
+        patient_id: int,
+        doctor_id: int,
         follow_up_date: date,
         db: AsyncSession
     ) ->FollowUpReminder:
         """
-        Create follow-up reminder for a prescription.
+        Create follow-up reminder for a prescription, with its 7-day, 1-day
+        and morning-of reminders scheduled (see follow_up_cascade.py).
         
         Args:
             prescription_id: Prescription ID
@@ -214,6 +145,7 @@ class ReminderService:
             follow_up_date=follow_up_date,
             status=FollowUpStatus.UPCOMING
         )
+        await FollowUpCascade.schedule(db, reminder)
         
         db.add(reminder)
         await db.commit()
@@ -223,8 +155,8 @@ class ReminderService:
     
     @staticmethod
     async def create_test_reminders(
-        prescription_id: UUID,
-        patient_id: UUID,
+        prescription_id: int,
+        patient_id: int,
         test_orders: List[TestOrdered],
         follow_up_date: date = None,
         db: AsyncSession = None
@@ -262,7 +194,7 @@ class ReminderService:
     
     @staticmethod
     async def auto_generate_all_reminders(
-        prescription_id: UUID,
+        prescription_id: int,
         db: AsyncSession
     ) -> Dict[str, any]:
         """
@@ -0,0 +1,235 @@
+"""
+Reminder Sync Service for SymptoTrack
+Offline-first sync for the mobile reminder app. The app queues what the
+patient does while offline (dose taken or missed, snooze, slot times) and
+sends the queue with its last checkpoint in one POST /reminders/sync:
+
+- Operations apply in order, in one transaction. Each carries a
+  client-generated idempotency key; its result is stored in
+  sync_operations and replayed when the key comes again (a retry after a
+  lost response) instead of being applied twice.
+- An operation the server refuses (unknown reminder, bad slot time, a
+  time in the future or older than the reminder history kept) is rejected
+  on its own; the rest of the batch still applies.
+- The response carries the patient's medicine, follow-up and test
+  reminders changed or deleted since the checkpoint, and the next
+  checkpoint (a watermark, see patient_sync.py). Without a checkpoint, or
+  with one older than the tombstones kept, every reminder is returned with
+  "full": true and the client replaces its copy.
+"""
+
+from datetime import datetime, time, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Result
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.models.reminder import MedicineReminder, MedicineReminderLog
+from app.models.sync import SyncOperation
+from app.services.frequency_registry import merge_timing_overrides
+from app.services.partitions import PARTITIONED_TABLES, month_start
+from app.services.patient_sync import PatientSync
+
+OPS = ("taken", "missed", "snooze", "timings")
+DEFAULT_SNOOZE_MINUTES = 15
+MAX_CLOCK_SKEW = timedelta(minutes=5)  # Tolerated for a phone's clock running ahead
+MAX_SCHEDULED_AHEAD = timedelta(days=1)  # A dose taken early
+
+# (query, model, serialize) of one synced list, as for PatientSync.changes
+Collection = Tuple[Select, Any, Callable[[Result], List[Dict[str, Any]]]]
+
+
+def _utc(at: datetime) -> datetime:
+    return at if at.tzinfo else at.replace(tzinfo=timezone.utc)  # The app sends naive times as UTC
+
+
+def _oldest_log_time(now: datetime) -> datetime:
+    """
+    Start of the oldest medicine_reminder_logs partition still attached
+    (see PartitionMaintenance), plus a day for the server's time zone.
+    """
+    oldest = month_start(now.date(), 1 - PARTITIONED_TABLES["medicine_reminder_logs"].hot_months)
+    return datetime.combine(oldest, time.min, tzinfo=timezone.utc) + timedelta(days=1)
+
+
+class ReminderSync:
+    """Batched offline operations and checkpoint deltas for reminders."""
+
+    @staticmethod
+    async def apply(
+        db: AsyncSession,
+        user_id: int,
+        patient_id: int,
+        operations: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Apply the patient's queued operations and commit once.
+
+        Args:
+            operations: {"idempotency_key", "op", "reminder_id", "at",
+                "scheduled_time", "snooze_minutes", "timing_overrides"},
+                oldest first; `op` is one of OPS
+
+        Returns:
+            One result per operation, in order: {"idempotency_key",
+            "status": "applied" | "rejected", ...}, with "replayed": true
+            for keys applied before
+        """
+        first: Dict[str, str] = {}
+        for op in operations:
+            first.setdefault(op["idempotency_key"], op["op"])
+        if not first:
+            return []
+
+        # Claim the keys. A concurrent sync sending the same keys waits on
+        # these rows until we commit, then finds them taken.
+        claimed = await db.execute(
+            insert(SyncOperation)
+            .values([{"user_id": user_id, "idempotency_key": key, "op": kind} for key, kind in first.items()])
+            .on_conflict_do_nothing(index_elements=["user_id", "idempotency_key"])
+            .returning(SyncOperation.idempotency_key)
+        )
+        new_keys = set(claimed.scalars())
+
+        replayed: Dict[str, Dict[str, Any]] = {}
+        if len(new_keys) < len(first):
+            result = await db.execute(
+                select(SyncOperation.idempotency_key, SyncOperation.result).where(
+                    SyncOperation.user_id == user_id,
+                    SyncOperation.idempotency_key.in_(set(first) - new_keys),
+                )
+            )
+            replayed = {key: stored or {} for key, stored in result.all()}
+
+        # Every reminder the batch touches, in one query
+        reminder_ids = {op["reminder_id"] for op in operations if op["idempotency_key"] in new_keys}
+        reminders = {}
+        if reminder_ids:
+            result = await db.execute(
+                select(MedicineReminder).where(
+                    MedicineReminder.id.in_(reminder_ids),
+                    MedicineReminder.patient_id == patient_id,
+                )
+            )
+            reminders = {reminder.id: reminder for reminder in result.scalars()}
+
+        now = datetime.now(timezone.utc)
+        results = []
+        applied: Dict[str, Dict[str, Any]] = {}
+        for op in operations:
+            key = op["idempotency_key"]
+            if key in applied or key in replayed:  # Sent earlier in this batch or in an earlier sync
+                results.append({**applied.get(key, replayed.get(key)), "idempotency_key": key, "replayed": True})
+                continue
+            try:
+                outcome = ReminderSync._apply_one(db, reminders.get(op["reminder_id"]), op, now)
+                applied[key] = {"idempotency_key": key, "status": "applied", **outcome}
+            except ValueError as e:
+                applied[key] = {"idempotency_key": key, "status": "rejected", "error": str(e)}
+            results.append(applied[key])
+
+        if applied:
+            await db.execute(
+                update(SyncOperation),
+                [{"user_id": user_id, "idempotency_key": key, "result": result} for key, result in applied.items()],
+            )
+        await db.commit()
+        return results
+
+    @staticmethod
+    def _apply_one(
+        db: AsyncSession,
+        reminder: Optional[MedicineReminder],
+        op: Dict[str, Any],
+        now: datetime,
+    ) -> Dict[str, Any]:
+        """
+        Apply one operation to its (loaded) reminder; returns the result fields.
+
+        Raises:
+            ValueError: Reminder not the patient's, unknown op, bad slot times,
+                or a log time outside the live medicine_reminder_logs partitions
+        """
+        if reminder is None:
+            raise ValueError("Reminder not found")
+
+        kind = op["op"]
+        if kind == "timings":
+            reminder.timing_overrides = merge_timing_overrides(reminder.timing_overrides, op.get("timing_overrides") or {})
+            return {"timing_overrides": reminder.timing_overrides}
+        if kind not in OPS:
+            raise ValueError(f"Unknown operation '{kind}'")
+
+        at = _utc(op.get("at") or now)  # When the patient acted, not when it synced
+        scheduled_time = _utc(op.get("scheduled_time") or at)
+        if at > now + MAX_CLOCK_SKEW:
+            raise ValueError("Action time is in the future")
+        # Log rows go to monthly partitions (migrations/007): there is no
+        # DEFAULT one, so a time outside them would fail the whole batch
+        if scheduled_time > now + MAX_SCHEDULED_AHEAD:
+            raise ValueError("Scheduled time is too far in the future")
+        if scheduled_time < _oldest_log_time(now):
+            raise ValueError("Scheduled time is older than the reminder history kept")
+
+        log_entry = MedicineReminderLog(
+            reminder_id=reminder.id,
+            scheduled_time=scheduled_time,
+            action_time=at,
+        )
+        if kind == "taken":
+            reminder.total_taken += 1
+            reminder.last_triggered_at = at
+            log_entry.action = "taken"
+            outcome = {"total_taken": reminder.total_taken}
+        elif kind == "missed":
+            reminder.total_missed += 1
+            log_entry.action = "missed"
+            outcome = {"total_missed": reminder.total_missed}
+        else:
+            reminder.snooze_count += 1
+            log_entry.action = "snoozed"
+            log_entry.snoozed_until = at + timedelta(minutes=op.get("snooze_minutes") or DEFAULT_SNOOZE_MINUTES)
+            outcome = {"snooze_until": log_entry.snoozed_until.isoformat()}
+
+        db.add(log_entry)
+        return outcome
+
+    @staticmethod
+    async def changes(
+        db: AsyncSession,
+        patient_id: int,
+        checkpoint: Optional[datetime],
+        collections: Dict[str, Collection],
+    ) -> Dict[str, Any]:
+        """
+        The patient's lists changed since `checkpoint`:
+        {"full": bool, "changes": {name: [rows]}, "deleted": {name: ["<id>", ...]},
+        "checkpoint": "<watermark>"}. Call after apply, so the batch's own
+        changes are included.
+        """
+        state = await PatientSync.state(db, patient_id)
+        changed = checkpoint is None or state.changed_since(checkpoint)
+        full = checkpoint is None or (changed and PatientSync.expired(checkpoint))
+
+        changes: Dict[str, List[Dict[str, Any]]] = {}
+        deleted: Dict[str, List[str]] = {}
+        for name, (query, model, serialize) in collections.items():
+            changes[name], deleted[name] = [], []
+            if changed:
+                changes[name], deleted[name] = await PatientSync.changes(
+                    db, state, None if full else checkpoint, query, model, serialize
+                )
+
+        return {"full": full, "changes": changes, "deleted": deleted, "checkpoint": state.watermark}
+
+    @staticmethod
+    async def prune_operations(db: AsyncSession) -> int:
+        """Forget idempotency keys past SYNC_OPERATION_RETENTION_DAYS; returns the count."""
+        horizon = datetime.now(timezone.utc) - timedelta(days=settings.SYNC_OPERATION_RETENTION_DAYS)
+        result = await db.execute(delete(SyncOperation).where(SyncOperation.applied_at < horizon))
+        await db.commit()
+        return result.rowcount
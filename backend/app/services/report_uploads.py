@@ -0,0 +1,337 @@
+"""
+Report Upload Service for SymptoTrack
+Streaming upload pipeline for lab reports and scans.
+
+- One-shot uploads (multipart/form-data) are parsed straight off the request
+  stream by MultipartFileStream and handed to BlobStorage.put_stream, which
+  hashes, checks the magic bytes and enforces MAX_FILE_SIZE_MB as the bytes
+  arrive. Starlette's form parser would read the whole body first.
+- Resumable uploads follow the tus core protocol: the client creates an
+  upload with its total length, PATCHes bytes from the offset the server
+  reports and, after a dropped connection, asks for the offset (HEAD) and
+  continues from there. Partial bytes and the upload's metadata live side
+  by side in UPLOAD_DIR/.uploads, so a resume must reach a host sharing that
+  directory. The finished file is checked and moved into the blob store.
+- Unfinished uploads expire after UPLOAD_SESSION_TTL_HOURS
+  (collect_orphan_blobs Celery task).
+"""
+
+import asyncio
+import base64
+import binascii
+import fcntl
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import ClientDisconnect
+
+from app.core.config import settings
+from app.services.blob_storage import SNIFF_BYTES, BlobInfo, BlobStorage, sniff_content_type
+
+logger = logging.getLogger(__name__)
+
+TUS_VERSION = "1.0.0"
+UPLOAD_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def max_upload_size() -> int:
+    return settings.MAX_FILE_SIZE_MB * 1024 * 1024
+
+
+def sniff_report(head: bytes) -> str:
+    """Content type of a report file from its magic bytes (ALLOWED_FILE_TYPES)."""
+    return sniff_content_type(head, settings.ALLOWED_FILE_TYPES)
+
+
+def parse_upload_metadata(header: Optional[str]) -> Dict[str, str]:
+    """tus Upload-Metadata: comma-separated "key base64(value)" pairs."""
+    metadata = {}
+    for pair in (header or "").split(","):
+        key, _, value = pair.strip().partition(" ")
+        if not key:
+            continue
+        try:
+            metadata[key] = base64.b64decode(value).decode() if value else ""
+        except (binascii.Error, UnicodeDecodeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid Upload-Metadata value for {key}"
+            )
+    return metadata
+
+
+class MultipartFileStream:
+    """
+    The bytes of one file field of a multipart/form-data request, parsed
+    incrementally from request.stream(). Iterate it once; `filename` is set
+    when the field's headers have been read. Other fields are skipped.
+    """
+
+    def __init__(self, request: Request, field: str = "file"):
+        self.request = request
+        self.field = field
+        self.filename: Optional[str] = None
+        self._pending: List[bytes] = []
+        self._found = False
+        self._in_field = False
+        self._header_field = b""
+        self._header_value = b""
+        self._headers: Dict[bytes, bytes] = {}
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._in_field = not self._found and options.get(b"name") == self.field.encode()
+        if self._in_field:
+            self._found = True
+            filename = options.get(b"filename")
+            self.filename = filename.decode("utf-8", "replace") if filename else None
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_field:
+            self._pending.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        self._in_field = False
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self._chunks()
+
+    async def _chunks(self) -> AsyncIterator[bytes]:
+        content_type, params = parse_options_header(self.request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or b"boundary" not in params:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="Expected multipart/form-data"
+            )
+        parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+        })
+        async for chunk in self.request.stream():
+            parser.write(chunk)
+            if self._pending:
+                pending, self._pending = self._pending, []
+                for data in pending:
+                    yield data
+        parser.finalize()
+        for data in self._pending:
+            yield data
+        self._pending = []
+
+        if not self._found:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Missing file field '{self.field}'"
+            )
+
+
+@dataclass
+class ReportUpload:
+    """A resumable upload in progress for one report."""
+    upload_id: str
+    user_id: int
+    report_id: int
+    length: int
+    filename: Optional[str] = None
+    offset: int = 0  # Bytes received so far (the .part file's size; not stored)
+
+
+def _upload_dir() -> Path:
+    return Path(settings.UPLOAD_DIR) / ".uploads"
+
+
+def _paths(upload_id: str) -> Tuple[Path, Path]:
+    base = _upload_dir() / upload_id
+    return base.with_suffix(".part"), base.with_suffix(".json")
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _read_head(path: Path) -> bytes:
+    with open(path, "rb") as f:
+        return f.read(SNIFF_BYTES)
+
+
+class ReportUploads:
+    """Resumable (tus-style) report uploads."""
+
+    @staticmethod
+    async def create(user_id: int, report_id: int, length: int, filename: Optional[str]) -> ReportUpload:
+        """
+        Register an upload of `length` bytes.
+
+        Raises:
+            HTTPException: 413 if length exceeds MAX_FILE_SIZE_MB
+        """
+        if length > max_upload_size():
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File exceeds {settings.MAX_FILE_SIZE_MB} MB"
+            )
+        upload = ReportUpload(
+            upload_id=uuid.uuid4().hex,
+            user_id=user_id,
+            report_id=report_id,
+            length=length,
+            filename=filename,
+        )
+        part, meta = _paths(upload.upload_id)
+
+        def write() -> None:
+            part.parent.mkdir(parents=True, exist_ok=True)
+            part.touch(exist_ok=False)
+            fields = asdict(upload)
+            fields.pop("offset")
+            meta.write_text(json.dumps(fields))
+
+        await asyncio.to_thread(write)
+        return upload
+
+    @staticmethod
+    async def load(upload_id: str, user_id: int) -> ReportUpload:
+        """
+        An upload started by `user_id`, with its current offset.
+
+        Raises:
+            HTTPException: 404 if unknown, expired or another user's
+        """
+        def read() -> Optional[ReportUpload]:
+            if not UPLOAD_ID.match(upload_id):
+                return None
+            part, meta = _paths(upload_id)
+            try:
+                upload = ReportUpload(**json.loads(meta.read_text()))
+                upload.offset = part.stat().st_size
+            except (FileNotFoundError, ValueError, TypeError):
+                return None
+            return upload
+
+        upload = await asyncio.to_thread(read)
+        if upload is None or upload.user_id != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Upload not found"
+            )
+        return upload
+
+    @staticmethod
+    async def append(
+        upload: ReportUpload,
+        offset: int,
+        chunks: AsyncIterable[bytes]
+    ) -> Optional[BlobInfo]:
+        """
+        Append a PATCH body sent from `offset`; bytes received before a
+        dropped connection are kept for the client to resume from. When the
+        last byte arrives the file is checked and moved into the blob store.
+
+        Returns:
+            The stored blob once the upload is complete, else None
+
+        Raises:
+            HTTPException: 409 if `offset` is not the current offset,
+                413 past Upload-Length, 415 if the first bytes are not an
+                allowed file type, 423 while another PATCH is writing
+        """
+        part, meta = _paths(upload.upload_id)
+        fd = await asyncio.to_thread(os.open, part, os.O_WRONLY | os.O_APPEND)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)  # Released by os.close
+            except BlockingIOError:
+                raise HTTPException(
+                    status_code=status.HTTP_423_LOCKED,
+                    detail="Upload is being written by another request"
+                )
+            received = os.fstat(fd).st_size
+            if offset != received:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Upload-Offset must be {received}",
+                    headers={"Upload-Offset": str(received), "Tus-Resumable": TUS_VERSION}
+                )
+
+            start = received
+            try:
+                async for chunk in chunks:
+                    if received + len(chunk) > upload.length:
+                        raise HTTPException(
+                            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail="Body exceeds Upload-Length"
+                        )
+                    await asyncio.to_thread(_write_all, fd, chunk)
+                    received += len(chunk)
+            except ClientDisconnect:
+                logger.info(f"Upload {upload.upload_id} interrupted at {received}/{upload.length}")
+            upload.offset = received
+
+            if start < SNIFF_BYTES and (received >= SNIFF_BYTES or received == upload.length):
+                try:
+                    sniff_report(await asyncio.to_thread(_read_head, part))
+                except HTTPException:
+                    await ReportUploads.delete(upload)
+                    raise
+
+            if received < upload.length:
+                return None
+            content_type = sniff_report(await asyncio.to_thread(_read_head, part))
+            blob = await BlobStorage.put_file(str(part), content_type)  # Consumes the .part file
+            await asyncio.to_thread(meta.unlink, True)
+            return blob
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    async def delete(upload: ReportUpload) -> None:
+        """Discard an upload and its received bytes."""
+        for path in _paths(upload.upload_id):
+            await asyncio.to_thread(path.unlink, True)
+
+    @staticmethod
+    def expire_stale() -> int:
+        """Drop uploads with no bytes received for UPLOAD_SESSION_TTL_HOURS; returns the count."""
+        cutoff = time.time() - settings.UPLOAD_SESSION_TTL_HOURS * 3600
+        expired = 0
+        for meta in _upload_dir().glob("*.json"):
+            part = meta.with_suffix(".part")
+            try:
+                last_write = part.stat().st_mtime if part.exists() else meta.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if last_write < cutoff:
+                part.unlink(missing_ok=True)
+                meta.unlink(missing_ok=True)
+                expired += 1
+        return expired
@@ -0,0 +1,201 @@
+"""
+Search Service for SymptoTrack
+Ranked full-text and trigram search over prescriptions, medical records
+and doctor medicine favorites.
+
+Relies on the generated ``search_vector`` columns and pg_trgm indexes from
+migrations/004_search_indexes.sql. Matches combine:
+- full-text (websearch syntax, stemmed): "chest pain", "fever -viral"
+- trigram similarity on the primary name for typos and partial words:
+  "amoxicilin", "paracet"
+"""
+
+from typing import Optional, List, Dict, Any
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, or_, literal
+import logging
+
+from app.models.medical import Prescription, MedicalRecord
+from app.models.prescription_extras import DoctorMedicineFavorite
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONFIG = "english"
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=25, MinWords=8, MaxFragments=2"
+
+
+class SearchService:
+    """Ranked search with highlight snippets."""
+
+    @staticmethod
+    def _ts_query(q: str):
+        return func.websearch_to_tsquery(SEARCH_CONFIG, q)
+
+    @staticmethod
+    async def _ranked(
+        db: AsyncSession,
+        q: str,
+        entity_type: str,
+        columns: List,
+        search_vector,
+        trigram_column,
+        document,
+        filters: List,
+        limit: int,
+        offset: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Run one ranked search and build highlight snippets for the page only.
+
+        Rank = ts_rank_cd (full-text, weighted A/B/C) + trigram word
+        similarity of the primary name, so exact terms outrank fuzzy matches.
+        ``name %> q`` is served by the gin_trgm_ops index.
+        """
+        ts_query = SearchService._ts_query(q)
+        rank = (
+            func.ts_rank_cd(search_vector, ts_query) +
+            func.word_similarity(q, trigram_column)
+        ).label("rank")
+
+        page = (
+            select(*columns, document.label("document"), rank)
+            .where(
+                or_(
+                    search_vector.op("@@")(ts_query),
+                    trigram_column.op("%>")(q)
+                ),
+                *filters
+            )
+            .order_by(rank.desc())
+            .limit(limit)
+            .offset(offset)
+            .subquery()
+        )
+
+        # ts_headline is expensive: only run it on the returned page
+        stmt = select(
+            page,
+            func.ts_headline(SEARCH_CONFIG, page.c.document, ts_query, HEADLINE_OPTIONS).label("highlight")
+        ).order_by(page.c.rank.desc())
+
+        result = await db.execute(stmt)
+        hits = []
+        for row in result.mappings():
+            hit = dict(row)
+            hit.pop("document", None)
+            hit["type"] = entity_type
+            hit["rank"] = float(hit["rank"] or 0)
+            hits.append(hit)
+        return hits
+
+    @staticmethod
+    async def search_prescriptions(
+        db: AsyncSession,
+        q: str,
+        patient_id: Optional[int] = None,
+        doctor_id: Optional[int] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """Search prescriptions by medicine name and instructions."""
+        filters = []
+        if patient_id is not None:
+            filters.append(Prescription.patient_id == patient_id)
+        if doctor_id is not None:
+            filters.append(Prescription.doctor_id == doctor_id)
+
+        return await SearchService._ranked(
+            db, q, "prescription",
+            columns=[
+                Prescription.id,
+                Prescription.patient_id,
+                Prescription.doctor_id,
+                Prescription.medication_name.label("title"),
+                Prescription.prescribed_date.label("date"),
+            ],
+            search_vector=Prescription.search_vector,
+            trigram_column=Prescription.medication_name,
+            document=func.concat_ws(" — ", Prescription.medication_name, Prescription.instructions),
+            filters=filters,
+            limit=limit,
+            offset=offset
+        )
+
+    @staticmethod
+    async def search_medical_records(
+        db: AsyncSession,
+        q: str,
+        patient_id: Optional[int] = None,
+        doctor_id: Optional[int] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """Search medical records by diagnosis, symptoms and treatment."""
+        filters = []
+        if patient_id is not None:
+            filters.append(MedicalRecord.patient_id == patient_id)
+        if doctor_id is not None:
+            filters.append(MedicalRecord.doctor_id == doctor_id)
+
+        return await SearchService._ranked(
+            db, q, "medical_record",
+            columns=[
+                MedicalRecord.id,
+                MedicalRecord.patient_id,
+                MedicalRecord.doctor_id,
+                MedicalRecord.diagnosis.label("title"),
+                MedicalRecord.visit_date.label("date"),
+            ],
+            search_vector=MedicalRecord.search_vector,
+            trigram_column=MedicalRecord.diagnosis,
+            document=func.concat_ws(
+                " — ", MedicalRecord.diagnosis, MedicalRecord.symptoms, MedicalRecord.treatment
+            ),
+            filters=filters,
+            limit=limit,
+            offset=offset
+        )
+
+    @staticmethod
+    async def search_favorites(
+        db: AsyncSession,
+        q: str,
+        doctor_id,
+        limit: int = 20,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """Search a doctor's medicine favorites by name, category and usage."""
+        return await SearchService._ranked(
+            db, q, "favorite",
+            columns=[
+                DoctorMedicineFavorite.id,
+                literal(None).label("patient_id"),
+                DoctorMedicineFavorite.doctor_id,
+                DoctorMedicineFavorite.medicine_name.label("title"),
+                literal(None).label("date"),
+            ],
+            search_vector=DoctorMedicineFavorite.search_vector,
+            trigram_column=DoctorMedicineFavorite.medicine_name,
+            document=func.concat_ws(
+                " — ",
+                DoctorMedicineFavorite.medicine_name,
+                DoctorMedicineFavorite.category,
+                DoctorMedicineFavorite.usage_instructions
+            ),
+            filters=[DoctorMedicineFavorite.doctor_id == doctor_id],
+            limit=limit,
+            offset=offset
+        )
+
+    @staticmethod
+    def favorite_match(q: str):
+        """
+        WHERE clause matching favorites by full-text or trigram similarity.
+
+        Index-backed replacement for ``medicine_name.ilike('%q%')``.
+        """
+        return or_(
+            DoctorMedicineFavorite.search_vector.op("@@")(SearchService._ts_query(q)),
+            DoctorMedicineFavorite.medicine_name.op("%>")(q),
+            DoctorMedicineFavorite.medicine_name.ilike(f"{q}%")
+        )
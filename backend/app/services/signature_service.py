@@ -4,7 +4,6 @@ Sprint 1.3: Digital Signature System
 """
 
 import hashlib
-import base64
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
 from uuid import UUID
@@ -17,6 +16,7 @@ import bcrypt
 from app.models.doctor import Doctor
 from app.models.prescription_extras import DigitalSignature
 from app.core.config import settings
+from app.services.blob_storage import BlobStorage, iter_upload, sniff_content_type
 
 
 class SignatureService:
@@ -80,7 +80,7 @@ class SignatureService:
     @staticmethod
     async def create_signature(
         doctor_id: UUID,
-        signature_data: bytes,
+        signature_file: UploadFile,
         pin: str,
         db: AsyncSession
     ) -> DigitalSignature:
@@ -89,12 +89,15 @@ class SignatureService:
         
         Args:
             doctor_id: Doctor's ID
-            signature_data: Signature image bytes
+            signature_file: Signature image upload (streamed to blob storage)
             pin: Signature PIN (4-6 digits)
             db: Database session
             
         Returns:
             Created/updated DigitalSignature
+            
+        Raises:
+            HTTPException: 413 if the image exceeds MAX_FILE_SIZE
         """
         # Check if signature already exists
         result = await db.execute(
@@ -107,13 +110,18 @@ class SignatureService:
         # Hash PIN
         hashed_pin = SignatureService.hash_pin(pin)
         
-        # Encode signature as base64 for storage
-        signature_base64 = base64.b64encode(signature_data).decode()
+        # Store the image in blob storage; the row keeps only its key
+        blob = await BlobStorage.put_stream(
+            iter_upload(signature_file),
+            signature_file.content_type,
+            max_size=SignatureService.MAX_FILE_SIZE,
+            sniff=lambda head: sniff_content_type(head, ["png", "jpg"])
+        )
         
         if existing:
             # Update existing signature
-            existing.signature_data = signature_base64
-            existing.pin_hash = hashed_pin
+            existing.signature_image_path = blob.key
+            existing.signature_pin_hash = hashed_pin
             existing.is_active = True
             existing.updated_at = datetime.utcnow()
             
@@ -124,8 +132,8 @@ class SignatureService:
             # Create new signature
             signature = DigitalSignature(
                 doctor_id=doctor_id,
-                signature_data=signature_base64,
-                pin_hash=hashed_pin,
+                signature_image_path=blob.key,
+                signature_pin_hash=hashed_pin,
                 is_active=True
             )
             
@@ -185,7 +193,7 @@ class SignatureService:
                 detail="Digital signature not setup"
             )
         
-        return SignatureService.verify_pin(pin, signature.pin_hash)
+        return SignatureService.verify_pin(pin, signature.signature_pin_hash)
     
     @staticmethod
     async def update_pin(
@@ -218,14 +226,14 @@ class SignatureService:
             )
         
         # Verify old PIN
-        if not SignatureService.verify_pin(old_pin, signature.pin_hash):
+        if not SignatureService.verify_pin(old_pin, signature.signature_pin_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid current PIN"
             )
         
         # Update PIN
-        signature.pin_hash = SignatureService.hash_pin(new_pin)
+        signature.signature_pin_hash = SignatureService.hash_pin(new_pin)
         signature.updated_at = datetime.utcnow()
         
         await db.commit()
@@ -259,7 +267,7 @@ class SignatureService:
             )
         
         # Verify PIN
-        if not SignatureService.verify_pin(pin, signature.pin_hash):
+        if not SignatureService.verify_pin(pin, signature.signature_pin_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid PIN"
@@ -272,14 +280,18 @@ class SignatureService:
         await db.commit()
     
     @staticmethod
-    def decode_signature(signature_base64: str) -> bytes:
+    def signature_url(signature: DigitalSignature) -> str:
         """
-        Decode base64 signature to bytes.
+        Short-lived signed URL for the signature image.
         
         Args:
-            signature_base64: Base64 encoded signature
+            signature: Doctor's DigitalSignature
             
         Returns:
-            Signature image bytes
+            URL serving the image straight from blob storage
         """
-        return base64.b64decode(signature_base64)
+        return BlobStorage.signed_url(
+            signature.signature_image_path,
+            "image/png",
+            f"signature_{signature.doctor_id}.png"
+        )
@@ -0,0 +1,179 @@
+"""
+Usage Counter Service for SymptoTrack
+Write-behind usage counts for prescription templates and medicine favorites.
+
+Clicks increment a Redis hash instead of the row itself; a periodic Celery
+task drains the hash and applies every pending delta in one
+``UPDATE ... FROM (VALUES ...)`` per table, so popular rows are written once
+per flush instead of once per click.
+
+A flush holds a Redis lock so runs never overlap, and tags each drained
+hash with a batch id that is recorded (usage_flush_batches) in the same
+transaction as the counts. If the process dies after that commit but
+before the hash is deleted, the next run sees the batch as applied and
+only deletes the hash.
+"""
+
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple, Type
+
+from redis.exceptions import RedisError, ResponseError
+from sqlalchemy import delete, update, values, column, func, Integer
+from sqlalchemy.dialects.postgresql import UUID, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.models.prescription_extras import PrescriptionTemplate, DoctorMedicineFavorite
+from app.models.sync import UsageFlushBatch
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY_PREFIX = "usage:pending:"
+FLUSHING_KEY_PREFIX = "usage:flushing:"
+FLUSH_LOCK_KEY = "usage:flush:lock"
+FLUSH_LOCK_MS = 5 * 60 * 1000
+BATCH_FIELD = "batch"  # Field of a flushing hash holding its batch id
+
+# Delete the lock only if this flush still holds it
+RELEASE_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+COUNTED_MODELS: Dict[str, Type] = {
+    "templates": PrescriptionTemplate,
+    "favorites": DoctorMedicineFavorite,
+}
+
+
+class UsageCounter:
+    """Buffered usage_count increments keyed by table and row id."""
+
+    @staticmethod
+    async def increment(db: AsyncSession, kind: str, row_id: uuid.UUID, stored_count: int) -> int:
+        """
+        Count one use of a row and return its effective usage count.
+
+        Falls back to a direct UPDATE when Redis is unavailable so no click
+        is lost.
+
+        Args:
+            kind: Key of COUNTED_MODELS ("templates" or "favorites")
+            row_id: Primary key of the used row
+            stored_count: usage_count currently stored in the database
+        """
+        try:
+            pending = await get_redis().hincrby(f"{PENDING_KEY_PREFIX}{kind}", str(row_id), 1)
+            return (stored_count or 0) + pending
+        except RedisError as e:
+            logger.warning(f"Usage counter unavailable, writing {kind} {row_id} directly: {e}")
+
+        model = COUNTED_MODELS[kind]
+        result = await db.execute(
+            update(model)
+            .where(model.id == row_id)
+            .values(usage_count=func.coalesce(model.usage_count, 0) + 1)
+            .returning(model.usage_count)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return result.scalar_one()
+
+    @staticmethod
+    async def _apply(db: AsyncSession, kind: str, deltas: Dict[str, str]) -> int:
+        model = COUNTED_MODELS[kind]
+        rows = [
+            (uuid.UUID(row_id), int(delta))
+            for row_id, delta in deltas.items()
+            if row_id != BATCH_FIELD and int(delta)
+        ]
+        if not rows:
+            return 0
+
+        pending = values(
+            column("id", UUID(as_uuid=True)),
+            column("delta", Integer),
+            name="pending",
+        ).data(rows)
+        result = await db.execute(
+            update(model)
+            .where(model.id == pending.c.id)
+            .values(usage_count=func.coalesce(model.usage_count, 0) + pending.c.delta)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    @staticmethod
+    async def flush(db: AsyncSession) -> Dict[str, Tuple[int, int]]:
+        """
+        Drain pending increments into the database.
+
+        The pending hash is renamed before reading, so clicks arriving during
+        the flush start a fresh hash. A hash left behind by a failed flush is
+        retried on the next run, unless its batch was already committed.
+        Returns without flushing while another flush holds the lock.
+
+        Returns:
+            {kind: (rows updated, increments applied)}
+        """
+        redis = get_redis()
+        token = str(uuid.uuid4())
+        if not await redis.set(FLUSH_LOCK_KEY, token, nx=True, px=FLUSH_LOCK_MS):
+            logger.info("Usage count flush already running; skipping")
+            return {}
+
+        try:
+            flushed = {}
+            for kind in COUNTED_MODELS:
+                result = await UsageCounter._flush_kind(db, redis, kind)
+                if result is not None:
+                    flushed[kind] = result
+
+            horizon = datetime.now(timezone.utc) - timedelta(days=settings.USAGE_FLUSH_BATCH_RETENTION_DAYS)
+            await db.execute(delete(UsageFlushBatch).where(UsageFlushBatch.applied_at < horizon))
+            await db.commit()
+            return flushed
+        finally:
+            await redis.eval(RELEASE_LOCK, 1, FLUSH_LOCK_KEY, token)
+
+    @staticmethod
+    async def _flush_kind(db: AsyncSession, redis, kind: str) -> Optional[Tuple[int, int]]:
+        pending_key = f"{PENDING_KEY_PREFIX}{kind}"
+        flushing_key = f"{FLUSHING_KEY_PREFIX}{kind}"
+
+        if not await redis.exists(flushing_key):
+            try:
+                await redis.rename(pending_key, flushing_key)
+            except ResponseError:
+                return None  # Nothing pending
+        # Kept if a crashed flush already tagged the hash
+        await redis.hsetnx(flushing_key, BATCH_FIELD, str(uuid.uuid4()))
+
+        deltas = await redis.hgetall(flushing_key)
+        batch_id = deltas[BATCH_FIELD]
+        try:
+            claimed = await db.execute(
+                insert(UsageFlushBatch)
+                .values(batch_id=batch_id, kind=kind)
+                .on_conflict_do_nothing(index_elements=[UsageFlushBatch.batch_id])
+                .returning(UsageFlushBatch.batch_id)
+            )
+            if claimed.scalar_one_or_none() is None:
+                await db.rollback()
+                logger.warning(f"Usage count batch {batch_id} for {kind} was already applied; dropping it")
+                await redis.delete(flushing_key)
+                return None
+            updated = await UsageCounter._apply(db, kind, deltas)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            logger.exception(f"Usage count flush failed for {kind}; will retry")
+            return None
+
+        await redis.delete(flushing_key)
+        return updated, sum(int(delta) for field, delta in deltas.items() if field != BATCH_FIELD)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: frequency-code parsing throughput.
+
+Compares the original per-call parser (fresh dict lists every time) with the
+memoized frequency registry, and reports the stored size per reminder row.
+
+Run from backend/:
+    python benchmarks/bench_frequency_registry.py
+"""
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.frequency_registry import (  # noqa: E402
+    DEFAULT_TIMINGS, slot_mask_for, timing_slots_for
+)
+
+ITERATIONS = 200_000
+CODES = ["1-0-1", "1-1-1", "1-1-1-1", "0-0-1", "BD", "TDS", "QDS", "OD", "bid", " tid "]
+
+
+def legacy_parse_frequency_code(frequency):
+    """Original ReminderService.parse_frequency_code, kept for comparison."""
+    timing_slots = []
+    frequency_upper = frequency.upper().strip()
+
+    if frequency_upper in ("BD", "BID"):
+        timing_slots = [
+            {"time": DEFAULT_TIMINGS["morning"], "label": "Morning"},
+            {"time": DEFAULT_TIMINGS["night"], "label": "Night"}
+        ]
+    elif frequency_upper in ("TDS", "TID"):
+        timing_slots = [
+            {"time": DEFAULT_TIMINGS["morning"], "label": "Morning"},
+            {"time": DEFAULT_TIMINGS["afternoon"], "label": "Afternoon"},
+            {"time": DEFAULT_TIMINGS["night"], "label": "Night"}
+        ]
+    elif frequency_upper in ("QDS", "QID"):
+        timing_slots = [
+            {"time": DEFAULT_TIMINGS["morning"], "label": "Morning"},
+            {"time": DEFAULT_TIMINGS["afternoon"], "label": "Afternoon"},
+            {"time": DEFAULT_TIMINGS["evening"], "label": "Evening"},
+            {"time": DEFAULT_TIMINGS["night"], "label": "Night"}
+        ]
+    elif frequency_upper in ("OD", "ONCE"):
+        timing_slots = [{"time": DEFAULT_TIMINGS["morning"], "label": "Morning"}]
+    else:
+        parts = frequency.split("-")
+        if len(parts) >= 1 and parts[0].strip() != "0":
+            timing_slots.append({"time": DEFAULT_TIMINGS["morning"], "label": "Morning"})
+        if len(parts) >= 2 and parts[1].strip() != "0":
+            timing_slots.append({"time": DEFAULT_TIMINGS["afternoon"], "label": "Afternoon"})
+        if len(parts) >= 3 and parts[2].strip() != "0":
+            timing_slots.append({"time": DEFAULT_TIMINGS["night"], "label": "Night"})
+        if len(parts) >= 4 and parts[3].strip() != "0":
+            evening = {"time": DEFAULT_TIMINGS["evening"], "label": "Evening"}
+            if timing_slots and timing_slots[-1]["label"] == "Night":
+                timing_slots.insert(-1, evening)
+            else:
+                timing_slots.append(evening)
+
+    if not timing_slots:
+        timing_slots = [{"time": DEFAULT_TIMINGS["morning"], "label": "Morning"}]
+    return timing_slots
+
+
+def bench(label, fn, workload):
+    start = time.perf_counter()
+    for code in workload:
+        fn(code)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {len(workload) / elapsed:>14,.0f} codes/s  ({elapsed * 1000:.1f} ms)")
+    return elapsed
+
+
+def main():
+    random.seed(42)
+    workload = [random.choice(CODES) for _ in range(ITERATIONS)]
+
+    # Sanity check: the registry must agree with the original parser
+    for code in CODES + ["0-0-0", "0-1-0-1", "", "Once daily"]:
+        assert legacy_parse_frequency_code(code) == timing_slots_for(slot_mask_for(code)), code
+
+    print(f"Parsing {ITERATIONS:,} frequency codes\n")
+    legacy = bench("legacy parser", legacy_parse_frequency_code, workload)
+    registry = bench("registry (mask only)", slot_mask_for, workload)
+    bench("registry (expanded slots)", lambda c: timing_slots_for(slot_mask_for(c)), workload)
+    print(f"\nSpeed-up on reminder creation (mask only): {legacy / registry:.1f}x")
+
+    # Storage per reminder row
+    json_bytes = sum(len(json.dumps(legacy_parse_frequency_code(c))) for c in workload) / len(workload)
+    print(f"\nAvg timing_slots JSON per row: {json_bytes:.0f} bytes  →  slot_mask: 2 bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark: in-memory medicine autocomplete index.
+
+Fills app.services.medicine_index with synthetic prescribing history and
+times completions for cold (first keystroke after a write) and warm
+(cached prefix) lookups.
+
+Run from backend/:
+    python benchmarks/bench_medicine_index.py [medicines]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.medicine_index import MedicineAutocomplete  # noqa: E402
+
+MEDICINES = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+DOCTORS = 50
+REPEAT = 1_000
+
+BASES = [
+    "Paracetamol", "Amoxicillin", "Azithromycin", "Metformin", "Atorvastatin",
+    "Amlodipine", "Omeprazole", "Pantoprazole", "Cetirizine", "Montelukast",
+    "Losartan", "Telmisartan", "Insulin Glargine", "Levothyroxine", "Ibuprofen",
+]
+FORMS = ["Tablet", "Syrup", "Injection", "Capsule", "Drops"]
+PREFIXES = ["p", "pa", "para", "amox", "insulin g", "glar", "tab", "zzz"]
+
+
+def build() -> MedicineAutocomplete:
+    random.seed(7)
+    index = MedicineAutocomplete()
+    index._loaded_at = time.monotonic()
+    for i in range(MEDICINES):
+        name = f"{random.choice(BASES)} {random.choice([5, 10, 20, 250, 500])}mg {random.choice(FORMS)} {i}"
+        doctor_id = random.randrange(DOCTORS)
+        for _ in range(random.randint(1, 5)):
+            index.record_prescription(doctor_id, name)
+        if random.random() < 0.05:
+            index.upsert_favorite(doctor_id, name, random.randint(1, 200))
+    return index
+
+
+def main():
+    start = time.perf_counter()
+    index = build()
+    print(f"Built {MEDICINES:,} medicines / {DOCTORS} doctors in {time.perf_counter() - start:.2f}s\n")
+
+    print(f"{'prefix':<12}{'cold us':>10}{'warm us':>10}{'hits':>6}")
+    for prefix in PREFIXES:
+        index.record_prescription(0, f"{prefix} invalidate")  # drop cached results
+        start = time.perf_counter()
+        hits = index.complete(prefix, doctor_id=0, limit=10)
+        cold = (time.perf_counter() - start) * 1e6
+
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            index.complete(prefix, doctor_id=0, limit=10)
+        warm = (time.perf_counter() - start) / REPEAT * 1e6
+        print(f"{prefix:<12}{cold:>10.1f}{warm:>10.1f}{len(hits):>6}")
+
+
+if __name__ == "__main__":
+    main()
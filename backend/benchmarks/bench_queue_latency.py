@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Celery queue latency under a mixed burst, one shared queue vs
+routed queues.
+
+Replays what happens at 9 AM: the reminder sweep fans out a burst of bulk
+tasks while patients keep booking appointments (realtime emails). Records
+how long each task waited in the queue (sent -> started) for two layouts
+with the same total worker concurrency:
+- single: every task on one queue, Celery defaults (prefetch 4, early ack,
+  started-state tracking and stored results), as before
+- routed: realtime and bulk queues with their own workers, priorities,
+  prefetch 1 and late acks, taken from celery_app.conf
+
+Probe tasks sleep instead of sending mail and use "bench."-prefixed queues,
+so the real queues are untouched. Needs the Redis broker (CELERY_BROKER_URL).
+
+Run from backend/:
+    python benchmarks/bench_queue_latency.py [bulk_tasks] [realtime_tasks]
+"""
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import redis  # noqa: E402
+from celery import Celery  # noqa: E402
+from kombu import Queue  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.services.celery_tasks import celery_app  # noqa: E402
+
+LAYOUT = os.environ.get("BENCH_LAYOUT", "routed")
+CONCURRENCY = 4  # Total worker processes in either layout
+BULK_WORK = 0.05  # Seconds per reminder email
+REALTIME_WORK = 0.02  # Seconds per booking email
+REALTIME_INTERVAL = 0.025  # Bookings arriving during the burst
+RESULTS_KEY = "bench:queue_latency:{kind}"
+
+
+def make_app(layout: str) -> Celery:
+    """Celery app configured as one layout (producer and worker must agree)."""
+    app = Celery("bench_queue_latency", broker=settings.CELERY_BROKER_URL)
+    if layout == "single":
+        app.conf.update(
+            result_backend=settings.CELERY_RESULT_BACKEND,
+            task_track_started=True,
+            task_default_queue="bench.default",
+        )
+    else:
+        production = celery_app.conf
+        app.conf.update(
+            task_ignore_result=production.task_ignore_result,
+            task_acks_late=production.task_acks_late,
+            task_reject_on_worker_lost=production.task_reject_on_worker_lost,
+            worker_prefetch_multiplier=production.worker_prefetch_multiplier,
+            broker_transport_options=production.broker_transport_options,
+            task_default_priority=production.task_default_priority,
+            task_queues=(Queue("bench.realtime"), Queue("bench.bulk")),
+            task_default_queue="bench.bulk",
+        )
+    return app
+
+
+bench_app = make_app(LAYOUT)  # The workers' app (celery -A bench_queue_latency)
+
+
+@bench_app.task(name="bench.probe")
+def probe(kind: str, sent_at: float, work: float) -> None:
+    """Record the queue wait, then simulate the task's work."""
+    waited = time.time() - sent_at
+    redis.Redis.from_url(settings.CELERY_BROKER_URL).rpush(RESULTS_KEY.format(kind=kind), waited)
+    time.sleep(work)
+
+
+def start_workers(app, layout):
+    env = {**os.environ, "BENCH_LAYOUT": layout}
+    if layout == "single":
+        specs = [("bench.default", CONCURRENCY)]
+    else:
+        specs = [("bench.realtime", CONCURRENCY // 2), ("bench.bulk", CONCURRENCY // 2)]
+    names = [f"{queue}@{socket.gethostname()}" for queue, _ in specs]
+    workers = [
+        subprocess.Popen(
+            [sys.executable, "-m", "celery", "-A", "bench_queue_latency", "worker",
+             "-Q", queue, "-c", str(concurrency), "-n", f"{queue}@%h", "--loglevel=warning"],
+            cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+        )
+        for queue, concurrency in specs
+    ]
+    deadline = time.time() + 30
+    while len(app.control.ping(destination=names, timeout=1.0)) < len(specs):
+        if time.time() > deadline:
+            raise RuntimeError("Workers did not start")
+    return workers
+
+
+def burst(app, layout, bulk_tasks, realtime_tasks):
+    routed = layout == "routed"
+    bulk_options = {"queue": "bench.bulk", "priority": 5} if routed else {}
+    realtime_options = {"queue": "bench.realtime", "priority": 0} if routed else {}
+
+    for _ in range(bulk_tasks):  # The sweep enqueues everything at once
+        app.send_task("bench.probe", ("bulk", time.time(), BULK_WORK), **bulk_options)
+    for _ in range(realtime_tasks):
+        app.send_task("bench.probe", ("realtime", time.time(), REALTIME_WORK), **realtime_options)
+        time.sleep(REALTIME_INTERVAL)
+
+
+def run(layout, bulk_tasks, realtime_tasks, store):
+    for kind in ("bulk", "realtime"):
+        store.delete(RESULTS_KEY.format(kind=kind))
+    app = make_app(layout)
+    app.control.purge()
+    workers = start_workers(app, layout)
+    try:
+        started = time.time()
+        burst(app, layout, bulk_tasks, realtime_tasks)
+        while (store.llen(RESULTS_KEY.format(kind="bulk")) < bulk_tasks
+               or store.llen(RESULTS_KEY.format(kind="realtime")) < realtime_tasks):
+            time.sleep(0.1)
+        drained = time.time() - started
+    finally:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.wait()
+
+    print(f"\n{layout}: drained in {drained:.1f}s")
+    for kind in ("realtime", "bulk"):
+        waits = sorted(float(w) * 1000 for w in store.lrange(RESULTS_KEY.format(kind=kind), 0, -1))
+        p95 = waits[int(len(waits) * 0.95) - 1]
+        print(f"  {kind:<9} p50 {statistics.median(waits):>8.0f} ms  p95 {p95:>8.0f} ms  max {waits[-1]:>8.0f} ms")
+    return drained
+
+
+def main():
+    bulk_tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    realtime_tasks = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    store = redis.Redis.from_url(settings.CELERY_BROKER_URL)
+
+    print(f"{bulk_tasks} bulk tasks ({BULK_WORK * 1000:.0f} ms) burst, "
+          f"{realtime_tasks} realtime tasks ({REALTIME_WORK * 1000:.0f} ms) every "
+          f"{REALTIME_INTERVAL * 1000:.0f} ms, {CONCURRENCY} worker processes")
+    print("Queue wait (sent -> started):")
+    for layout in ("single", "routed"):
+        run(layout, bulk_tasks, realtime_tasks, store)
+
+
+if __name__ == "__main__":
+    main()
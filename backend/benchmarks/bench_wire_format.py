@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark: list payload size and encode time, JSON vs MessagePack, with and
+without brotli/gzip.
+
+Encodes synthetic list responses the mobile clients download (appointments,
+prescriptions, reminders, notifications) the way the API does: dumps (JSON,
+RowsResponse) or pack_rows (MessagePack, Accept: application/msgpack), then the
+CompressionMiddleware encoders at their configured levels. Reports bytes on
+the wire and time from row dicts to compressed bytes.
+
+Run from backend/:
+    python benchmarks/bench_wire_format.py [rows]
+"""
+import datetime
+import decimal
+import gzip
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import msgpack  # noqa: E402
+import orjson  # noqa: E402
+
+from app.core.compression import BROTLI_AVAILABLE, _Compressor  # noqa: E402
+from app.core.responses import dumps, pack_rows  # noqa: E402
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+REPEAT = 30
+
+
+def synthetic_lists():
+    rng = random.Random(11)
+    now = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+    today = now.date()
+
+    def stamp():
+        return now - datetime.timedelta(minutes=rng.randint(0, 500_000))
+
+    appointments = [{
+        "id": i,
+        "patient_id": rng.randint(1, 5_000),
+        "doctor_id": rng.randint(1, 50),
+        "appointment_date": today + datetime.timedelta(days=rng.randint(-180, 60)),
+        "appointment_time": datetime.time(rng.randint(9, 17), rng.choice([0, 30])),
+        "status": rng.choice(["scheduled", "completed", "cancelled"]),
+        "reason": rng.choice([None, "Follow-up", "Fever and cough", "Blood pressure review"]),
+        "notes": rng.choice([None, "Bring previous reports"]),
+        "created_at": stamp(),
+        "updated_at": stamp(),
+    } for i in range(1, ROWS + 1)]
+
+    prescriptions = [{
+        "id": i,
+        "patient_id": rng.randint(1, 5_000),
+        "doctor_id": rng.randint(1, 50),
+        "medical_record_id": rng.choice([None, rng.randint(1, 10_000)]),
+        "medication_name": rng.choice(["Paracetamol 500mg", "Amoxicillin 250mg", "Metformin 500mg"]),
+        "dosage": "1 tablet",
+        "frequency": rng.choice(["1-0-1", "1-1-1", "0-0-1"]),
+        "duration": f"{rng.randint(3, 30)} days",
+        "instructions": rng.choice([None, "after food", "before food", "at bedtime"]),
+        "prescribed_date": today - datetime.timedelta(days=rng.randint(0, 365)),
+        "created_at": stamp(),
+    } for i in range(1, ROWS + 1)]
+
+    reminders = [{
+        "id": i,
+        "patient_id": rng.randint(1, 5_000),
+        "reminder_type": rng.choice(["medication", "appointment", "follow_up"]),
+        "title": rng.choice(["Take Metformin 500mg", "Appointment tomorrow", "Follow-up due"]),
+        "scheduled_time": stamp(),
+        "is_sent": rng.random() < 0.6,
+        "channels": rng.choice([["push"], ["push", "sms"], ["email"]]),
+    } for i in range(1, ROWS + 1)]
+
+    notifications = [{
+        "id": i,
+        "user_id": rng.randint(1, 5_000),
+        "notification_type": rng.choice(["appointment", "prescription", "billing"]),
+        "title": rng.choice(["Appointment confirmed", "New prescription", "Bill generated"]),
+        "message": rng.choice([
+            "Your appointment with Dr. Sharma is confirmed for 10:30 AM.",
+            "A new prescription has been added to your records.",
+            f"Your bill of INR {decimal.Decimal(rng.randint(200, 5_000))}.00 is ready.",
+        ]),
+        "priority": rng.choice([None, "normal", "high"]),
+        "is_read": rng.random() < 0.5,
+        "send_via": rng.choice(["push", "email", "sms"]),
+        "created_at": stamp(),
+    } for i in range(1, ROWS + 1)]
+
+    return {
+        "appointments": {"appointments": appointments},
+        "prescriptions": {"prescriptions": prescriptions},
+        "reminders": reminders,
+        "notifications": {"notifications": notifications, "unread": ROWS // 2},
+    }
+
+
+def encoders():
+    codings = [None, "gzip"] + (["br"] if BROTLI_AVAILABLE else [])
+    for fmt, encode in (("json", dumps), ("msgpack", pack_rows)):
+        for coding in codings:
+            if coding is None:
+                yield fmt, encode
+            else:
+                yield f"{fmt}+{coding}", lambda content, e=encode, c=coding: _Compressor(c).finish(e(content))
+
+
+def bench(encode, content):
+    encode(content)  # Warm up
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        body = encode(content)
+    return (time.perf_counter() - start) / REPEAT, body
+
+
+def main():
+    lists = synthetic_lists()
+    print(f"{ROWS} rows per list, mean of {REPEAT} runs")
+    if not BROTLI_AVAILABLE:
+        print("(brotli not installed; br rows skipped)")
+
+    for name, content in lists.items():
+        print(f"\nGET /{name}")
+        baseline = None
+        for label, encode in encoders():
+            elapsed, body = bench(encode, content)
+            baseline = baseline or len(body)
+            print(f"  {label:<14} {len(body) / 1024:>8.1f} KiB  {len(body) / baseline:>6.0%}  {elapsed * 1000:>7.2f} ms")
+
+        # Both formats must decode to the same document
+        as_json = orjson.loads(dumps(content))
+        assert msgpack.unpackb(pack_rows(content)) == as_json, f"{name}: MessagePack differs from JSON"
+        assert orjson.loads(gzip.decompress(_Compressor("gzip").finish(dumps(content)))) == as_json
+
+    print("\n✓ MessagePack decodes to the same documents as JSON")
+
+
+if __name__ == "__main__":
+    main()
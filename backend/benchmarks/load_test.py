@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Async load test against a running API.
+
+Logs in a pool of generated accounts (see generate_load_data.py), then
+replays a weighted patient/doctor traffic mix with N concurrent virtual users
+for a fixed duration and reports throughput, error counts and p50/p95/p99
+latency per route.
+
+Run from backend/ with the API up (uvicorn app.main:app --workers 4):
+    python benchmarks/load_test.py --base-url http://localhost:8000 \
+        --concurrency 100 --duration 60 --patients 100000 --doctors 1000
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import defaultdict
+
+import httpx
+
+PASSWORD = "LoadTest@123"
+EMAIL_DOMAIN = "symptotrack.test"
+API = "/api/v1"
+
+# (route label, weight, path) - weights roughly follow app usage
+PATIENT_MIX = [
+    ("GET /appointments", 25, "/appointments"),
+    ("GET /appointments/upcoming", 15, "/appointments/upcoming"),
+    ("GET /prescriptions", 15, "/prescriptions"),
+    ("GET /prescriptions/active", 10, "/prescriptions/active"),
+    ("GET /timeline", 10, "/timeline"),
+    ("GET /notifications/unread-count", 15, "/notifications/unread-count"),
+    ("GET /doctors", 10, "/doctors"),
+    ("GET /billing", 5, "/billing"),
+    ("GET /search", 5, "/search?q={term}"),
+]
+DOCTOR_MIX = [
+    ("GET /appointments", 30, "/appointments"),
+    ("GET /dashboard/doctor", 10, "/dashboard/doctor"),
+    ("GET /appointments/upcoming", 10, "/appointments/upcoming"),
+    ("GET /prescriptions", 15, "/prescriptions"),
+    ("GET /medicines/autocomplete", 20, "/medicines/autocomplete?q={prefix}"),
+    ("GET /search", 10, "/search?q={term}"),
+    ("GET /notifications/unread-count", 5, "/notifications/unread-count"),
+]
+SEARCH_TERMS = ["paracetamol", "fever", "amoxicilin", "metformin", "after food"]
+PREFIXES = ["p", "pa", "par", "am", "amo", "met", "cet", "az"]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    low = int(k)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (k - low)
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, route, seconds, ok):
+        self.latencies[route].append(seconds * 1000)
+        if not ok:
+            self.errors[route] += 1
+
+    def report(self, elapsed):
+        total = sum(len(v) for v in self.latencies.values())
+        print(f"\n{'route':<34}{'reqs':>8}{'req/s':>9}{'err':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+        for route in sorted(self.latencies, key=lambda r: -len(self.latencies[r])):
+            values = sorted(self.latencies[route])
+            print(
+                f"{route:<34}{len(values):>8}{len(values) / elapsed:>9.1f}{self.errors[route]:>6}"
+                f"{percentile(values, 50):>9.1f}{percentile(values, 95):>9.1f}{percentile(values, 99):>9.1f}"
+            )
+        everything = sorted(v for values in self.latencies.values() for v in values)
+        print(
+            f"\n{total} requests in {elapsed:.1f}s = {total / elapsed:.1f} req/s, "
+            f"{sum(self.errors.values())} errors, p50 {percentile(everything, 50):.1f} ms, "
+            f"p95 {percentile(everything, 95):.1f} ms, p99 {percentile(everything, 99):.1f} ms"
+        )
+
+
+async def login(client, email):
+    response = await client.post(f"{API}/auth/login", json={"email": email, "password": PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def build_sessions(client, args):
+    """Log in a sample of patients and doctors (bcrypt makes logins slow, so reuse tokens)."""
+    accounts = [
+        ("patient", PATIENT_MIX, f"loadtest.patient{random.randint(1, args.patients)}@{EMAIL_DOMAIN}")
+        for _ in range(args.accounts - args.accounts // 5)
+    ] + [
+        ("doctor", DOCTOR_MIX, f"loadtest.doctor{random.randint(1, args.doctors)}@{EMAIL_DOMAIN}")
+        for _ in range(args.accounts // 5)
+    ]
+    semaphore = asyncio.Semaphore(20)
+
+    async def one(role, mix, email):
+        async with semaphore:
+            try:
+                return role, mix, await login(client, email)
+            except httpx.HTTPError as e:
+                print(f"  Login failed for {email}: {e}")
+                return None
+
+    sessions = [s for s in await asyncio.gather(*(one(*a) for a in accounts)) if s]
+    if not sessions:
+        raise SystemExit("No accounts could log in; run generate_load_data.py first")
+    return sessions
+
+
+async def virtual_user(client, sessions, stats, deadline):
+    role, mix, token = random.choice(sessions)
+    headers = {"Authorization": f"Bearer {token}"}
+    routes = [(label, path) for label, _, path in mix]
+    weights = [weight for _, weight, _ in mix]
+
+    while time.perf_counter() < deadline:
+        label, path = random.choices(routes, weights)[0]
+        url = API + path.format(term=random.choice(SEARCH_TERMS), prefix=random.choice(PREFIXES))
+        start = time.perf_counter()
+        try:
+            response = await client.get(url, headers=headers)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        stats.record(f"{label} ({role})", time.perf_counter() - start, ok)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Replay a realistic traffic mix and report latency percentiles")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds")
+    parser.add_argument("--accounts", type=int, default=100, help="Accounts to log in (20%% doctors)")
+    parser.add_argument("--patients", type=int, default=100_000, help="Generated patients to sample from")
+    parser.add_argument("--doctors", type=int, default=1_000, help="Generated doctors to sample from")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Seconds excluded from the report")
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30.0) as client:
+        print(f"Logging in {args.accounts} accounts...")
+        sessions = await build_sessions(client, args)
+
+        if args.warmup:
+            print(f"Warming up for {args.warmup:.0f}s...")
+            await asyncio.gather(*(
+                virtual_user(client, sessions, Stats(), time.perf_counter() + args.warmup)
+                for _ in range(args.concurrency)
+            ))
+
+        print(f"Running {args.concurrency} virtual users for {args.duration:.0f}s...")
+        stats = Stats()
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            virtual_user(client, sessions, stats, start + args.duration)
+            for _ in range(args.concurrency)
+        ))
+        stats.report(time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
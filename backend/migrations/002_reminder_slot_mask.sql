@@ -0,0 +1,49 @@
+-- ============================================================
+-- SymptoTrack - Reminder slot bitmask
+-- Replaces medicine_reminders.timing_slots JSONB with a compact
+-- slot bitmask plus patient-specific time overrides.
+-- Date: 2026-10-19
+-- ============================================================
+-- Slot bits (see app/services/frequency_registry.py):
+--   1 = Morning (08:00), 2 = Afternoon (13:00),
+--   4 = Evening (18:00), 8 = Night (21:00)
+-- ============================================================
+
+BEGIN;
+
+ALTER TABLE medicine_reminders ADD COLUMN IF NOT EXISTS slot_mask SMALLINT NOT NULL DEFAULT 1;
+ALTER TABLE medicine_reminders ADD COLUMN IF NOT EXISTS timing_overrides JSONB;
+
+-- Backfill from the existing JSON slots (skipped when already migrated)
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'medicine_reminders' AND column_name = 'timing_slots'
+    ) THEN
+        UPDATE medicine_reminders mr
+        SET slot_mask = COALESCE(NULLIF(s.mask, 0), 1),
+            timing_overrides = s.overrides
+        FROM (
+            SELECT
+                r.id,
+                COALESCE(BIT_OR(d.bit), 0)::SMALLINT AS mask,
+                jsonb_object_agg(d.key, slot->>'time')
+                    FILTER (WHERE d.key IS NOT NULL AND slot->>'time' IS DISTINCT FROM d.default_time) AS overrides
+            FROM medicine_reminders r
+            CROSS JOIN LATERAL jsonb_array_elements(COALESCE(r.timing_slots, '[]'::jsonb)) AS slot
+            LEFT JOIN (VALUES
+                ('Morning', 'morning', 1, '08:00'),
+                ('Afternoon', 'afternoon', 2, '13:00'),
+                ('Evening', 'evening', 4, '18:00'),
+                ('Night', 'night', 8, '21:00')
+            ) AS d(label, key, bit, default_time) ON d.label = slot->>'label'
+            GROUP BY r.id
+        ) s
+        WHERE mr.id = s.id;
+    END IF;
+END $$;
+
+ALTER TABLE medicine_reminders DROP COLUMN IF EXISTS timing_slots;
+
+COMMIT;
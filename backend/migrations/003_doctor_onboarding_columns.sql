@@ -0,0 +1,23 @@
+-- ============================================================
+-- SymptoTrack - Doctor onboarding columns
+-- Columns written by the doctor onboarding flow that were not
+-- yet present on the integer-keyed doctors table.
+-- Date: 2026-10-19
+-- ============================================================
+
+BEGIN;
+
+ALTER TABLE doctors ADD COLUMN IF NOT EXISTS gender VARCHAR(10);
+ALTER TABLE doctors ADD COLUMN IF NOT EXISTS registration_number VARCHAR(100) UNIQUE;
+ALTER TABLE doctors ADD COLUMN IF NOT EXISTS about TEXT;
+ALTER TABLE doctors ADD COLUMN IF NOT EXISTS profile_picture VARCHAR(500);
+ALTER TABLE doctors ADD COLUMN IF NOT EXISTS is_deleted BOOLEAN DEFAULT FALSE;
+
+-- Added by 001 but repeated here so this file can run standalone
+ALTER TABLE doctors ADD COLUMN IF NOT EXISTS clinic_name VARCHAR(200);
+ALTER TABLE doctors ADD COLUMN IF NOT EXISTS clinic_address TEXT;
+ALTER TABLE doctors ADD COLUMN IF NOT EXISTS clinic_logo VARCHAR(500);
+ALTER TABLE doctors ADD COLUMN IF NOT EXISTS state_medical_council VARCHAR(100);
+ALTER TABLE doctors ADD COLUMN IF NOT EXISTS hfr_id VARCHAR(50);
+
+COMMIT;
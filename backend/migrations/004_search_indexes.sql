@@ -0,0 +1,62 @@
+-- ============================================================
+-- SymptoTrack - Full-text & trigram search
+-- Generated tsvector columns (maintained by Postgres on every
+-- write) plus GIN indexes for ranked full-text search, and
+-- pg_trgm indexes for fuzzy / substring medicine lookup.
+-- Date: 2026-10-19
+-- ============================================================
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+BEGIN;
+
+-- ------------------------------------------------------------
+-- Prescriptions: medicine name (A) + instructions (C)
+-- ------------------------------------------------------------
+ALTER TABLE prescriptions ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(medication_name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(instructions, '')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_prescriptions_search_vector
+    ON prescriptions USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_prescriptions_medication_name_trgm
+    ON prescriptions USING GIN (medication_name gin_trgm_ops);
+
+-- ------------------------------------------------------------
+-- Medical records: diagnosis (A) + symptoms (B) + treatment (C)
+-- ------------------------------------------------------------
+ALTER TABLE medical_records ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(diagnosis, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(symptoms, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(treatment, '')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_medical_records_search_vector
+    ON medical_records USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_medical_records_diagnosis_trgm
+    ON medical_records USING GIN (diagnosis gin_trgm_ops);
+
+-- ------------------------------------------------------------
+-- Doctor medicine favorites: name (A) + category (B) + usage (C)
+-- ------------------------------------------------------------
+DO $$
+BEGIN
+    IF to_regclass('doctor_medicine_favorites') IS NOT NULL THEN
+        ALTER TABLE doctor_medicine_favorites ADD COLUMN IF NOT EXISTS search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(medicine_name, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(category, '')), 'B') ||
+                setweight(to_tsvector('english', coalesce(usage_instructions, '')), 'C')
+            ) STORED;
+
+        CREATE INDEX IF NOT EXISTS idx_doctor_medicine_favorites_search_vector
+            ON doctor_medicine_favorites USING GIN (search_vector);
+        CREATE INDEX IF NOT EXISTS idx_doctor_medicine_favorites_name_trgm
+            ON doctor_medicine_favorites USING GIN (medicine_name gin_trgm_ops);
+    END IF;
+END $$;
+
+COMMIT;
@@ -0,0 +1,66 @@
+-- ============================================================
+-- SymptoTrack - Change capture for incremental D1 sync
+-- Every insert/update/delete on a synced table appends one row
+-- to d1_change_log; sync_to_d1.py replays the log in seq order
+-- from its stored checkpoint (upserts + delete tombstones).
+-- Date: 2026-10-19
+-- ============================================================
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS d1_change_log (
+    seq BIGSERIAL PRIMARY KEY,
+    table_name TEXT NOT NULL,
+    row_id TEXT NOT NULL,
+    op CHAR(1) NOT NULL CHECK (op IN ('U', 'D')),  -- U = upsert, D = tombstone
+    xid XID8 NOT NULL DEFAULT pg_current_xact_id(),
+    changed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- seq is assigned at insert, not commit: a long transaction can commit a
+-- lower seq after a reader has moved past it. Readers also rescan rows from
+-- transactions that were still open at their last read (xid >= snapshot xmin).
+CREATE INDEX IF NOT EXISTS idx_d1_change_log_xid ON d1_change_log (xid);
+
+-- TG_ARGV[0] is the primary key column of the audited table
+CREATE OR REPLACE FUNCTION d1_capture_change() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO d1_change_log (table_name, row_id, op)
+        VALUES (TG_TABLE_NAME, to_jsonb(OLD) ->> TG_ARGV[0], 'D');
+        RETURN OLD;
+    END IF;
+
+    -- Primary key change: tombstone the old key
+    IF TG_OP = 'UPDATE' AND (to_jsonb(OLD) ->> TG_ARGV[0]) IS DISTINCT FROM (to_jsonb(NEW) ->> TG_ARGV[0]) THEN
+        INSERT INTO d1_change_log (table_name, row_id, op)
+        VALUES (TG_TABLE_NAME, to_jsonb(OLD) ->> TG_ARGV[0], 'D');
+    END IF;
+
+    INSERT INTO d1_change_log (table_name, row_id, op)
+    VALUES (TG_TABLE_NAME, to_jsonb(NEW) ->> TG_ARGV[0], 'U');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY[
+        'users', 'patients', 'doctors', 'doctor_specializations', 'appointments',
+        'prescriptions', 'prescription_medications', 'medical_records', 'test_reports',
+        'bills', 'payments', 'notifications', 'reviews', 'doctor_availability'
+    ] LOOP
+        IF to_regclass(t) IS NOT NULL THEN
+            EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_d1_change ON %I', t, t);
+            EXECUTE format(
+                'CREATE TRIGGER trg_%s_d1_change AFTER INSERT OR UPDATE OR DELETE ON %I '
+                'FOR EACH ROW EXECUTE FUNCTION d1_capture_change(''id'')',
+                t, t
+            );
+        END IF;
+    END LOOP;
+END $$;
+
+COMMIT;
@@ -0,0 +1,61 @@
+-- ============================================================
+-- SymptoTrack - Composite / partial indexes for hot query shapes
+-- Each index matches the filter + sort of a list route or a
+-- periodic task:
+--   appointments    list by patient/doctor by date, upcoming
+--                   ('scheduled') visits, reminder sweep over
+--                   tomorrow's 'confirmed'/'booked' appointments
+--   notifications   list by user newest first, unread list/count
+--   prescriptions,  history by patient/doctor newest first
+--   medical_records
+--   bills           non-deleted bills by patient newest first
+-- Built CONCURRENTLY so writes are not blocked; run_migration.py
+-- executes this file statement by statement outside a transaction.
+-- Check plans with: python benchmarks/verify_indexes.py
+-- Date: 2026-10-19
+-- ============================================================
+-- migrate: no-transaction
+
+-- ------------------------------------------------------------
+-- Appointments
+-- ------------------------------------------------------------
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_appointments_patient_date
+    ON appointments (patient_id, appointment_date);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_appointments_doctor_date
+    ON appointments (doctor_id, appointment_date);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_appointments_scheduled_date
+    ON appointments (appointment_date) WHERE status = 'scheduled';
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_appointments_reminder_sweep
+    ON appointments (appointment_date) WHERE status IN ('confirmed', 'booked');
+
+-- ------------------------------------------------------------
+-- Notifications
+-- ------------------------------------------------------------
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_notifications_user_created
+    ON notifications (user_id, created_at);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_notifications_user_unread
+    ON notifications (user_id, created_at) WHERE is_read = false;
+
+-- ------------------------------------------------------------
+-- Prescriptions / medical records
+-- ------------------------------------------------------------
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_prescriptions_patient_date
+    ON prescriptions (patient_id, prescribed_date);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_prescriptions_doctor_date
+    ON prescriptions (doctor_id, prescribed_date);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_medical_records_patient_visit
+    ON medical_records (patient_id, visit_date);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_medical_records_doctor_visit
+    ON medical_records (doctor_id, visit_date);
+
+-- ------------------------------------------------------------
+-- Bills
+-- ------------------------------------------------------------
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_bills_patient_date_active
+    ON bills (patient_id, bill_date) WHERE is_deleted = false;
+
+ANALYZE appointments;
+ANALYZE notifications;
+ANALYZE prescriptions;
+ANALYZE medical_records;
+ANALYZE bills;
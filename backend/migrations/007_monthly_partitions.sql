@@ -0,0 +1,179 @@
+-- ============================================================
+-- SymptoTrack - Monthly range partitioning
+-- appointments            by appointment_date
+-- notifications           by created_at
+-- medicine_reminder_logs  by scheduled_time
+--
+-- Each table is rebuilt as a partitioned table with one partition
+-- per month (<table>_pYYYY_MM) and its rows copied across; the
+-- primary key becomes (id, <partition column>) because Postgres
+-- requires the partition key in every unique index. Foreign keys
+-- pointing at these tables are dropped for the same reason.
+--
+-- The tables are locked while rows are copied: run in a quiet
+-- window. Afterwards app/services/partitions.py (Celery task
+-- maintain_partitions) creates upcoming months and detaches old
+-- ones CONCURRENTLY into the "archive" schema, so there is
+-- deliberately no DEFAULT partition (it would block concurrent
+-- detach).
+-- Date: 2026-10-19
+-- ============================================================
+
+BEGIN;
+
+CREATE SCHEMA IF NOT EXISTS archive;
+
+-- Create the partition of `parent` holding `month` (any day in it); bounds
+-- are UTC month starts for timestamptz keys. Returns the partition name.
+CREATE OR REPLACE FUNCTION ensure_monthly_partition(parent TEXT, month DATE) RETURNS TEXT AS $$
+DECLARE
+    lo DATE := date_trunc('month', month)::date;
+    hi DATE := (date_trunc('month', month) + interval '1 month')::date;
+    part TEXT := format('%s_p%s', parent, to_char(lo, 'YYYY_MM'));
+    key_type TEXT;
+BEGIN
+    SELECT format_type(a.atttypid, a.atttypmod) INTO key_type
+    FROM pg_partitioned_table p
+    JOIN pg_attribute a ON a.attrelid = p.partrelid AND a.attnum = p.partattrs[0]
+    WHERE p.partrelid = parent::regclass;
+
+    IF key_type IS NULL THEN
+        RAISE EXCEPTION '% is not a partitioned table', parent;
+    END IF;
+
+    IF key_type = 'date' THEN
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+            part, parent, lo, hi
+        );
+    ELSE
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+            part, parent, lo::timestamp AT TIME ZONE 'UTC', hi::timestamp AT TIME ZONE 'UTC'
+        );
+    END IF;
+    RETURN part;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Rebuild `tbl` partitioned by month on `col`, keeping columns, defaults,
+-- check constraints, indexes, triggers and the id sequence.
+CREATE OR REPLACE FUNCTION pg_temp.partition_by_month(tbl TEXT, col TEXT, months_ahead INT) RETURNS VOID AS $$
+DECLARE
+    legacy TEXT := tbl || '_unpartitioned';
+    seq TEXT;
+    first_month DATE;
+    month DATE;
+    index_defs TEXT[];
+    trigger_defs TEXT[];
+    def TEXT;
+    fk RECORD;
+BEGIN
+    IF to_regclass(tbl) IS NULL THEN
+        RAISE NOTICE 'Skipping %: table does not exist', tbl;
+        RETURN;
+    END IF;
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = tbl::regclass) THEN
+        RAISE NOTICE 'Skipping %: already partitioned', tbl;
+        RETURN;
+    END IF;
+
+    EXECUTE format('LOCK TABLE %I IN ACCESS EXCLUSIVE MODE', tbl);
+
+    -- FKs into the table need a unique key on id alone, which a partitioned table cannot have
+    FOR fk IN
+        SELECT conname, conrelid::regclass AS child FROM pg_constraint
+        WHERE contype = 'f' AND confrelid = tbl::regclass
+    LOOP
+        RAISE NOTICE 'Dropping foreign key % on % (references %)', fk.conname, fk.child, tbl;
+        EXECUTE format('ALTER TABLE %s DROP CONSTRAINT %I', fk.child, fk.conname);
+    END LOOP;
+
+    FOR def IN
+        SELECT indexrelid::regclass::text FROM pg_index
+        WHERE indrelid = tbl::regclass AND indisunique AND NOT indisprimary
+    LOOP
+        RAISE NOTICE 'Not recreating unique index % on %: it does not include %', def, tbl, col;
+    END LOOP;
+
+    -- Secondary indexes and user triggers, recreated on the new parent
+    SELECT coalesce(array_agg(pg_get_indexdef(indexrelid)), '{}') INTO index_defs
+    FROM pg_index WHERE indrelid = tbl::regclass AND NOT indisprimary AND NOT indisunique;
+    SELECT coalesce(array_agg(pg_get_triggerdef(oid)), '{}') INTO trigger_defs
+    FROM pg_trigger WHERE tgrelid = tbl::regclass AND NOT tgisinternal;
+
+    EXECUTE format('ALTER TABLE %I RENAME TO %I', tbl, legacy);
+    EXECUTE format('UPDATE %I SET %I = now() WHERE %I IS NULL', legacy, col, col);
+
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING STORAGE INCLUDING COMMENTS) '
+        'PARTITION BY RANGE (%I)',
+        tbl, legacy, col
+    );
+    EXECUTE format('ALTER TABLE %I ALTER COLUMN %I SET NOT NULL', tbl, col);
+
+    EXECUTE format('SELECT date_trunc(''month'', min(%I))::date FROM %I', col, legacy) INTO first_month;
+    month := least(coalesce(first_month, current_date), current_date);
+    WHILE month <= (current_date + make_interval(months => months_ahead))::date LOOP
+        PERFORM ensure_monthly_partition(tbl, month);
+        month := (month + interval '1 month')::date;
+    END LOOP;
+
+    EXECUTE format('INSERT INTO %I SELECT * FROM %I', tbl, legacy);
+
+    -- Keep the serial sequence alive when the old table is dropped
+    seq := pg_get_serial_sequence(legacy, 'id');
+    IF seq IS NOT NULL THEN
+        EXECUTE format('ALTER SEQUENCE %s OWNED BY %I.id', seq, tbl);
+    END IF;
+
+    EXECUTE format('DROP TABLE %I', legacy);
+
+    -- After the drop so the old <tbl>_pkey name is free
+    EXECUTE format('ALTER TABLE %I ADD PRIMARY KEY (id, %I)', tbl, col);
+
+    FOREACH def IN ARRAY index_defs LOOP
+        EXECUTE regexp_replace(def, ' ON (ONLY )?\S+ USING ', format(' ON %I USING ', tbl));
+    END LOOP;
+    FOREACH def IN ARRAY trigger_defs LOOP
+        EXECUTE regexp_replace(def, ' ON \S+ ', format(' ON %I ', tbl));
+    END LOOP;
+
+    EXECUTE format('ANALYZE %I', tbl);
+    RAISE NOTICE 'Partitioned % by month on %', tbl, col;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Appointments are booked up to a year ahead (APPOINTMENT_BOOKING_HORIZON_DAYS)
+SELECT pg_temp.partition_by_month('appointments', 'appointment_date', 13);
+SELECT pg_temp.partition_by_month('notifications', 'created_at', 3);
+SELECT pg_temp.partition_by_month('medicine_reminder_logs', 'scheduled_time', 3);
+
+-- Row triggers on a partitioned table fire with TG_TABLE_NAME set to the
+-- partition; log changes under the partitioned (root) table name instead
+CREATE OR REPLACE FUNCTION d1_capture_change() RETURNS trigger AS $$
+DECLARE
+    tbl TEXT := coalesce(
+        (SELECT c.relname FROM pg_class c WHERE c.oid = pg_partition_root(TG_RELID)),
+        TG_TABLE_NAME
+    );
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO d1_change_log (table_name, row_id, op)
+        VALUES (tbl, to_jsonb(OLD) ->> TG_ARGV[0], 'D');
+        RETURN OLD;
+    END IF;
+
+    -- Primary key change: tombstone the old key
+    IF TG_OP = 'UPDATE' AND (to_jsonb(OLD) ->> TG_ARGV[0]) IS DISTINCT FROM (to_jsonb(NEW) ->> TG_ARGV[0]) THEN
+        INSERT INTO d1_change_log (table_name, row_id, op)
+        VALUES (tbl, to_jsonb(OLD) ->> TG_ARGV[0], 'D');
+    END IF;
+
+    INSERT INTO d1_change_log (table_name, row_id, op)
+    VALUES (tbl, to_jsonb(NEW) ->> TG_ARGV[0], 'U');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMIT;
@@ -0,0 +1,34 @@
+-- ============================================================
+-- SymptoTrack - Patient timeline read model
+-- One row per appointment, medical record, prescription and
+-- report, denormalized for a single keyset-paginated history
+-- query. Maintained by ORM write hooks
+-- (app/services/patient_timeline.py); backfill or repair with the
+-- Celery task rebuild_patient_timeline.
+-- Date: 2026-10-19
+-- ============================================================
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS patient_timeline (
+    id BIGSERIAL PRIMARY KEY,
+    patient_id INTEGER NOT NULL REFERENCES patients(id) ON DELETE CASCADE,
+    event_type VARCHAR(30) NOT NULL,  -- appointment, medical_record, prescription, report
+    source_id TEXT NOT NULL,          -- Primary key of the source row (integer or UUID)
+    occurred_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    doctor_id INTEGER,
+    title VARCHAR(255) NOT NULL,
+    summary TEXT,
+    status VARCHAR(30),
+    details JSONB NOT NULL DEFAULT '{}',
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_patient_timeline_source UNIQUE (event_type, source_id)
+);
+
+-- Keyset pagination: WHERE patient_id = ? AND (occurred_at, id) < (?, ?)
+CREATE INDEX IF NOT EXISTS ix_patient_timeline_patient_occurred
+    ON patient_timeline (patient_id, occurred_at DESC, id DESC);
+
+COMMENT ON TABLE patient_timeline IS 'Denormalized per-patient history (appointments, records, prescriptions, reports)';
+
+COMMIT;
@@ -0,0 +1,119 @@
+-- ============================================================
+-- SymptoTrack - Doctor dashboard materialized views
+--   mv_doctor_queue          appointments yesterday..tomorrow (the
+--                            API filters to today, so the view stays
+--                            right across midnight until refreshed)
+--   mv_doctor_pending_tests  ordered/missing tests per doctor
+--   mv_doctor_patients       distinct patients seen in 30/90 days
+--
+-- Each view has a unique index so it can be refreshed CONCURRENTLY
+-- (readers are never blocked). Statement-level triggers on the
+-- source tables flag the affected views in dashboard_view_state;
+-- the Celery task refresh_dashboard_views refreshes flagged views
+-- and any view older than DASHBOARD_MAX_STALENESS_SECONDS.
+-- Date: 2026-10-19
+-- ============================================================
+
+BEGIN;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_doctor_queue AS
+SELECT a.id AS appointment_id,
+       a.doctor_id,
+       a.patient_id,
+       trim(coalesce(p.first_name, '') || ' ' || coalesce(p.last_name, '')) AS patient_name,
+       a.appointment_date,
+       a.appointment_time,
+       a.status,
+       a.reason
+FROM appointments a
+LEFT JOIN patients p ON p.id = a.patient_id
+WHERE a.appointment_date BETWEEN current_date - 1 AND current_date + 1
+  AND a.doctor_id IS NOT NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_doctor_queue ON mv_doctor_queue (appointment_id);
+CREATE INDEX IF NOT EXISTS ix_mv_doctor_queue_doctor
+    ON mv_doctor_queue (doctor_id, appointment_date, appointment_time);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_doctor_pending_tests AS
+SELECT pr.doctor_id,
+       count(*) AS pending_tests,
+       count(*) FILTER (WHERE t.due_date < current_date) AS overdue_tests,
+       min(t.due_date) FILTER (WHERE t.due_date >= current_date) AS next_due_date
+FROM tests_ordered t
+JOIN prescriptions pr ON pr.id = t.prescription_id
+WHERE lower(t.status::text) IN ('ordered', 'missing')
+GROUP BY pr.doctor_id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_doctor_pending_tests ON mv_doctor_pending_tests (doctor_id);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_doctor_patients AS
+SELECT doctor_id,
+       count(DISTINCT patient_id) FILTER (WHERE seen_on >= current_date - 30) AS active_patients_30d,
+       count(DISTINCT patient_id) AS active_patients_90d
+FROM (
+    SELECT doctor_id, patient_id, appointment_date AS seen_on
+    FROM appointments
+    WHERE appointment_date BETWEEN current_date - 90 AND current_date
+      AND status NOT IN ('cancelled', 'rejected')
+    UNION ALL
+    SELECT doctor_id, patient_id, prescribed_date
+    FROM prescriptions
+    WHERE prescribed_date BETWEEN current_date - 90 AND current_date
+) seen
+WHERE doctor_id IS NOT NULL AND patient_id IS NOT NULL
+GROUP BY doctor_id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_doctor_patients ON mv_doctor_patients (doctor_id);
+
+-- ------------------------------------------------------------
+-- Write-triggered refresh flags
+-- ------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS dashboard_view_state (
+    view_name TEXT PRIMARY KEY,
+    dirty_since TIMESTAMP WITH TIME ZONE,  -- First write since the last refresh; NULL = clean
+    refreshed_at TIMESTAMP WITH TIME ZONE
+);
+
+INSERT INTO dashboard_view_state (view_name, refreshed_at)
+VALUES ('mv_doctor_queue', now()), ('mv_doctor_pending_tests', now()),
+       ('mv_doctor_patients', now())
+ON CONFLICT (view_name) DO NOTHING;
+
+-- TG_ARGV: views fed by the table. Only the first write after a refresh
+-- updates the flag row, and SKIP LOCKED means concurrent writers never
+-- queue behind each other on it.
+CREATE OR REPLACE FUNCTION mark_dashboard_dirty() RETURNS trigger AS $$
+BEGIN
+    UPDATE dashboard_view_state SET dirty_since = now()
+    WHERE view_name IN (
+        SELECT view_name FROM dashboard_view_state
+        WHERE view_name = ANY(TG_ARGV) AND dirty_since IS NULL
+        FOR UPDATE SKIP LOCKED
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    source RECORD;
+BEGIN
+    FOR source IN
+        SELECT * FROM (VALUES
+            ('appointments', ARRAY['mv_doctor_queue', 'mv_doctor_patients']),
+            ('patients', ARRAY['mv_doctor_queue']),
+            ('prescriptions', ARRAY['mv_doctor_pending_tests', 'mv_doctor_patients']),
+            ('tests_ordered', ARRAY['mv_doctor_pending_tests'])
+        ) AS s (table_name, views)
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_dashboard_dirty ON %I', source.table_name, source.table_name);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%s_dashboard_dirty AFTER INSERT OR UPDATE OR DELETE ON %I '
+            'FOR EACH STATEMENT EXECUTE FUNCTION mark_dashboard_dirty(%s)',
+            source.table_name, source.table_name,
+            (SELECT string_agg(quote_literal(v), ', ') FROM unnest(source.views) AS v)
+        );
+    END LOOP;
+END $$;
+
+COMMIT;
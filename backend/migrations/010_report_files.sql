@@ -0,0 +1,14 @@
+-- ============================================================
+-- SymptoTrack - Report file metadata
+-- Name, sniffed content type and size of the file uploaded for
+-- a report (file_url holds its blob key).
+-- Date: 2026-10-19
+-- ============================================================
+
+BEGIN;
+
+ALTER TABLE reports ADD COLUMN IF NOT EXISTS file_name VARCHAR(255);
+ALTER TABLE reports ADD COLUMN IF NOT EXISTS file_content_type VARCHAR(100);
+ALTER TABLE reports ADD COLUMN IF NOT EXISTS file_size BIGINT;
+
+COMMIT;
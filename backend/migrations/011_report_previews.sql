@@ -0,0 +1,12 @@
+-- ============================================================
+-- SymptoTrack - Report previews
+-- Set once the thumbnail and preview of the report's file exist
+-- (generate_report_derivatives Celery task).
+-- Date: 2026-10-19
+-- ============================================================
+
+BEGIN;
+
+ALTER TABLE reports ADD COLUMN IF NOT EXISTS file_previews BOOLEAN NOT NULL DEFAULT FALSE;
+
+COMMIT;
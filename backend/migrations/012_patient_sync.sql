@@ -0,0 +1,107 @@
+-- ============================================================
+-- SymptoTrack - Per-patient sync versions and tombstones
+-- Conditional GETs (ETag / Last-Modified) and ?since= delta sync of
+-- appointments, prescriptions, medical records and medicine reminders
+-- (app/services/patient_sync.py).
+--
+-- Every insert, update or delete of a synced row bumps its patient's
+-- counter in patient_sync_versions and stamps the row's updated_at (or
+-- the delete's tombstone) with the same time. The bump locks the
+-- patient's counter row until commit, so one patient's changes commit in
+-- stamp order: a reader that saw changed_at = T has seen every change of
+-- that patient stamped <= T, and T is a gap-free delta watermark.
+-- Date: 2026-10-19
+-- ============================================================
+
+BEGIN;
+
+-- No foreign key: deleting a patient cascades to its rows, whose triggers
+-- still bump the (then orphaned) counter
+CREATE TABLE IF NOT EXISTS patient_sync_versions (
+    patient_id INTEGER PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    changed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT clock_timestamp()
+);
+
+CREATE TABLE IF NOT EXISTS patient_sync_tombstones (
+    id BIGSERIAL PRIMARY KEY,
+    patient_id INTEGER NOT NULL,
+    entity VARCHAR(50) NOT NULL,  -- Table name of the deleted row
+    row_id TEXT NOT NULL,
+    deleted_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_patient_sync_tombstones_patient
+    ON patient_sync_tombstones (patient_id, entity, deleted_at);
+CREATE INDEX IF NOT EXISTS ix_patient_sync_tombstones_deleted_at
+    ON patient_sync_tombstones (deleted_at);
+
+-- Prescriptions had no updated_at
+ALTER TABLE prescriptions
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP;
+
+-- Next version of a patient; returns its change time. clock_timestamp() in
+-- the UPDATE is read after the row lock is taken, and never goes backwards.
+CREATE OR REPLACE FUNCTION patient_sync_bump(p_patient_id INTEGER) RETURNS TIMESTAMPTZ AS $$
+DECLARE
+    stamp TIMESTAMPTZ;
+BEGIN
+    INSERT INTO patient_sync_versions AS v (patient_id, version, changed_at)
+    VALUES (p_patient_id, 1, clock_timestamp())
+    ON CONFLICT (patient_id) DO UPDATE
+        SET version = v.version + 1,
+            changed_at = greatest(clock_timestamp(), v.changed_at + interval '1 microsecond')
+    RETURNING changed_at INTO stamp;
+    RETURN stamp;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION patient_sync_capture() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        IF OLD.patient_id IS NOT NULL THEN
+            INSERT INTO patient_sync_tombstones (patient_id, entity, row_id, deleted_at)
+            VALUES (OLD.patient_id, TG_TABLE_NAME, OLD.id::text, patient_sync_bump(OLD.patient_id));
+        END IF;
+        RETURN OLD;
+    END IF;
+
+    -- Moved to another patient: gone from the old patient's lists
+    IF TG_OP = 'UPDATE' AND OLD.patient_id IS NOT NULL AND OLD.patient_id IS DISTINCT FROM NEW.patient_id THEN
+        INSERT INTO patient_sync_tombstones (patient_id, entity, row_id, deleted_at)
+        VALUES (OLD.patient_id, TG_TABLE_NAME, OLD.id::text, patient_sync_bump(OLD.patient_id));
+    END IF;
+
+    IF NEW.patient_id IS NOT NULL THEN
+        NEW.updated_at := patient_sync_bump(NEW.patient_id);
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- BEFORE triggers so the stamp lands in updated_at. medicine_reminders is
+-- only synced once its patient_id is an integer (UUID-keyed schemas skip it).
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['appointments', 'prescriptions', 'medical_records', 'medicine_reminders'] LOOP
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = t
+              AND column_name = 'patient_id' AND data_type = 'integer'
+        ) THEN
+            EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_patient_sync ON %I', t, t);
+            EXECUTE format(
+                'CREATE TRIGGER trg_%s_patient_sync BEFORE INSERT OR UPDATE OR DELETE ON %I '
+                'FOR EACH ROW EXECUTE FUNCTION patient_sync_capture()',
+                t, t
+            );
+        END IF;
+    END LOOP;
+END $$;
+
+COMMENT ON TABLE patient_sync_versions IS 'Per-patient change counter for ETags and delta sync';
+COMMENT ON TABLE patient_sync_tombstones IS 'Deleted synced rows, kept SYNC_TOMBSTONE_RETENTION_DAYS';
+
+COMMIT;
@@ -0,0 +1,49 @@
+-- ============================================================
+-- SymptoTrack - Offline reminder sync
+-- POST /reminders/sync (app/services/reminder_sync.py) applies a batch of
+-- operations the mobile app queued offline (taken, missed, snooze, timing
+-- changes) and returns the reminders changed since the client's checkpoint.
+--
+-- sync_operations remembers each operation's idempotency key and result, so
+-- a batch resent after a lost response is not applied twice. Follow-up and
+-- test reminders join the per-patient change counter of 012_patient_sync.sql.
+-- Date: 2026-10-19
+-- ============================================================
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS sync_operations (
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    idempotency_key VARCHAR(64) NOT NULL,
+    op VARCHAR(20) NOT NULL,
+    result JSONB,  -- Response for the operation, replayed on retries
+    applied_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, idempotency_key)
+);
+
+CREATE INDEX IF NOT EXISTS ix_sync_operations_applied_at
+    ON sync_operations (applied_at);
+
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['follow_up_reminders', 'test_reminders'] LOOP
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = t
+              AND column_name = 'patient_id' AND data_type = 'integer'
+        ) THEN
+            EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_patient_sync ON %I', t, t);
+            EXECUTE format(
+                'CREATE TRIGGER trg_%s_patient_sync BEFORE INSERT OR UPDATE OR DELETE ON %I '
+                'FOR EACH ROW EXECUTE FUNCTION patient_sync_capture()',
+                t, t
+            );
+        END IF;
+    END LOOP;
+END $$;
+
+COMMENT ON TABLE sync_operations IS 'Idempotency keys of applied offline operations, kept SYNC_OPERATION_RETENTION_DAYS';
+
+COMMIT;
@@ -0,0 +1,16 @@
+-- ============================================================
+-- SymptoTrack - Notification preference timezone
+-- Quiet hours are evaluated in the user's timezone
+-- (app/services/notification_policy.py). NULL means
+-- NOTIFICATION_DEFAULT_TIMEZONE.
+-- Date: 2026-10-19
+-- ============================================================
+
+BEGIN;
+
+ALTER TABLE notification_preferences
+    ADD COLUMN IF NOT EXISTS timezone VARCHAR(64);
+
+COMMENT ON COLUMN notification_preferences.timezone IS 'IANA timezone of quiet hours, e.g. Asia/Kolkata';
+
+COMMIT;
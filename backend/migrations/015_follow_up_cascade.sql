@@ -0,0 +1,41 @@
+-- ============================================================
+-- SymptoTrack - Follow-up reminder cascade
+-- Each upcoming follow-up is reminded 7 days before (10:00), the day
+-- before (18:00) and on the morning of the visit (08:00), in the
+-- patient's timezone (app/services/follow_up_cascade.py).
+--
+-- next_fire_at is when a follow-up next needs the dispatcher: one range
+-- scan of the partial index finds every due cascade per tick. Existing
+-- upcoming follow-ups are scheduled in Asia/Kolkata
+-- (NOTIFICATION_DEFAULT_TIMEZONE); the dispatcher re-checks each
+-- stage in the patient's own timezone before sending.
+-- Date: 2026-10-19
+-- ============================================================
+
+BEGIN;
+
+ALTER TABLE follow_up_reminders
+    ADD COLUMN IF NOT EXISTS next_fire_at TIMESTAMP WITH TIME ZONE;
+
+CREATE INDEX IF NOT EXISTS ix_follow_up_reminders_next_fire
+    ON follow_up_reminders (next_fire_at)
+    WHERE next_fire_at IS NOT NULL;
+
+-- First unsent stage whose window (until the next stage) is still open
+UPDATE follow_up_reminders
+SET next_fire_at = CASE
+    WHEN NOT coalesce(reminder_7day_sent, FALSE)
+         AND now() < ((follow_up_date - 1) + TIME '18:00') AT TIME ZONE 'Asia/Kolkata'
+        THEN ((follow_up_date - 7) + TIME '10:00') AT TIME ZONE 'Asia/Kolkata'
+    WHEN NOT coalesce(reminder_1day_sent, FALSE)
+         AND now() < (follow_up_date + TIME '08:00') AT TIME ZONE 'Asia/Kolkata'
+        THEN ((follow_up_date - 1) + TIME '18:00') AT TIME ZONE 'Asia/Kolkata'
+    WHEN NOT coalesce(reminder_morning_sent, FALSE)
+         AND now() < ((follow_up_date + 1) + TIME '00:00') AT TIME ZONE 'Asia/Kolkata'
+        THEN (follow_up_date + TIME '08:00') AT TIME ZONE 'Asia/Kolkata'
+END
+WHERE next_fire_at IS NULL
+  AND lower(status::text) = 'upcoming'
+  AND follow_up_date >= current_date - 1;
+
+COMMIT;
@@ -0,0 +1,25 @@
+-- ============================================================
+-- SymptoTrack - Usage count flush batches
+-- UsageCounter.flush (app/services/usage_counter.py) applies the buffered
+-- template/favorite usage counts of a Redis hash in one transaction. Each
+-- drained hash carries a batch id, recorded here in that same transaction:
+-- a flush that crashed after committing but before deleting the hash finds
+-- its batch already applied on the next run and drops the hash instead of
+-- adding the counts again.
+-- Date: 2026-10-19
+-- ============================================================
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS usage_flush_batches (
+    batch_id VARCHAR(36) PRIMARY KEY,
+    kind VARCHAR(20) NOT NULL,
+    applied_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_usage_flush_batches_applied_at
+    ON usage_flush_batches (applied_at);
+
+COMMENT ON TABLE usage_flush_batches IS 'Applied usage count batches, kept USAGE_FLUSH_BATCH_RETENTION_DAYS';
+
+COMMIT;
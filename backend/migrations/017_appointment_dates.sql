@@ -0,0 +1,46 @@
+-- ============================================================
+-- SymptoTrack - Appointment id -> date lookup
+-- appointments is partitioned by appointment_date (007_monthly_partitions.sql),
+-- so a lookup by id alone scans an index of every monthly partition.
+-- appointment_dates maps each id to its date; the single-appointment
+-- routes read the date first and query one partition
+-- (app/api/routes/appointments.py).
+--
+-- Kept in step by a trigger. A move to another month (an UPDATE of
+-- appointment_date) fires DELETE + INSERT before Postgres 15 and UPDATE
+-- from 15 on; both leave the new date. Rows of archived months are pruned
+-- by the maintain_partitions task.
+-- Date: 2026-10-19
+-- ============================================================
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS appointment_dates (
+    id INTEGER PRIMARY KEY,
+    appointment_date DATE NOT NULL
+);
+
+CREATE OR REPLACE FUNCTION appointment_dates_capture() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        DELETE FROM appointment_dates WHERE id = OLD.id AND appointment_date = OLD.appointment_date;
+        RETURN OLD;
+    END IF;
+    INSERT INTO appointment_dates (id, appointment_date) VALUES (NEW.id, NEW.appointment_date)
+    ON CONFLICT (id) DO UPDATE SET appointment_date = EXCLUDED.appointment_date;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_appointments_dates ON appointments;
+CREATE TRIGGER trg_appointments_dates
+    AFTER INSERT OR DELETE OR UPDATE OF appointment_date ON appointments
+    FOR EACH ROW EXECUTE FUNCTION appointment_dates_capture();
+
+INSERT INTO appointment_dates (id, appointment_date)
+SELECT id, appointment_date FROM appointments
+ON CONFLICT (id) DO NOTHING;
+
+COMMENT ON TABLE appointment_dates IS 'appointments.id -> appointment_date (partition key), maintained by trigger';
+
+COMMIT;
@@ -15,8 +15,22 @@ DB_CONFIG = {
     'password': '123'
 }
 
-# Migration file path
-MIGRATION_FILE = os.path.join(os.path.dirname(__file__), 'migrations', '001_symptotrack_schema_integer.sql')
+# Migration file path (override with: python run_migration.py 002_reminder_slot_mask.sql)
+MIGRATION_FILE = os.path.join(
+    os.path.dirname(__file__), 'migrations',
+    sys.argv[1] if len(sys.argv) > 1 else '001_symptotrack_schema_integer.sql'
+)
+
+# Scripts containing this marker (e.g. CREATE INDEX CONCURRENTLY) cannot run
+# inside a transaction block; they are executed one statement at a time
+NO_TRANSACTION_MARKER = '-- migrate: no-transaction'
+
+
+def split_statements(sql_script):
+    """Split a plain DDL script (no function bodies) on statement-ending semicolons"""
+    lines = [line for line in sql_script.splitlines() if not line.strip().startswith('--')]
+    return [s.strip() for s in '\n'.join(lines).split(';') if s.strip()]
+
 
 def run_migration():
     """Execute the SQL migration script"""
@@ -29,15 +43,23 @@ def run_migration():
         # Connect to PostgreSQL
         print(f"Connecting to database: {DB_CONFIG['database']}...")
         conn = psycopg2.connect(**DB_CONFIG)
-        conn.set_session(autocommit=False)
+        no_transaction = NO_TRANSACTION_MARKER in sql_script
+        conn.set_session(autocommit=no_transaction)
         cursor = conn.cursor()
         
         # Execute the script
-        print("Executing migration script...")
-        cursor.execute(sql_script)
-        
-        # Commit the transaction
-        conn.commit()
+        if no_transaction:
+            statements = split_statements(sql_script)
+            print(f"Executing {len(statements)} statements outside a transaction...")
+            for statement in statements:
+                print(f"  {statement.splitlines()[0]}")
+                cursor.execute(statement)
+        else:
+            print("Executing migration script...")
+            cursor.execute(sql_script)
+            
+            # Commit the transaction
+            conn.commit()
         print("✓ Migration executed successfully!")
         
         # Get table count to verify
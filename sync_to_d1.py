@@ -0,0 +1,306 @@
+"""
+Incremental PostgreSQL -> D1 sync
+
+Replays d1_change_log (backend/migrations/005_d1_change_log.sql) from a
+stored checkpoint instead of re-exporting whole tables, so a run costs
+O(rows changed). Each batch of changed keys is collapsed to the rows' current
+state: keys that still exist become upserts, keys that are gone become
+DELETE tombstones. Applying a batch twice is harmless, which makes the sync
+resumable after any failure.
+
+Targets:
+    --sqlite PATH   apply directly to a SQLite database (a local stand-in for
+                    D1, e.g. the `wrangler dev` database); the checkpoint is
+                    stored in the same transaction as the batch
+    --out-dir DIR   write numbered delta files for `wrangler d1 execute`
+                    plus checkpoint.json
+
+Usage:
+    python export_to_d1.py                        # one-off full load
+    python sync_to_d1.py --out-dir DIR --init     # start the log from now
+    python sync_to_d1.py --out-dir DIR            # ship changes since last run
+    python sync_to_d1.py --sqlite local.db --prune
+"""
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from export_to_d1 import (
+    DATABASE_URL, TABLES, MAX_STATEMENT_BYTES, MAX_ROWS_PER_STATEMENT,
+    load_metadata, dependency_levels, insert_parts, quote,
+)
+
+BATCH_SIZE = 5_000
+CHECKPOINT_FILE = "checkpoint.json"
+INTEGER_TYPES = {'smallint', 'integer', 'bigint'}
+
+
+class SqliteTarget:
+    """Local SQLite database standing in for D1."""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS _d1_sync_checkpoint "
+            "(id INTEGER PRIMARY KEY CHECK (id = 1), seq INTEGER NOT NULL, horizon TEXT, synced_at TEXT)"
+        )
+
+    def load_checkpoint(self):
+        row = self.conn.execute("SELECT seq, horizon FROM _d1_sync_checkpoint").fetchone()
+        return {"seq": row[0], "horizon": row[1]} if row else None
+
+    def apply(self, statements, checkpoint):
+        """Apply one batch and its checkpoint atomically."""
+        self.conn.execute("BEGIN")
+        try:
+            for statement in statements:
+                self.conn.execute(statement)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO _d1_sync_checkpoint (id, seq, horizon, synced_at) VALUES (1, ?, ?, ?)",
+                (checkpoint["seq"], checkpoint["horizon"], datetime.now().isoformat()),
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def close(self):
+        self.conn.close()
+
+
+class SqlFileTarget:
+    """Numbered delta files for `wrangler d1 execute --file`."""
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        self.checkpoint_path = os.path.join(out_dir, CHECKPOINT_FILE)
+        self.files = []
+        os.makedirs(out_dir, exist_ok=True)
+
+    def load_checkpoint(self):
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def apply(self, statements, checkpoint):
+        """Write the batch, then advance the checkpoint (re-importing a file is idempotent)."""
+        if statements:
+            # Rescans of late changes reuse the checkpoint's seq; never overwrite a file
+            part = 0
+            while True:
+                path = os.path.join(self.out_dir, f"delta-{checkpoint['seq']:012d}-{part:03d}.sql")
+                if not os.path.exists(path):
+                    break
+                part += 1
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(f"-- D1 delta up to change {checkpoint['seq']}\n")
+                f.writelines(s + "\n" for s in statements)
+            self.files.append(path)
+        tmp = self.checkpoint_path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp, self.checkpoint_path)
+
+    def close(self):
+        pass
+
+
+def pack(head, tail, values, args):
+    """Split encoded values into multi-row statements under the D1 size limit."""
+    overhead = len(head.encode()) + len(tail.encode())
+    batch, size = [], overhead
+    for value in values:
+        value_bytes = len(value.encode()) + 2
+        if batch and (size + value_bytes > args.statement_bytes or len(batch) >= args.rows_per_statement):
+            yield head + ",\n".join(batch) + tail
+            batch, size = [], overhead
+        batch.append(value)
+        size += value_bytes
+    if batch:
+        yield head + ",\n".join(batch) + tail
+
+
+async def snapshot_horizon(conn):
+    """xmin of the current snapshot: every transaction still open has an xid at or above it."""
+    return await conn.scalar(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text"))
+
+
+async def read_changes(conn, after, limit):
+    """Next batch of changes after seq `after`."""
+    return (await conn.execute(
+        text("SELECT seq, table_name, row_id FROM d1_change_log WHERE seq > :seq ORDER BY seq LIMIT :limit"),
+        {"seq": after, "limit": limit},
+    )).all()
+
+
+async def read_late_changes(conn, after, upto, horizon, limit):
+    """
+    Next batch of changes in (after, upto] written by transactions still
+    open when `horizon` was taken. They may have committed after the
+    forward scan passed their seq, so they are re-read; paging by seq keeps
+    the rescan finite however long such a transaction stays open.
+    """
+    return (await conn.execute(
+        text(
+            "SELECT seq, table_name, row_id FROM d1_change_log "
+            "WHERE seq > :after AND seq <= :upto AND xid >= CAST(:horizon AS xid8) "
+            "ORDER BY seq LIMIT :limit"
+        ),
+        {"after": after, "upto": upto, "horizon": horizon, "limit": limit},
+    )).all()
+
+
+async def build_statements(conn, metas, levels, changed, args):
+    """Upserts parents-first, then tombstones children-first."""
+    upserts, deletes = [], []
+    for level in levels:
+        for table in level:
+            keys = changed.get(table)
+            if not keys:
+                continue
+            meta = metas[table]
+            pk = meta.primary_key[0]
+            pk_type = meta.types[meta.columns.index(pk)]
+            result = await conn.execute(
+                text(
+                    f"SELECT {', '.join(meta.columns)} FROM {table} "
+                    f"WHERE {pk} = ANY(CAST(CAST(:ids AS text[]) AS {pk_type}[]))"
+                ),
+                {"ids": list(keys)},
+            )
+            pk_index = meta.columns.index(pk)
+            present, values = set(), []
+            for row in result:
+                present.add(str(row[pk_index]))
+                values.append(meta.encode_row(row))
+
+            head, tail = insert_parts(meta, upsert=True)
+            upserts.extend(s.rstrip("\n") for s in pack(head, tail, values, args))
+
+            gone = [key for key in keys if key not in present]
+            if gone:
+                encode = str if pk_type in INTEGER_TYPES else quote
+                encoded = [encode(int(key) if pk_type in INTEGER_TYPES else key) for key in gone]
+                deletes.append((table, [
+                    f"DELETE FROM {table} WHERE {pk} IN ({', '.join(encoded[i:i + args.rows_per_statement])});"
+                    for i in range(0, len(encoded), args.rows_per_statement)
+                ]))
+
+    for _table, statements in reversed(deletes):
+        upserts.extend(statements)
+    return upserts
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Incremental PostgreSQL to D1 sync")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--sqlite", help="Apply to a local SQLite database")
+    target.add_argument("--out-dir", help="Write delta SQL files for wrangler")
+    parser.add_argument("--tables", nargs="+", default=TABLES)
+    parser.add_argument("--init", action="store_true",
+                        help="Set the checkpoint to the current end of the log without applying")
+    parser.add_argument("--prune", action="store_true",
+                        help="Delete log rows this target has consumed (only with a single consumer)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--statement-bytes", type=int, default=MAX_STATEMENT_BYTES)
+    parser.add_argument("--rows-per-statement", type=int, default=MAX_ROWS_PER_STATEMENT)
+    return parser.parse_args()
+
+
+async def main():
+    """Main sync function"""
+    args = parse_args()
+    target = SqliteTarget(args.sqlite) if args.sqlite else SqlFileTarget(args.out_dir)
+    engine = create_async_engine(DATABASE_URL, echo=False)
+
+    try:
+        async with engine.connect() as conn:
+            if args.init:
+                seq = await conn.scalar(text("SELECT coalesce(max(seq), 0) FROM d1_change_log"))
+                horizon = await conn.scalar(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text"))
+                target.apply([], {"seq": seq, "horizon": horizon})
+                print(f"✅ Checkpoint initialised at change {seq}")
+                return
+
+            metas, depends = await load_metadata(conn, args.tables)
+            metas = {t: m for t, m in metas.items() if len(m.primary_key) == 1}
+            levels = dependency_levels(list(metas), {t: depends[t] & set(metas) for t in metas})
+
+            checkpoint = target.load_checkpoint() or {"seq": 0, "horizon": None}
+            print(f"Starting PostgreSQL to D1 sync from change {checkpoint['seq']}...")
+            total_changes = total_statements = 0
+
+            async def ship(rows, checkpoint, label="Applied"):
+                changed = {}
+                for row in rows:
+                    if row.table_name in metas:
+                        changed.setdefault(row.table_name, set()).add(row.row_id)
+                statements = await build_statements(conn, metas, levels, changed, args)
+                target.apply(statements, checkpoint)
+                await conn.rollback()  # fresh snapshot for the next batch
+                if rows:
+                    print(f"  {label} {len(rows)} changes up to {rows[-1].seq} ({len(statements)} statements)")
+                return len(statements)
+
+            # Changes of transactions open at the last run's end (or at this
+            # run's start) are rescanned once the forward scan is done. Until
+            # then the checkpoint keeps the old horizon, so a crash repeats
+            # the rescan rather than skipping it.
+            horizon = checkpoint["horizon"] or await snapshot_horizon(conn)
+            await conn.rollback()
+
+            while True:
+                rows = await read_changes(conn, checkpoint["seq"], args.batch_size)
+                if not rows:
+                    break
+                checkpoint = {"seq": rows[-1].seq, "horizon": horizon}
+                total_statements += await ship(rows, checkpoint)
+                total_changes += len(rows)
+                if len(rows) < args.batch_size:
+                    break
+
+            next_horizon = await snapshot_horizon(conn)
+            await conn.rollback()
+            after = 0
+            while True:
+                rows = await read_late_changes(conn, after, checkpoint["seq"], horizon, args.batch_size)
+                if not rows:
+                    break
+                after = rows[-1].seq
+                total_statements += await ship(rows, checkpoint, "Re-applied late")
+                total_changes += len(rows)
+                if len(rows) < args.batch_size:
+                    break
+            checkpoint = {"seq": checkpoint["seq"], "horizon": next_horizon}
+            target.apply([], checkpoint)
+
+            if args.prune:
+                result = await conn.execute(
+                    text("DELETE FROM d1_change_log WHERE seq <= :seq AND xid < CAST(:horizon AS xid8)"),
+                    checkpoint,
+                )
+                await conn.commit()
+                print(f"  Pruned {result.rowcount} consumed log rows")
+
+        print(f"\n✅ Sync completed: {total_changes} changes, {total_statements} statements")
+        if isinstance(target, SqlFileTarget) and target.files:
+            print("\nTo import to D1, run in order:")
+            for path in target.files:
+                print(f"  wrangler d1 execute friendlyhealthy-db --remote --file={path}")
+
+    except Exception as e:
+        print(f"\n❌ Sync failed: {e}")
+        sys.exit(1)
+    finally:
+        target.close()
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())